@@ -6,12 +6,19 @@ export interface Strain {
     type: 'Indica' | 'Sativa' | 'Hybrid';
     thc?: string;
     cbd?: string;
+    thc_min?: number;
+    thc_max?: number;
+    cbd_min?: number;
+    cbd_max?: number;
     rating?: number;
     review_count: number;
     top_effect?: string;
     category?: string;
     image_path?: string;
     image_url?: string;
+    image_placeholder?: string;
+    image_width?: number;
+    image_height?: number;
     description?: string;
     created_at?: Date;
     updated_at?: Date;
@@ -31,6 +38,7 @@ export interface StrainComplete extends Strain {
 
 export interface StrainSearch {
     name: string;
+    url?: string;
     type: 'Indica' | 'Sativa' | 'Hybrid';
     rating?: number;
     review_count: number;
@@ -77,8 +85,12 @@ export interface StrainQuery {
     type?: 'Indica' | 'Sativa' | 'Hybrid';
     min_rating?: number;
     max_rating?: number;
+    min_thc?: number;
+    max_thc?: number;
+    min_cbd?: number;
+    max_cbd?: number;
     search?: string;
-    sort: 'name' | 'rating' | 'review_count' | 'created_at';
+    sort: 'name' | 'rating' | 'review_count' | 'created_at' | 'thc_max' | 'cbd_max';
     order: 'asc' | 'desc';
 }
 
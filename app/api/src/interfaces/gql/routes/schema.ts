@@ -6,12 +6,19 @@ type Strain {
   type: String!
   thc: String
   cbd: String
+  thc_min: Float
+  thc_max: Float
+  cbd_min: Float
+  cbd_max: Float
   rating: Float
   review_count: Int!
   top_effect: String
   category: String
   image_path: String
   image_url: String
+  image_placeholder: String
+  image_width: Int
+  image_height: Int
   description: String
   aliases: String
   positive_effects: String
@@ -96,12 +103,24 @@ type Strain {
   }
 
   type Query {
-    strains(page: Int! = 1, limit: Int! = 20): PaginatedStrains!
+    strains(
+      page: Int! = 1
+      limit: Int! = 20
+      type: String
+      min_rating: Float
+      max_rating: Float
+      min_thc: Float
+      max_thc: Float
+      min_cbd: Float
+      max_cbd: Float
+      sort: String = "name"
+      order: String = "asc"
+    ): PaginatedStrains!
     strain(name: String!): Strain
     searchStrains(query: String!, page: Int! = 1, limit: Int! = 20): PaginatedStrains!
     searchExact(query: String!): Strain
-    strainsByCategory(category: String!, page: Int! = 1, limit: Int! = 20): PaginatedStrains!
-    strainsByEffect(effect: String!, page: Int! = 1, limit: Int! = 20): PaginatedStrains!
+    strainsByCategory(category: String!, page: Int! = 1, limit: Int! = 20, sort: String = "name", order: String = "asc"): PaginatedStrains!
+    strainsByEffect(effect: String!, page: Int! = 1, limit: Int! = 20, sort: String = "name", order: String = "asc"): PaginatedStrains!
     leaderboard(page: Int! = 1, limit: Int! = 20): LeaderboardResult!
     categoryLeaders: CategoryLeadersResult!
     userRank(username: String!): LeaderboardEntry
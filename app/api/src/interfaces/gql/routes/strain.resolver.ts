@@ -1,5 +1,5 @@
 import { StrainService } from '../../../services/strain.service';
-import { validateStrainsArgs } from '../validations/leaderboard.validation';
+import { parseStrainQueryArgs, validateStrainsArgs } from '../validations/leaderboard.validation';
 
 interface Context {
     services: {
@@ -14,9 +14,9 @@ interface Context {
 
 export const strainResolvers = {
     Query: {
-        strains: async (_: any, { page, limit }: { page: number; limit: number }, ctx: Context) => {
-            validateStrainsArgs(page, limit);
-            const result = await ctx.services.strain.getStrains(page, limit);
+        strains: async (_: any, args: { page: number; limit: number; [filter: string]: unknown }, ctx: Context) => {
+            validateStrainsArgs(args.page, args.limit);
+            const result = await ctx.services.strain.getStrains(parseStrainQueryArgs(args));
             return {
                 strains: result.strains,
                 pageInfo: {
@@ -52,9 +52,9 @@ export const strainResolvers = {
             return await ctx.services.strain.searchExact(query);
         },
 
-        strainsByCategory: async (_: any, { category, page, limit }: { category: string; page: number; limit: number }, ctx: Context) => {
+        strainsByCategory: async (_: any, { category, page, limit, sort, order }: { category: string; page: number; limit: number; sort?: string; order?: string }, ctx: Context) => {
             validateStrainsArgs(page, limit);
-            const result = await ctx.services.strain.getStrainsByCategory(category, page, limit);
+            const result = await ctx.services.strain.getStrainsByCategory(category, parseStrainQueryArgs({ page, limit, sort, order }));
             return {
                 strains: result.strains,
                 pageInfo: {
@@ -67,9 +67,9 @@ export const strainResolvers = {
             };
         },
 
-        strainsByEffect: async (_: any, { effect, page, limit }: { effect: string; page: number; limit: number }, ctx: Context) => {
+        strainsByEffect: async (_: any, { effect, page, limit, sort, order }: { effect: string; page: number; limit: number; sort?: string; order?: string }, ctx: Context) => {
             validateStrainsArgs(page, limit);
-            const result = await ctx.services.strain.getStrainsByEffect(effect, page, limit);
+            const result = await ctx.services.strain.getStrainsByEffect(effect, parseStrainQueryArgs({ page, limit, sort, order }));
             return {
                 strains: result.strains,
                 pageInfo: {
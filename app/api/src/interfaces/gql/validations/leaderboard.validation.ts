@@ -1,4 +1,6 @@
 import { GraphQLError } from "graphql";
+import { StrainQuery } from "../../../DTOs/strain.dto";
+import { StrainQuerySchema } from "../../../validations/strain.validation";
 
 export const validateLeaderboardArgs = (page: number, limit: number) => {
     if (page < 1) {
@@ -28,3 +30,15 @@ export const validateStrainsArgs = (page: number, limit: number) => {
     }
 };
 
+// Validates strain list arguments (filters, sort column, order) into a repository query;
+// sort is interpolated into ORDER BY, so only the schema's enum values get through
+export const parseStrainQueryArgs = (args: Record<string, unknown>): StrainQuery => {
+    const provided = Object.fromEntries(Object.entries(args).filter(([, value]) => value !== null && value !== undefined));
+    const parsed = StrainQuerySchema.safeParse(provided);
+    if (!parsed.success) {
+        throw new GraphQLError(parsed.error.issues.map(issue => `${issue.path.join(".")}: ${issue.message}`).join("; "), {
+            extensions: { code: "BAD_USER_INPUT" }
+        });
+    }
+    return parsed.data;
+};
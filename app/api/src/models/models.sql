@@ -19,6 +19,8 @@ DROP TABLE IF EXISTS user_sessions;
 DROP TABLE IF EXISTS seen;
 DROP TABLE IF EXISTS favourited;
 DROP TABLE IF EXISTS strain_grow_info;
+DROP TABLE IF EXISTS strain_lineage_closure;
+DROP TABLE IF EXISTS strain_lineage_nodes;
 DROP TABLE IF EXISTS strain_genetics;
 DROP TABLE IF EXISTS strain_medical_benefits;
 DROP TABLE IF EXISTS medical_conditions;
@@ -67,18 +69,32 @@ CREATE TABLE strains (
     type VARCHAR(10) CHECK (type IN ('Indica', 'Sativa', 'Hybrid')) NOT NULL,
     thc VARCHAR(20),
     cbd VARCHAR(20),
+    thc_min NUMERIC(5,2),    -- parsed from thc/cbd at import (data-scraper/import_to_db.py)
+    thc_max NUMERIC(5,2),
+    cbd_min NUMERIC(5,2),
+    cbd_max NUMERIC(5,2),
     rating DECIMAL(3,2),
     review_count INT DEFAULT 0,
     top_effect VARCHAR(50),
     category VARCHAR(50),
     image_path VARCHAR(500),
     image_url VARCHAR(500),
+    image_placeholder TEXT,    -- inline 16px data URI (data-scraper/image_placeholders.py)
+    image_width INT,
+    image_height INT,
     description TEXT,
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP    -- INDEX idx_type (type)    -- INDEX idx_rating (rating)    -- INDEX idx_category (category)    -- INDEX idx_top_effect (top_effect)    -- FULLTEXT idx_description (description)
     -- FULLTEXT idx_name (name)
 );
 
+-- Potency range filters and rating sort
+CREATE INDEX idx_strains_thc ON strains (thc_min, thc_max);
+CREATE INDEX idx_strains_cbd ON strains (cbd_min, cbd_max);
+CREATE INDEX idx_strains_thc_max ON strains (thc_max DESC NULLS LAST);
+CREATE INDEX idx_strains_cbd_max ON strains (cbd_max DESC NULLS LAST);
+CREATE INDEX idx_strains_rating ON strains (rating DESC NULLS LAST);
+
 -- 4. Strain AKAs (also known as) - separate table for multiple aliases
 CREATE TABLE strain_akas (
     id SERIAL PRIMARY KEY,
@@ -158,6 +174,29 @@ CREATE TABLE strain_genetics (
     FOREIGN KEY (strain_name) REFERENCES strains(name) ON DELETE CASCADE    -- INDEX idx_strain_name (strain_name)    -- INDEX idx_related_strain (related_strain)    -- INDEX idx_relationship (relationship)
 );
 
+-- 9a. Lineage graph nodes (integer IDs; strain_name is NULL for lineage-only strains)
+CREATE TABLE strain_lineage_nodes (
+    id INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    slug VARCHAR(100) UNIQUE NOT NULL,
+    strain_name VARCHAR(100),
+    FOREIGN KEY (strain_name) REFERENCES strains(name) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_lineage_nodes_strain_name ON strain_lineage_nodes (strain_name);
+
+-- 9b. Lineage closure table (every ancestor/descendant pair with depth, built by lineage_graph.py)
+CREATE TABLE strain_lineage_closure (
+    ancestor_id INT NOT NULL,
+    descendant_id INT NOT NULL,
+    depth INT NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    FOREIGN KEY (ancestor_id) REFERENCES strain_lineage_nodes(id) ON DELETE CASCADE,
+    FOREIGN KEY (descendant_id) REFERENCES strain_lineage_nodes(id) ON DELETE CASCADE
+);
+
+CREATE INDEX idx_lineage_closure_descendant ON strain_lineage_closure (descendant_id, depth);
+
 -- 10. Grow Information
 CREATE TABLE strain_grow_info (
     id SERIAL PRIMARY KEY,
@@ -34,14 +34,15 @@ LEFT JOIN terpenes t ON st.terpene_name = t.terpene_name
 LEFT JOIN strain_medical_benefits smb ON s.name = smb.strain_name
 LEFT JOIN medical_conditions mc ON smb.condition_name = mc.condition_name
 LEFT JOIN strain_genetics sg ON s.name = sg.strain_name
-GROUP BY s.name, s.url, s.type, s.thc, s.cbd, s.rating, s.review_count, 
-         s.top_effect, s.category, s.image_path, s.image_url, s.description, 
-         s.created_at, s.updated_at;
+GROUP BY s.name, s.url, s.type, s.thc, s.cbd, s.thc_min, s.thc_max, s.cbd_min, s.cbd_max,
+         s.rating, s.review_count, s.top_effect, s.category, s.image_path, s.image_url, s.image_placeholder,
+         s.image_width, s.image_height, s.description, s.created_at, s.updated_at;
 
 -- Strain search view (optimized for search queries)
 CREATE VIEW strain_search AS
 SELECT 
     s.name,
+    s.url,
     s.type,
     s.rating,
     s.review_count,
@@ -67,9 +68,32 @@ LEFT JOIN strain_terpenes st ON s.name = st.strain_name
 LEFT JOIN terpenes t ON st.terpene_name = t.terpene_name
 LEFT JOIN strain_medical_benefits smb ON s.name = smb.strain_name
 LEFT JOIN medical_conditions mc ON smb.condition_name = mc.condition_name
-GROUP BY s.name, s.type, s.rating, s.review_count, s.top_effect, 
+GROUP BY s.name, s.url, s.type, s.rating, s.review_count, s.top_effect, 
          s.category, s.image_path, s.description;
 
+-- Full family tree (ancestors and descendants at any depth) from the lineage closure table;
+-- one branch per direction so each side is a single indexed lookup
+CREATE VIEW strain_family_tree AS
+SELECT
+    n.strain_name,
+    rel.name AS related_name,
+    rel.strain_name AS related_strain,
+    'ancestor' AS direction,
+    c.depth
+FROM strain_lineage_nodes n
+JOIN strain_lineage_closure c ON c.descendant_id = n.id AND c.depth > 0
+JOIN strain_lineage_nodes rel ON rel.id = c.ancestor_id
+UNION ALL
+SELECT
+    n.strain_name,
+    rel.name AS related_name,
+    rel.strain_name AS related_strain,
+    'descendant' AS direction,
+    c.depth
+FROM strain_lineage_nodes n
+JOIN strain_lineage_closure c ON c.ancestor_id = n.id AND c.depth > 0
+JOIN strain_lineage_nodes rel ON rel.id = c.descendant_id;
+
 -- =============================================================================
 -- USER ANALYTICS VIEWS
 -- =============================================================================
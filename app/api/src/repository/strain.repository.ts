@@ -17,7 +17,7 @@ export class StrainRepository {
     }
 
     async getAll(query: StrainQuery): Promise<{ strains: Strain[], total: number }> {
-        const { page, limit, type, min_rating, max_rating, search, sort, order } = query;
+        const { page, limit, type, min_rating, max_rating, min_thc, max_thc, min_cbd, max_cbd, search, sort, order } = query;
         const offset = (page - 1) * limit;
 
         let whereClause = 'WHERE 1=1';
@@ -39,12 +39,37 @@ export class StrainRepository {
             params.push(max_rating);
         }
 
+        // Ranges overlap the requested one. thc_max >= / cbd_max >= use idx_strains_thc_max / idx_strains_cbd_max,
+        // thc_min <= / cbd_min <= lead idx_strains_thc / idx_strains_cbd
+        if (min_thc !== undefined) {
+            whereClause += ` AND thc_max >= $${++paramCount}`;
+            params.push(min_thc);
+        }
+
+        if (max_thc !== undefined) {
+            whereClause += ` AND thc_min <= $${++paramCount}`;
+            params.push(max_thc);
+        }
+
+        if (min_cbd !== undefined) {
+            whereClause += ` AND cbd_max >= $${++paramCount}`;
+            params.push(min_cbd);
+        }
+
+        if (max_cbd !== undefined) {
+            whereClause += ` AND cbd_min <= $${++paramCount}`;
+            params.push(max_cbd);
+        }
+
         if (search) {
             whereClause += ` AND (name ILIKE $${++paramCount} OR description ILIKE $${paramCount})`;
             params.push(`%${search}%`);
         }
 
-        const orderClause = `ORDER BY ${sort} ${order.toUpperCase()}`;
+        // Unrated strains and strains without a potency figure go last either way; DESC NULLS LAST
+        // matches the rating/thc_max/cbd_max indexes (name is never NULL and keeps its primary key order)
+        const nullsLast = order === 'desc' && sort !== 'name' ? ' NULLS LAST' : '';
+        const orderClause = `ORDER BY ${sort} ${order.toUpperCase()}${nullsLast}`;
 
         // Get total count
         const countQuery = `SELECT COUNT(*) as total FROM strains ${whereClause}`;
@@ -65,7 +90,7 @@ export class StrainRepository {
     }
 
     async getAllComplete(query: StrainQuery): Promise<{ strains: StrainComplete[], total: number }> {
-        const { page, limit, type, min_rating, max_rating, search, sort, order } = query;
+        const { page, limit, type, min_rating, max_rating, min_thc, max_thc, min_cbd, max_cbd, search, sort, order } = query;
         const offset = (page - 1) * limit;
 
         let whereClause = 'WHERE 1=1';
@@ -87,12 +112,37 @@ export class StrainRepository {
             params.push(max_rating);
         }
 
+        // Ranges overlap the requested one. thc_max >= / cbd_max >= use idx_strains_thc_max / idx_strains_cbd_max,
+        // thc_min <= / cbd_min <= lead idx_strains_thc / idx_strains_cbd
+        if (min_thc !== undefined) {
+            whereClause += ` AND thc_max >= $${++paramCount}`;
+            params.push(min_thc);
+        }
+
+        if (max_thc !== undefined) {
+            whereClause += ` AND thc_min <= $${++paramCount}`;
+            params.push(max_thc);
+        }
+
+        if (min_cbd !== undefined) {
+            whereClause += ` AND cbd_max >= $${++paramCount}`;
+            params.push(min_cbd);
+        }
+
+        if (max_cbd !== undefined) {
+            whereClause += ` AND cbd_min <= $${++paramCount}`;
+            params.push(max_cbd);
+        }
+
         if (search) {
             whereClause += ` AND (name ILIKE $${++paramCount} OR description ILIKE $${paramCount})`;
             params.push(`%${search}%`);
         }
 
-        const orderClause = `ORDER BY ${sort} ${order.toUpperCase()}`;
+        // Unrated strains and strains without a potency figure go last either way; DESC NULLS LAST
+        // matches the rating/thc_max/cbd_max indexes (name is never NULL and keeps its primary key order)
+        const nullsLast = order === 'desc' && sort !== 'name' ? ' NULLS LAST' : '';
+        const orderClause = `ORDER BY ${sort} ${order.toUpperCase()}${nullsLast}`;
 
         // Get total count
         const countQuery = `SELECT COUNT(*) as total FROM strain_complete ${whereClause}`;
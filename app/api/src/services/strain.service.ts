@@ -151,8 +151,7 @@ export class StrainService {
     }
 
     // Legacy methods for GraphQL resolver compatibility
-    async getStrains(page: number = 1, limit: number = 20): Promise<{ strains: StrainComplete[], total: number, pagination: any }> {
-        const query = { page, limit, sort: 'name' as const, order: 'asc' as const };
+    async getStrains(query: StrainQuery): Promise<{ strains: StrainComplete[], total: number, pagination: any }> {
         return this.getAllCompleteStrains(query);
     }
 
@@ -160,13 +159,11 @@ export class StrainService {
         return this.getStrainByName(name);
     }
 
-    async getStrainsByCategory(category: string, page: number = 1, limit: number = 20): Promise<{ strains: Strain[], total: number, pagination: any }> {
-        const query = { page, limit, search: category, sort: 'name' as const, order: 'asc' as const };
-        return this.getAllStrains(query);
+    async getStrainsByCategory(category: string, query: StrainQuery): Promise<{ strains: Strain[], total: number, pagination: any }> {
+        return this.getAllStrains({ ...query, search: category });
     }
 
-    async getStrainsByEffect(effect: string, page: number = 1, limit: number = 20): Promise<{ strains: Strain[], total: number, pagination: any }> {
-        const query = { page, limit, search: effect, sort: 'name' as const, order: 'asc' as const };
-        return this.getAllStrains(query);
+    async getStrainsByEffect(effect: string, query: StrainQuery): Promise<{ strains: Strain[], total: number, pagination: any }> {
+        return this.getAllStrains({ ...query, search: effect });
     }
 }
\ No newline at end of file
@@ -29,8 +29,12 @@ export const StrainQuerySchema = z.object({
     type: z.enum(['Indica', 'Sativa', 'Hybrid']).optional(),
     min_rating: z.coerce.number().min(0).max(5).optional(),
     max_rating: z.coerce.number().min(0).max(5).optional(),
+    min_thc: z.coerce.number().min(0).max(100).optional(),
+    max_thc: z.coerce.number().min(0).max(100).optional(),
+    min_cbd: z.coerce.number().min(0).max(100).optional(),
+    max_cbd: z.coerce.number().min(0).max(100).optional(),
     search: z.string().optional(),
-    sort: z.enum(['name', 'rating', 'review_count', 'created_at']).default('name'),
+    sort: z.enum(['name', 'rating', 'review_count', 'created_at', 'thc_max', 'cbd_max']).default('name'),
     order: z.enum(['asc', 'desc']).default('asc'),
 });
 
@@ -0,0 +1,65 @@
+// Sprite atlas lookups for the Pokedex grid (built by data-scraper/sprite_atlas.py)
+
+export interface AtlasManifest {
+  version: number;
+  cell_size: number;
+  columns: number;
+  page_size: number;
+  atlases: { file: string; width: number; height: number; cells: number }[];
+  strains: Record<string, [number, number]>;
+}
+
+const CDN_URL = import.meta.env.PUBLIC_CDN_URL || 'https://cdn.budedex.space';
+export const ATLAS_MANIFEST_URL = import.meta.env.PUBLIC_ATLAS_URL || `${CDN_URL}/atlas/manifest.json`;
+
+// Transparent 1x1 GIF: the sprite is drawn as the img background so the ghost filter still applies
+export const BLANK_IMAGE = 'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7';
+
+// Matches the manifest's S3 Cache-Control, so the server picks up a rebuilt atlas
+const MANIFEST_TTL_MS = 5 * 60 * 1000;
+
+let manifestPromise: Promise<AtlasManifest | null> | null = null;
+let manifestFetchedAt = 0;
+
+// Shared by every grid page; null when there is no atlas yet
+export function loadAtlasManifest(url: string = ATLAS_MANIFEST_URL): Promise<AtlasManifest | null> {
+  if (!manifestPromise || Date.now() - manifestFetchedAt > MANIFEST_TTL_MS) {
+    manifestFetchedAt = Date.now();
+    manifestPromise = fetch(url)
+      .then(response => (response.ok ? response.json() : null))
+      .catch(error => {
+        console.warn('⚠️ Sprite atlas manifest unavailable, using single images:', error);
+        return null;
+      });
+  }
+  return manifestPromise;
+}
+
+// Inline style that shows the strain's cell of its atlas, scaled to the card size
+export function spriteStyle(manifest: AtlasManifest | null, name: string, manifestUrl: string = ATLAS_MANIFEST_URL): string | null {
+  const entry = manifest?.strains[name];
+  if (!manifest || !entry) return null;
+
+  const [atlasIndex, cell] = entry;
+  const atlas = manifest.atlases[atlasIndex];
+  const columns = atlas.width / manifest.cell_size;
+  const rows = atlas.height / manifest.cell_size;
+  const col = cell % columns;
+  const row = Math.floor(cell / columns);
+  const x = columns > 1 ? (col / (columns - 1)) * 100 : 0;
+  const y = rows > 1 ? (row / (rows - 1)) * 100 : 0;
+  // Atlas files sit next to the manifest
+  const atlasUrl = manifestUrl.replace(/[^/]*$/, '') + atlas.file;
+
+  return `background-image: url('${atlasUrl}'); background-size: ${columns * 100}% ${rows * 100}%; ` +
+    `background-position: ${x}% ${y}%; background-repeat: no-repeat;`;
+}
+
+// Point an <img> at its atlas cell; returns false when the strain is not in an atlas
+export function applySprite(img: HTMLImageElement, manifest: AtlasManifest | null, name: string): boolean {
+  const style = spriteStyle(manifest, name);
+  if (!style) return false;
+  img.src = BLANK_IMAGE;
+  img.style.cssText += style;
+  return true;
+}
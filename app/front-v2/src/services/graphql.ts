@@ -56,6 +56,9 @@ export async function getStrains(page: number, limit: number, token?: string) {
           category
           image_path
           image_url
+          image_placeholder
+          image_width
+          image_height
           description
           aliases
           positive_effects
@@ -94,6 +97,9 @@ export async function getStrain(name: string, token?: string) {
         category
         image_path
         image_url
+        image_placeholder
+        image_width
+        image_height
         description
         aliases
         positive_effects
@@ -125,6 +131,9 @@ export async function searchStrains(query: string, page: number, limit: number,
           category
           image_path
           image_url
+          image_placeholder
+          image_width
+          image_height
           description
           positive_effects
           negative_effects
@@ -160,6 +169,9 @@ export async function searchExact(query: string, token?: string) {
         category
         image_path
         image_url
+        image_placeholder
+        image_width
+        image_height
         description
         aliases
         positive_effects
@@ -0,0 +1,21 @@
+// Inline low-quality placeholders (data-scraper/image_placeholders.py), returned with each strain
+
+interface PlaceholderFields {
+  image_placeholder?: string | null;
+}
+
+// Blurry 16px preview painted behind the <img> until the real image arrives
+export function placeholderStyle(strain: PlaceholderFields): string | null {
+  if (!strain.image_placeholder) return null;
+  return `background-image: url('${strain.image_placeholder}'); background-size: cover; background-position: center;`;
+}
+
+// Drop the preview once loaded so it cannot show through transparent pixels
+export const CLEAR_PLACEHOLDER = "this.style.backgroundImage='none'";
+
+export function applyPlaceholder(img: HTMLImageElement, strain: PlaceholderFields) {
+  const style = placeholderStyle(strain);
+  if (!style) return;
+  img.style.cssText += style;
+  img.addEventListener('load', () => { img.style.backgroundImage = 'none'; }, { once: true });
+}
@@ -6,3 +6,16 @@ export function cn(...inputs: ClassValue[]) {
   return clsx(inputs)
 }
 
+
+// Canonical strain slug, as in data-scraper/strain_identity.py: the Leafly URL slug,
+// else the name lowercased with apostrophes dropped and other punctuation hyphenated
+export function strainSlug(strain: { name: string; url?: string | null }): string {
+  const fromUrl = strain.url?.split('/strains/')[1]?.split(/[?#]/)[0]?.replace(/^\/+|\/+$/g, '');
+  if (fromUrl) return fromUrl.toLowerCase();
+  return strain.name.toLowerCase().replace(/['’]/g, '').replace(/[^a-z0-9]+/g, '-').replace(/^-+|-+$/g, '');
+}
+
+// S3 key of the strain image uploaded by data-scraper/image_uploader.py
+export function strainImagePath(strain: { name: string; url?: string | null }): string {
+  return `strains/${strainSlug(strain)}.png`;
+}
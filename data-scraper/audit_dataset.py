@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Dataset completeness auditor
+Computes per-field coverage over the columnar strain tables (columnar_export.py)
+with Arrow and numpy kernels, ranks strains with gaps that missing_data_scraper.py
+can fill into a refetch queue by review count (or traffic) and appends each run to
+audit-history.jsonl so coverage trends can be tracked. Pointed at export/ it never
+builds per-strain dicts at all.
+"""
+
+import argparse
+import json
+import os
+import time
+from typing import Dict, List, Any, Optional
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+
+import dataset_io
+from columnar_export import read_table, to_tables
+from json_paths import TARGET_FIELDS
+from strain_identity import StrainIdentityIndex
+
+# Leafly serves a stock picture for strains without a photo
+PLACEHOLDER_IMAGE = r'default|placeholder|no[-_]?image'
+
+# How much a gap in each field matters when ranking the refetch queue
+FIELD_WEIGHTS = {
+    'effects': 3.0,
+    'flavors': 2.0,
+    'helps_with': 2.0,
+    'terpenes': 2.0,
+    'description': 1.5,
+    'genetics': 1.5,
+    'image': 1.0,
+    'real_image': 0.5,
+    'rating': 0.5,
+}
+FIELDS = list(FIELD_WEIGHTS)
+
+# Child table whose rows mark each list field as present
+LIST_TABLES = {
+    'effects': 'strain_effects',
+    'flavors': 'strain_flavors',
+    'helps_with': 'strain_conditions',
+    'terpenes': 'strain_terpenes',
+    'genetics': 'strain_genetics',
+}
+STRAIN_COLUMNS = ['name', 'url', 'review_count', 'description', 'image_url', 'rating']
+
+# Only gaps the missing-data scraper fills are worth queueing
+REFETCH_FIELDS = [f for f in FIELDS if f in TARGET_FIELDS]
+
+
+def read_tables(path: str) -> Dict[str, pa.Table]:
+    """The columns the audit needs, from an export/ directory or a JSON dataset"""
+    if os.path.isdir(path):
+        tables = {name: read_table(path, name, ['strain_id']) for name in LIST_TABLES.values()}
+        tables['strains'] = read_table(path, 'strains', STRAIN_COLUMNS)
+        return tables
+    return to_tables(dataset_io.load_strains(path))
+
+
+def _filled(column: pa.ChunkedArray) -> np.ndarray:
+    return pc.fill_null(column, False).to_numpy(zero_copy_only=False)
+
+
+def table_presence(tables: Dict[str, pa.Table]) -> np.ndarray:
+    """Boolean matrix (strains x FIELDS): True where the field is populated"""
+    strains = tables['strains']
+    count = strains.num_rows
+    present = {}
+    for field, table in LIST_TABLES.items():
+        has_rows = np.zeros(count, dtype=bool)
+        has_rows[tables[table].column('strain_id').to_numpy()] = True
+        present[field] = has_rows
+
+    description = pc.utf8_length(pc.utf8_trim_whitespace(strains.column('description')))
+    present['description'] = _filled(pc.greater(description, 0))
+    image_url = strains.column('image_url')
+    present['image'] = _filled(pc.greater(pc.utf8_length(image_url), 0))
+    stock = _filled(pc.match_substring_regex(image_url, PLACEHOLDER_IMAGE, ignore_case=True))
+    present['real_image'] = present['image'] & ~stock
+    present['rating'] = _filled(pc.not_equal(strains.column('rating'), 0))
+    return np.column_stack([present[field] for field in FIELDS]) if count else np.zeros((0, len(FIELDS)), bool)
+
+
+def field_presence(strains: List[Dict[str, Any]]) -> np.ndarray:
+    """table_presence for strain dicts"""
+    return table_presence(to_tables(strains))
+
+
+def load_traffic(filename: Optional[str], strains: pa.Table) -> Optional[np.ndarray]:
+    """Optional page-view counts keyed by strain name, slug or URL"""
+    if not filename:
+        return None
+    with open(filename, 'r', encoding='utf-8') as f:
+        views = json.load(f)
+
+    index = StrainIdentityIndex()
+    row_ids = np.array([index.register({'name': name, 'url': url}) for name, url in
+                        zip(strains.column('name').to_pylist(), strains.column('url').to_pylist())], dtype=np.int64)
+    by_id = np.zeros(len(index))
+    for ref, value in views.items():
+        strain_id = index.resolve(ref)
+        if strain_id is not None:
+            by_id[strain_id] += float(value)
+    return by_id[row_ids]
+
+
+def audit(tables: Dict[str, pa.Table], traffic_file: Optional[str] = None) -> Dict[str, Any]:
+    """Coverage per field plus a priority-ranked refetch queue"""
+    strains = tables['strains']
+    present = table_presence(tables)
+    missing = ~present
+
+    traffic = load_traffic(traffic_file, strains)
+    if traffic is None:
+        traffic = pc.fill_null(strains.column('review_count'), 0).to_numpy(zero_copy_only=False).astype(float)
+
+    # Gap weight over the refetchable fields, scaled by popularity; strains with no such gaps score zero
+    refetchable = np.array([FIELD_WEIGHTS[f] if f in REFETCH_FIELDS else 0.0 for f in FIELDS])
+    priority = (np.log1p(traffic) + 1.0) * (missing @ refetchable)
+    order = np.argsort(-priority, kind='stable')
+    order = order[priority[order] > 0]
+
+    names = strains.column('name').take(order).to_pylist()
+    urls = strains.column('url').take(order).to_pylist()
+    coverage = present.mean(axis=0) if strains.num_rows else np.zeros(len(FIELDS))
+    queue = [{
+        'name': name,
+        'url': url,
+        'priority': round(float(priority[i]), 3),
+        'missing_fields': [f for f, gap in zip(FIELDS, missing[i]) if gap and f in REFETCH_FIELDS],
+    } for i, name, url in zip(order, names, urls)]
+
+    return {
+        'audit_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'total_strains': strains.num_rows,
+        'complete_strains': int(present.all(axis=1).sum()),
+        'coverage': {f: round(float(c), 4) for f, c in zip(FIELDS, coverage)},
+        'missing_counts': {f: int(n) for f, n in zip(FIELDS, missing.sum(axis=0))},
+        'refetch_queue': queue,
+    }
+
+
+def previous_coverage(history_file: str) -> Optional[Dict[str, float]]:
+    try:
+        with open(history_file, 'r', encoding='utf-8') as f:
+            lines = [line for line in f if line.strip()]
+        return json.loads(lines[-1])['coverage'] if lines else None
+    except FileNotFoundError:
+        return None
+
+
+def print_report(report: Dict[str, Any], previous: Optional[Dict[str, float]]):
+    print(f"📊 Coverage across {report['total_strains']} strains "
+          f"({report['complete_strains']} complete)")
+    for field in FIELDS:
+        pct = report['coverage'][field] * 100
+        trend = ''
+        if previous and field in previous:
+            delta = pct - previous[field] * 100
+            trend = f"  ({delta:+.1f} pts)"
+        print(f"   • {field:<12} {pct:6.1f}%  missing {report['missing_counts'][field]}{trend}")
+    print(f"🎯 Refetch queue: {len(report['refetch_queue'])} strains")
+    for item in report['refetch_queue'][:5]:
+        print(f"   {item['priority']:8.2f}  {item['name']}: {', '.join(item['missing_fields'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit enhanced-data.json completeness")
+    parser.add_argument('--input', default='enhanced-data.json', help='JSON dataset or columnar_export.py directory')
+    parser.add_argument('--traffic', help='JSON of page views keyed by strain name/slug/URL')
+    parser.add_argument('--budget', type=int, help='keep only the top N strains in the refetch queue')
+    parser.add_argument('--queue-file', default='refetch-queue.json')
+    parser.add_argument('--history-file', default='audit-history.jsonl')
+    args = parser.parse_args()
+
+    print("🔍 Dataset Completeness Audit")
+    print("=" * 40)
+
+    report = audit(read_tables(args.input), args.traffic)
+    if args.budget is not None:
+        report['refetch_queue'] = report['refetch_queue'][:args.budget]
+
+    print_report(report, previous_coverage(args.history_file))
+
+    with open(args.queue_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'audit_timestamp': report['audit_timestamp'],
+            'total_queued': len(report['refetch_queue']),
+            'queue': report['refetch_queue']
+        }, f, indent=2, ensure_ascii=False)
+
+    history = {k: v for k, v in report.items() if k != 'refetch_queue'}
+    with open(args.history_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(history) + '\n')
+
+    print(f"💾 Queue saved to {args.queue_file}; history appended to {os.path.basename(args.history_file)}")
+
+
+if __name__ == "__main__":
+    main()
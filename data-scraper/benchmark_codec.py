@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Dataset codec benchmark
+Times loading and saving a dataset file with the stdlib json calls the scripts
+used to make (json.load, json.dump with indent=2) against dataset_io (typed
+msgspec decode, compact encode) and compares the file sizes.
+
+    python benchmark_codec.py enhanced-data.json --repeat 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict
+
+import dataset_io
+
+
+def median_ms(repeat: int, fn: Callable[[], object]) -> float:
+    """Median wall time of repeated calls, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+def run(filename: str, repeat: int) -> Dict[str, Dict[str, float]]:
+    with open(filename, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    def stdlib_load(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def stdlib_save(path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        stdlib_file = os.path.join(tmp, 'stdlib.json')
+        codec_file = os.path.join(tmp, 'codec.json')
+        stdlib_save(stdlib_file)
+        dataset_io.dump(data, codec_file)
+
+        if json.loads(dataset_io.encode(dataset_io.load(stdlib_file))) != json.loads(json.dumps(data)):
+            print("⚠️  dataset_io round trip differs from the input (fields outside the schema?)")
+
+        results['stdlib json'] = {
+            'load_ms': median_ms(repeat, lambda: stdlib_load(stdlib_file)),
+            'save_ms': median_ms(repeat, lambda: stdlib_save(stdlib_file)),
+            'size_kb': os.path.getsize(stdlib_file) / 1024,
+        }
+        results['dataset_io'] = {
+            'load_ms': median_ms(repeat, lambda: dataset_io.load(codec_file)),
+            'save_ms': median_ms(repeat, lambda: dataset_io.dump(data, codec_file)),
+            'size_kb': os.path.getsize(codec_file) / 1024,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dataset_io against stdlib json")
+    parser.add_argument('file', nargs='?', default='enhanced-data.json')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.file, args.repeat)
+    print(f"📊 {args.file} (median of {args.repeat})")
+    print(f"   {'':12} {'load ms':>10} {'save ms':>10} {'size KB':>10}")
+    for name, row in results.items():
+        print(f"   {name:12} {row['load_ms']:10.1f} {row['save_ms']:10.1f} {row['size_kb']:10.0f}")
+    base, codec = results['stdlib json'], results['dataset_io']
+    print(f"   speedup: load {base['load_ms'] / codec['load_ms']:.1f}x, save {base['save_ms'] / codec['save_ms']:.1f}x, "
+          f"size {base['size_kb'] / codec['size_kb']:.1f}x smaller")
+
+
+if __name__ == "__main__":
+    main()
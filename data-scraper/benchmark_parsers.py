@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Offline parser benchmark over a versioned HTML fixture corpus
+Runs parse_strain_card, extract_json_data, parse_json_strain, extract_detailed_info
+and extract_from_json against fixtures/<version>/, reporting per-page latency,
+allocations and output equivalence. Exits non-zero when an output changes.
+Throughput is shown against the saved baseline; it only fails the run with
+--check-throughput, since the baseline is an absolute number from one machine.
+tests/test_parser_benchmarks.py runs the same cases under pytest-benchmark.
+
+    python benchmark_parsers.py                     # check outputs, report throughput
+    python benchmark_parsers.py --check-throughput  # also gate on the baseline (same machine only)
+    python benchmark_parsers.py --save-baseline     # accept current throughput
+    python benchmark_parsers.py --update-expected   # accept current outputs
+    python benchmark_parsers.py --record v2 https://www.leafly.com/strains/blue-dream
+"""
+
+import argparse
+import json
+import logging
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import requests
+from bs4 import BeautifulSoup
+
+from main import LeaflyStrainScraper
+from enhanced_scraper import EnhancedLeaflyStrainScraper
+from missing_data_scraper import MissingDataScraper
+from json_paths import JSONPathExtractor
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+
+# Cases faster than this are timer noise and are never flagged as regressions
+NOISE_FLOOR_MS = 0.05
+
+
+def canonical(value: Any) -> Any:
+    """JSON round-trip so outputs compare the way they are saved"""
+    return json.loads(json.dumps(value, default=str, sort_keys=True))
+
+
+def build_cases(corpus: Path) -> List[Tuple[str, Callable[[], Any]]]:
+    """One (case_id, zero-arg callable) per parser and fixture page"""
+    listing_scraper = LeaflyStrainScraper()
+    detail_scraper = EnhancedLeaflyStrainScraper(download_images=False, parse_memo_file=None)
+    missing_scraper = MissingDataScraper()
+    cases = []
+    listing_by_slug = {}
+
+    for page in sorted((corpus / 'listing').glob('*.html')):
+        html = page.read_text(encoding='utf-8')
+        strains_json = listing_scraper.extract_json_data(html)
+        cards = BeautifulSoup(html, 'html.parser').find_all('a', {'data-testid': 'strain-card'})
+        for strain_json in strains_json:
+            listing_by_slug[strain_json.get('slug')] = listing_scraper.parse_json_strain(strain_json)
+
+        cases.append((f"extract_json_data:{page.stem}",
+                      lambda html=html: listing_scraper.extract_json_data(html)))
+        cases.append((f"parse_json_strain:{page.stem}",
+                      lambda items=strains_json: [listing_scraper.parse_json_strain(s) for s in items]))
+        cases.append((f"parse_strain_card:{page.stem}",
+                      lambda cards=cards: [listing_scraper.parse_strain_card(c) for c in cards]))
+
+    for page in sorted((corpus / 'detail').glob('*.html')):
+        html = page.read_text(encoding='utf-8')
+        basic = listing_by_slug.get(page.stem) or {
+            'name': page.stem.replace('-', ' ').title(),
+            'url': f"https://www.leafly.com/strains/{page.stem}",
+        }
+        payloads = [(script.get('id'), json.loads(script.string))
+                    for script in BeautifulSoup(html, 'html.parser').find_all('script', type='application/json')
+                    if script.string]
+
+        def run_json(payloads=payloads, extractor=JSONPathExtractor(filename=None)):
+            missing_scraper.json_paths = extractor
+            strain_data = {}
+            for script_id, payload in payloads:
+                missing_scraper.extract_from_json(payload, strain_data, script_id=script_id)
+            return strain_data
+
+        cases.append((f"extract_detailed_info:{page.stem}",
+                      lambda html=html, basic=basic: detail_scraper.extract_detailed_info(html, basic)))
+        cases.append((f"extract_from_json:{page.stem}", run_json))
+
+    return cases
+
+
+def measure(func: Callable[[], Any], iterations: int, rounds: int) -> Dict[str, Any]:
+    """Median per-call latency over several rounds plus one traced run for allocations"""
+    output = func()  # warm-up (also lets learned extractors settle)
+
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        timings.append((time.perf_counter() - start) / iterations)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    func()
+    after = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    allocations = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    latency = statistics.median(timings)
+    return {
+        'latency_ms': round(latency * 1000, 4),
+        'pages_per_sec': round(1 / latency, 2) if latency else float('inf'),
+        'peak_kb': round(peak / 1024, 1),
+        'allocations': allocations,
+        'output': canonical(output),
+    }
+
+
+def load_json(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return {}
+
+
+def record(version: str, urls: List[str]):
+    """Capture live pages into a new corpus version"""
+    session = requests.Session()
+    session.headers.update(LeaflyStrainScraper().session.headers)
+    for url in urls:
+        kind = 'listing' if url.rstrip('/').endswith('/strains') or 'page=' in url else 'detail'
+        name = url.split('page=')[-1] if 'page=' in url else url.rstrip('/').split('/')[-1]
+        if kind == 'listing':
+            name = f"page-{name}" if name.isdigit() else 'page-1'
+        target = FIXTURES_DIR / version / kind / f"{name}.html"
+        target.parent.mkdir(parents=True, exist_ok=True)
+        response = session.get(url, timeout=30)
+        response.raise_for_status()
+        target.write_text(response.text, encoding='utf-8')
+        print(f"💾 {url} -> {target.relative_to(FIXTURES_DIR.parent)}")
+        time.sleep(2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark scraper parsers against a fixture corpus")
+    parser.add_argument('--corpus', default='v1', help='fixture corpus version under fixtures/')
+    parser.add_argument('--iterations', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help='with --check-throughput, fail when throughput drops by more than this fraction')
+    parser.add_argument('--check-throughput', action='store_true',
+                        help='fail on throughput regressions against a baseline saved on this machine')
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--update-expected', action='store_true')
+    parser.add_argument('--report', help='write the full results as JSON')
+    parser.add_argument('--record', nargs='+', metavar=('VERSION', 'URL'),
+                        help='fetch live pages into fixtures/VERSION')
+    args = parser.parse_args()
+
+    if args.record:
+        record(args.record[0], args.record[1:])
+        return
+
+    # Parsers log every page at INFO; keep the benchmark output readable
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    corpus = FIXTURES_DIR / args.corpus
+    expected_file = corpus / 'expected.json'
+    baseline_file = corpus / 'benchmark-baseline.json'
+    expected = load_json(expected_file)
+    baseline = load_json(baseline_file)
+
+    results = {}
+    failures = []
+    print(f"{'case':<42} {'ms/page':>9} {'pages/s':>10} {'peak KB':>9} {'allocs':>8}  status")
+    print("-" * 92)
+
+    for case_id, func in build_cases(corpus):
+        result = measure(func, args.iterations, args.rounds)
+        results[case_id] = result
+
+        status = 'ok'
+        if not args.update_expected and case_id in expected and expected[case_id] != result['output']:
+            status = 'OUTPUT CHANGED'
+            failures.append(f"{case_id}: output differs from expected.json")
+        base = baseline.get(case_id)
+        if (base and not args.save_baseline and 1000 / base >= NOISE_FLOOR_MS
+                and result['pages_per_sec'] < base * (1 - args.threshold)):
+            drop = 1 - result['pages_per_sec'] / base
+            if args.check_throughput:
+                status = f"SLOWER {drop:.0%}"
+                failures.append(f"{case_id}: throughput {result['pages_per_sec']} < baseline {base} (-{drop:.0%})")
+            elif status == 'ok':
+                status = f"ok ({drop:.0%} below baseline)"
+
+        print(f"{case_id:<42} {result['latency_ms']:>9.3f} {result['pages_per_sec']:>10.1f} "
+              f"{result['peak_kb']:>9.1f} {result['allocations']:>8}  {status}")
+
+    if args.update_expected:
+        expected_file.write_text(json.dumps({k: r['output'] for k, r in results.items()},
+                                            indent=2, sort_keys=True, ensure_ascii=False), encoding='utf-8')
+        print(f"💾 Expected outputs written to {expected_file}")
+    if args.save_baseline:
+        baseline_file.write_text(json.dumps({k: r['pages_per_sec'] for k, r in results.items()},
+                                            indent=2, sort_keys=True), encoding='utf-8')
+        print(f"💾 Baseline written to {baseline_file}")
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({k: {m: v for m, v in r.items() if m != 'output'} for k, r in results.items()}, f, indent=2)
+
+    if failures:
+        print("\n❌ Benchmark failed:")
+        for failure in failures:
+            print(f"   • {failure}")
+        sys.exit(1)
+    if args.check_throughput:
+        print("\n✅ All parser outputs match and throughput is within threshold")
+    else:
+        print("\n✅ All parser outputs match")
+
+
+if __name__ == "__main__":
+    main()
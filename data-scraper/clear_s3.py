@@ -6,6 +6,8 @@ Clear S3 bucket of strain images
 import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
+import metrics
+import profiling
 import os
 
 # Load environment variables
@@ -28,6 +30,7 @@ def init_s3_client():
             aws_secret_access_key=S3_CONFIG['SECRET_KEY'],
             region_name=S3_CONFIG['REGION']
         )
+        metrics.instrument_s3(s3_client)
         
         # Test connection
         s3_client.head_bucket(Bucket=S3_CONFIG['BUCKET'])
@@ -89,13 +92,20 @@ def main():
     print("🧹 S3 Strain Images Cleaner")
     print("=" * 30)
     
-    # Initialize S3 client
-    s3_client = init_s3_client()
-    if not s3_client:
-        return
-    
-    # Clear strain images
-    clear_strain_images(s3_client)
+    metrics.start_run('clear_s3')
+    try:
+        # Initialize S3 client
+        with profiling.stage('connect'):
+            s3_client = init_s3_client()
+        if not s3_client:
+            return
+        
+        # Clear strain images
+        with profiling.stage('clear'):
+            clear_strain_images(s3_client)
+    finally:
+        metrics.write_run_report('clear_s3')
 
 if __name__ == "__main__":
-    main()
+    with profiling.profile_run('clear_s3'):
+        main()
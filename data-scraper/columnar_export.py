@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the enhanced dataset
+Writes enhanced-data.json as one table per entity: strains, plus exploded
+strain_akas, strain_effects, strain_flavors, strain_terpenes, strain_conditions
+and strain_genetics keyed by strain_id. Vocabulary columns (type, effect, flavor,
+terpene, condition, ...) are dictionary-encoded. Each table is written as
+Parquet (zstd, for sharing and pandas/duckdb/polars) and as uncompressed Arrow
+IPC, which read_table memory-maps so single columns are scanned without copies.
+
+    python columnar_export.py                       # enhanced-data.json -> export/
+    python columnar_export.py --format parquet -o /tmp/export
+    python import_to_db.py export/                  # the importer accepts the export
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+import dataset_io
+import metrics
+import profiling
+from strain_identity import slug_from_url, slugify
+
+EXPORT_DIR = 'export'
+FORMATS = ('parquet', 'arrow', 'both')
+
+VOCAB = pa.dictionary(pa.int32(), pa.string())
+
+SCHEMAS = {
+    'strains': pa.schema([
+        ('strain_id', pa.int32()), ('name', pa.string()), ('slug', pa.string()), ('url', pa.string()),
+        ('type', VOCAB), ('thc', pa.string()), ('cbd', pa.string()), ('rating', pa.float64()),
+        ('review_count', pa.int32()), ('top_effect', VOCAB), ('category', VOCAB),
+        ('image_path', pa.string()), ('image_url', pa.string()), ('image_placeholder', pa.string()),
+        ('image_width', pa.int32()), ('image_height', pa.int32()), ('description', pa.string()),
+        ('detailed_review_count', pa.string()), ('grow_info', pa.string()), ('discovered_via', VOCAB),
+    ]),
+    'strain_akas': pa.schema([('strain_id', pa.int32()), ('position', pa.int16()), ('aka', pa.string())]),
+    'strain_effects': pa.schema([('strain_id', pa.int32()), ('kind', VOCAB), ('position', pa.int16()),
+                                 ('effect', VOCAB)]),
+    'strain_flavors': pa.schema([('strain_id', pa.int32()), ('position', pa.int16()), ('flavor', VOCAB)]),
+    'strain_terpenes': pa.schema([('strain_id', pa.int32()), ('position', pa.int16()), ('terpene', VOCAB),
+                                  ('type', VOCAB), ('description', VOCAB)]),
+    'strain_conditions': pa.schema([('strain_id', pa.int32()), ('position', pa.int16()), ('condition', VOCAB),
+                                    ('percentage', pa.float64())]),
+    'strain_genetics': pa.schema([('strain_id', pa.int32()), ('relation', VOCAB), ('position', pa.int16()),
+                                  ('name', pa.string()), ('slug', pa.string())]),
+}
+
+# Plain scalar fields copied straight into the strains table
+SCALAR_FIELDS = ('name', 'url', 'type', 'thc', 'cbd', 'rating', 'review_count', 'top_effect', 'category',
+                 'image_path', 'image_url', 'image_placeholder', 'image_width', 'image_height', 'description',
+                 'detailed_review_count', 'discovered_via')
+EFFECT_KINDS = {'positive': 'positive_effects', 'negative': 'negative_effects'}
+RELATIONS = {'parent': ('parents', 'parent_slugs'), 'child': ('children', 'child_slugs')}
+
+
+def to_tables(strains: List[Dict[str, Any]]) -> Dict[str, pa.Table]:
+    """Flatten the nested strain dicts into one column dict per table"""
+    rows = {name: {field.name: [] for field in schema} for name, schema in SCHEMAS.items()}
+
+    def add(table: str, **values):
+        for column, value in values.items():
+            rows[table][column].append(value)
+
+    for strain_id, strain in enumerate(strains):
+        record = {field: strain.get(field) for field in SCALAR_FIELDS}
+        grow_info = strain.get('grow_info')
+        add('strains', strain_id=strain_id, slug=slug_from_url(strain.get('url')) or slugify(strain.get('name')),
+            grow_info=json.dumps(grow_info, ensure_ascii=False) if grow_info else None, **record)
+
+        for position, aka in enumerate(strain.get('akas') or ()):
+            add('strain_akas', strain_id=strain_id, position=position, aka=aka)
+        for kind, field in EFFECT_KINDS.items():
+            for position, effect in enumerate(strain.get(field) or ()):
+                add('strain_effects', strain_id=strain_id, kind=kind, position=position, effect=effect)
+        for position, flavor in enumerate(strain.get('flavors') or ()):
+            add('strain_flavors', strain_id=strain_id, position=position, flavor=flavor)
+        for position, terpene in enumerate(strain.get('detailed_terpenes') or ()):
+            if not isinstance(terpene, dict):
+                terpene = {'name': terpene}
+            add('strain_terpenes', strain_id=strain_id, position=position, terpene=terpene.get('name'),
+                type=terpene.get('type'), description=terpene.get('description'))
+        for position, condition in enumerate(strain.get('helps_with') or ()):
+            add('strain_conditions', strain_id=strain_id, position=position,
+                condition=condition.get('condition'), percentage=condition.get('percentage'))
+        genetics = strain.get('genetics') or {}
+        for relation, (names_key, slugs_key) in RELATIONS.items():
+            names = genetics.get(names_key) or []
+            slugs = genetics.get(slugs_key) or []
+            if len(slugs) != len(names):
+                slugs = [None] * len(names)
+            for position, (name, slug) in enumerate(zip(names, slugs)):
+                add('strain_genetics', strain_id=strain_id, relation=relation, position=position,
+                    name=name, slug=slug)
+
+    return {name: pa.table(rows[name], schema=schema) for name, schema in SCHEMAS.items()}
+
+
+def write_tables(tables: Dict[str, pa.Table], directory: str = EXPORT_DIR, fmt: str = 'both'):
+    os.makedirs(directory, exist_ok=True)
+    for name, table in tables.items():
+        if fmt in ('parquet', 'both'):
+            pq.write_table(table, os.path.join(directory, f"{name}.parquet"), compression='zstd')
+        if fmt in ('arrow', 'both'):
+            # Uncompressed so memory-mapped reads are zero-copy
+            with pa.OSFile(os.path.join(directory, f"{name}.arrow"), 'wb') as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+
+
+def read_table(directory: str, name: str, columns: Optional[List[str]] = None) -> pa.Table:
+    """One exported table, memory-mapped from the Arrow file when there is one"""
+    arrow_path = os.path.join(directory, f"{name}.arrow")
+    if os.path.exists(arrow_path):
+        table = pa.ipc.open_file(pa.memory_map(arrow_path, 'r')).read_all()
+        return table.select(columns) if columns else table
+    return pq.read_table(os.path.join(directory, f"{name}.parquet"), columns=columns, memory_map=True)
+
+
+def _columns(table: pa.Table) -> Dict[str, list]:
+    return {name: table.column(name).to_pylist() for name in table.column_names}
+
+
+def _grouped(directory: str, name: str):
+    """Rows of an exploded table as (strain_id, row dict), in strain_id/position order"""
+    table = read_table(directory, name).sort_by([('strain_id', 'ascending'), ('position', 'ascending')])
+    columns = _columns(table)
+    for i, strain_id in enumerate(columns['strain_id']):
+        yield strain_id, {column: values[i] for column, values in columns.items()}
+
+
+def load_strains(path: str) -> List[Dict[str, Any]]:
+    """Rebuild enhanced-data.json-shaped strain dicts from an export directory"""
+    directory = path if os.path.isdir(path) else os.path.dirname(path) or '.'
+    columns = _columns(read_table(directory, 'strains'))
+
+    strains = []
+    for i in range(len(columns['strain_id'])):
+        strain = {field: columns[field][i] for field in SCALAR_FIELDS if columns[field][i] is not None}
+        if columns['grow_info'][i]:
+            strain['grow_info'] = json.loads(columns['grow_info'][i])
+        strains.append(strain)
+
+    for strain_id, row in _grouped(directory, 'strain_akas'):
+        strains[strain_id].setdefault('akas', []).append(row['aka'])
+    for strain_id, row in _grouped(directory, 'strain_effects'):
+        strains[strain_id].setdefault(EFFECT_KINDS[row['kind']], []).append(row['effect'])
+    for strain_id, row in _grouped(directory, 'strain_flavors'):
+        strains[strain_id].setdefault('flavors', []).append(row['flavor'])
+    for strain_id, row in _grouped(directory, 'strain_terpenes'):
+        terpene = {'name': row['terpene'], 'type': row['type'], 'description': row['description']}
+        strains[strain_id].setdefault('detailed_terpenes', []).append(
+            {key: value for key, value in terpene.items() if value is not None})
+    for strain_id, row in _grouped(directory, 'strain_conditions'):
+        percentage = row['percentage']
+        if percentage is not None and percentage.is_integer():
+            percentage = int(percentage)
+        strains[strain_id].setdefault('helps_with', []).append(
+            {'condition': row['condition'], 'percentage': percentage})
+    for strain_id, row in _grouped(directory, 'strain_genetics'):
+        names_key, slugs_key = RELATIONS[row['relation']]
+        genetics = strains[strain_id].setdefault('genetics', {})
+        genetics.setdefault(names_key, []).append(row['name'])
+        genetics.setdefault(slugs_key, []).append(row['slug'])
+    return strains
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the enhanced dataset as Parquet/Arrow tables")
+    parser.add_argument('--input', default='enhanced-data.json')
+    parser.add_argument('-o', '--output-dir', default=EXPORT_DIR)
+    parser.add_argument('--format', choices=FORMATS, default='both')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    metrics.start_run('columnar_export')
+    try:
+        with profiling.profile_run('columnar_export', args.profile or ''):
+            with profiling.stage('load'):
+                strains = dataset_io.load_strains(args.input)
+            with profiling.stage('export'):
+                tables = to_tables(strains)
+                write_tables(tables, args.output_dir, args.format)
+        print(f"📦 Exported {len(strains)} strains to {args.output_dir}/: " +
+              ', '.join(f"{name} {table.num_rows}" for name, table in tables.items()))
+    finally:
+        metrics.write_run_report('columnar_export')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Time-budgeted priority crawl scheduler
+Ranks every strain in data.json by popularity (review count), staleness (from
+refresh-state.json) and known data gaps, keeps the ranking in a persistent
+priority queue (crawl-queue.json) and refetches detail pages in that order until
+the time or request budget runs out. Interrupted or budget-limited runs resume
+where they stopped; the queue is rebuilt once it is drained or older than a day.
+
+    python crawl_scheduler.py --time-budget 2h
+    python crawl_scheduler.py --max-requests 300 --delay 5
+"""
+
+import argparse
+import heapq
+import json
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+import dataset_io
+import metrics
+import profiling
+from audit_dataset import FIELD_WEIGHTS, field_presence
+from enhanced_scraper import EnhancedLeaflyStrainScraper
+from refresh import STATE_FILE, DAY, fingerprint, strain_key, load_state, save_state, with_discovered
+
+logger = logging.getLogger(__name__)
+
+QUEUE_FILE = 'crawl-queue.json'
+REBUILD_AFTER = DAY
+# A failed fetch is retried after 5 min, 10 min, 20 min, ... and dropped after MAX_ATTEMPTS
+RETRY_BACKOFF = 300
+MAX_ATTEMPTS = 5
+
+# Staleness saturates here (in multiples of max age); never-fetched strains get the maximum
+MAX_STALENESS = 3.0
+# Share of the score carried by data gaps, relative to one max-age period of staleness
+GAP_WEIGHT = 1.0 / sum(FIELD_WEIGHTS.values())
+
+
+def parse_duration(value: str) -> float:
+    """'90' (seconds), '45m' or '2h' -> seconds"""
+    units = {'s': 1, 'm': 60, 'h': 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def score_strains(listing: List[Dict[str, Any]], enhanced: Dict[str, Dict[str, Any]],
+                  state: Dict[str, Dict[str, Any]], max_age_days: float,
+                  now: Optional[float] = None) -> np.ndarray:
+    """Crawl priority per listing strain: popularity x (staleness + gaps)"""
+    now = time.time() if now is None else now
+    records = [enhanced.get(strain_key(s)) or s for s in listing]
+
+    reviews = np.array([float(s.get('review_count') or 0) for s in listing])
+    fetched_at = np.array([(state.get(strain_key(s)) or {}).get('fetched_at', np.nan) for s in listing])
+    staleness = np.where(np.isnan(fetched_at), MAX_STALENESS,
+                         np.clip((now - fetched_at) / (max_age_days * DAY), 0, MAX_STALENESS))
+    gaps = ~field_presence(records) @ np.array(list(FIELD_WEIGHTS.values()))
+
+    return (np.log1p(reviews) + 1.0) * (staleness + GAP_WEIGHT * gaps)
+
+
+class CrawlQueue:
+    """Max-priority queue of strain keys persisted as JSON between runs
+
+    Entries are [-priority, position, key] plus an attempt count once a fetch has
+    failed; failed entries wait in a second heap ordered by retry time.
+    """
+
+    def __init__(self, filename: str = QUEUE_FILE):
+        self.filename = filename
+        self.heap: List[List] = []
+        self.deferred: List[List] = []
+        self.built_at = 0.0
+
+    def load(self) -> 'CrawlQueue':
+        try:
+            with open(self.filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.heap = [list(entry) for entry in data['queue']]
+            self.deferred = [list(entry) for entry in data.get('deferred', [])]
+            heapq.heapify(self.heap)
+            heapq.heapify(self.deferred)
+            self.built_at = data['built_at']
+        except (FileNotFoundError, json.JSONDecodeError, KeyError):
+            self.heap, self.deferred, self.built_at = [], [], 0.0
+        return self
+
+    def save(self):
+        with open(self.filename + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump({'built_at': self.built_at, 'queue': self.heap, 'deferred': self.deferred},
+                      f, separators=(',', ':'))
+        os.replace(self.filename + '.tmp', self.filename)
+
+    def rebuild(self, keys: List[str], scores: np.ndarray):
+        # heapq is a min-heap, so priorities are stored negated; position breaks ties stably
+        self.heap = [[-round(float(score), 6), i, key] for i, (key, score) in enumerate(zip(keys, scores))]
+        heapq.heapify(self.heap)
+        self.deferred = []
+        self.built_at = time.time()
+
+    def needs_rebuild(self) -> bool:
+        return (not self.heap and not self.deferred) or time.time() - self.built_at > REBUILD_AFTER
+
+    def pop(self) -> Optional[List]:
+        """Highest-priority entry that is due, or None while only backed-off retries remain"""
+        now = time.time()
+        while self.deferred and self.deferred[0][0] <= now:
+            heapq.heappush(self.heap, heapq.heappop(self.deferred)[1:])
+        return heapq.heappop(self.heap) if self.heap else None
+
+    def retry(self, entry: List) -> bool:
+        """Requeue a failed fetch with exponential backoff; False once it has failed MAX_ATTEMPTS times"""
+        attempts = (entry[3] if len(entry) > 3 else 0) + 1
+        if attempts >= MAX_ATTEMPTS:
+            return False
+        heapq.heappush(self.deferred, [time.time() + RETRY_BACKOFF * 2 ** (attempts - 1)] + entry[:3] + [attempts])
+        return True
+
+    def __len__(self) -> int:
+        return len(self.heap) + len(self.deferred)
+
+
+class Budget:
+    """Stops before a request that would likely overrun the time budget"""
+
+    def __init__(self, seconds: Optional[float] = None, requests: Optional[int] = None):
+        self.deadline = time.monotonic() + seconds if seconds else None
+        self.requests = requests
+        self.used = 0
+        self.average = 0.0
+
+    def allows_next(self) -> bool:
+        if self.requests is not None and self.used >= self.requests:
+            return False
+        return self.deadline is None or time.monotonic() + self.average <= self.deadline
+
+    def record(self, seconds: float):
+        self.used += 1
+        self.average = seconds if self.used == 1 else 0.8 * self.average + 0.2 * seconds
+
+
+def load_listing(filename: str) -> List[Dict[str, Any]]:
+    return dataset_io.load_strains(filename)
+
+
+def load_enhanced(filename: str) -> List[Dict[str, Any]]:
+    try:
+        return dataset_io.load_strains(filename)
+    except FileNotFoundError:
+        return []
+
+
+def crawl(args, scraper: Optional[EnhancedLeaflyStrainScraper] = None) -> int:
+    """Refetch strains in priority order under the budget; returns pages fetched"""
+    listing = load_listing(args.input)
+    by_key = {strain_key(s): s for s in listing}
+    enhanced_list = load_enhanced(args.output)
+    enhanced = {strain_key(s): s for s in enhanced_list}
+    state = load_state(args.state_file)
+
+    crawl_queue = CrawlQueue(args.queue_file).load()
+    if args.rebuild or crawl_queue.needs_rebuild():
+        crawl_queue.rebuild(list(by_key), score_strains(listing, enhanced, state, args.max_age_days))
+        logger.info(f"Rebuilt crawl queue with {len(crawl_queue)} strains")
+
+    scraper = scraper or EnhancedLeaflyStrainScraper(request_delay=0)
+    budget = Budget(args.time_budget, args.max_requests)
+    fetched = 0
+    try:
+        while budget.allows_next():
+            entry = crawl_queue.pop()
+            if entry is None:
+                break  # empty, or only retries still backing off
+            key = entry[2]
+            basic = by_key.get(key)
+            if basic is None:
+                continue  # dropped from the listing since the queue was built
+
+            started = time.monotonic()
+            result = scraper.scrape_strain_details(basic)
+            if result is not basic:
+                enhanced[key] = result
+                state[key] = {'fingerprint': fingerprint(basic), 'fetched_at': time.time()}
+                fetched += 1
+            elif not crawl_queue.retry(entry):
+                logger.warning(f"Giving up on {key} after {MAX_ATTEMPTS} failed fetches until the next rebuild")
+            if args.delay:
+                time.sleep(args.delay)
+            budget.record(time.monotonic() - started)
+    except KeyboardInterrupt:
+        logger.info("Crawl interrupted; saving progress")
+    finally:
+        crawl_queue.save()
+        save_state(state, args.state_file)
+        scraper.enhanced_data = with_discovered([enhanced.get(strain_key(s)) or s for s in listing
+                                                 if strain_key(s) in enhanced], enhanced.values())
+        scraper.save_enhanced_data(args.output)
+
+    logger.info(f"Fetched {fetched} pages in {budget.used} requests; {len(crawl_queue)} strains left in the queue")
+    return fetched
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Refetch detail pages in priority order under a crawl budget")
+    parser.add_argument('--time-budget', type=parse_duration, help="e.g. 3600, 45m or 2h")
+    parser.add_argument('--max-requests', type=int, help='stop after this many detail requests')
+    parser.add_argument('--delay', type=float, default=10, help='seconds between requests')
+    parser.add_argument('--max-age-days', type=float, default=30, help='age at which a page counts as fully stale')
+    parser.add_argument('--rebuild', action='store_true', help='re-score the queue even if it is fresh')
+    parser.add_argument('--input', default='data.json')
+    parser.add_argument('--output', default='enhanced-data.json')
+    parser.add_argument('--state-file', default=STATE_FILE)
+    parser.add_argument('--queue-file', default=QUEUE_FILE)
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+    if args.time_budget is None and args.max_requests is None:
+        logger.warning("No --time-budget or --max-requests given; crawling until the queue is empty")
+    metrics.start_run('crawl_scheduler')
+    try:
+        with profiling.profile_run('crawl_scheduler', args.profile or ''):
+            crawl(args)
+    finally:
+        metrics.write_run_report('crawl_scheduler')
+
+
+if __name__ == "__main__":
+    main()
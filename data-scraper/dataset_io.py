@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Typed dataset codec
+One schema for data.json, enhanced-data.json and enhanced-data-updated.json,
+decoded with msgspec into plain dicts and lists, then validated against it in a
+second pass (a wrong type fails with its JSON path, e.g. `$.enhanced_strains[12].rating`)
+and written compactly and atomically. The schema only validates: keys outside it
+are kept as they are and logged, so a new scraper field is never lost on a
+round trip but still shows up as something to add here.
+
+    strains = dataset_io.load_strains('enhanced-data.json')
+    dataset_io.save_strains(strains, 'enhanced-data.json')
+"""
+
+import gc
+import logging
+import os
+import time
+from typing import Any, Dict, List, Optional, TypedDict, Union
+
+import msgspec
+
+logger = logging.getLogger(__name__)
+
+# Raised for malformed JSON and for schema violations (ValidationError is a subclass)
+DecodeError = msgspec.DecodeError
+
+Number = Union[int, float]
+
+
+class Terpene(TypedDict, total=False):
+    name: str
+    type: Optional[str]
+    description: Optional[str]
+
+
+class Condition(TypedDict, total=False):
+    condition: str
+    percentage: Number
+
+
+class Genetics(TypedDict, total=False):
+    parents: List[str]
+    children: List[str]
+    parent_slugs: List[Optional[str]]
+    child_slugs: List[Optional[str]]
+
+
+class Strain(TypedDict, total=False):
+    # Listing fields (main.py)
+    name: str
+    url: Optional[str]
+    type: Optional[str]
+    thc: Optional[str]
+    cbd: Optional[str]
+    akas: List[str]
+    rating: Optional[Number]
+    review_count: Optional[int]
+    top_effect: Optional[str]
+    category: Optional[str]
+    # Detail page fields (enhanced_scraper.py, missing_data_scraper.py)
+    image_path: Optional[str]
+    image_url: Optional[str]
+    # image_placeholders.py
+    image_placeholder: Optional[str]
+    image_width: Optional[int]
+    image_height: Optional[int]
+    description: Optional[str]
+    positive_effects: List[str]
+    negative_effects: List[str]
+    flavors: List[str]
+    # Older files stored bare terpene names
+    detailed_terpenes: List[Union[Terpene, str]]
+    helps_with: List[Condition]
+    genetics: Genetics
+    grow_info: Dict[str, Any]
+    detailed_review_count: Optional[str]
+    discovered_via: str
+    # keyword_tagger.py: conditions mentioned in the description, kept apart from helps_with
+    mined_conditions: List[str]
+
+
+class DatasetFile(TypedDict, total=False):
+    total_strains: int
+    scrape_timestamp: str
+    missing_data_update_timestamp: str
+    updated_strains_count: int
+    strains: List[Strain]
+    enhanced_strains: List[Strain]
+
+
+Dataset = Union[DatasetFile, List[Strain]]
+
+def _enc_hook(obj: Any) -> Any:
+    # strain_record.StrainRecord is written through its JSON shape
+    to_dict = getattr(obj, 'to_dict', None)
+    if to_dict is None:
+        raise TypeError(f"Encoding objects of type {type(obj).__name__} is unsupported")
+    return to_dict()
+
+
+_decoder = msgspec.json.Decoder()
+_encoder = msgspec.json.Encoder(enc_hook=_enc_hook)
+
+
+def unknown_keys(data: Dataset) -> List[str]:
+    """Top-level and strain keys that the schema does not declare"""
+    keys = set()
+    if isinstance(data, dict):
+        keys.update(data.keys() - DatasetFile.__annotations__.keys())
+    for strain in strains_of(data):
+        if isinstance(strain, dict):
+            keys.update(strain.keys() - Strain.__annotations__.keys())
+    return sorted(keys)
+
+
+def decode(buf: bytes) -> Dataset:
+    # The decoded tree has no reference cycles; pausing the collector while it is
+    # built avoids repeated generation scans over hundreds of thousands of new objects
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        data = _decoder.decode(buf)
+        # Second pass: validate against the schema; the typed copy is dropped and the raw
+        # tree returned, since it still has every key
+        msgspec.convert(data, Dataset)
+    finally:
+        if enabled:
+            gc.enable()
+    unknown = unknown_keys(data)
+    if unknown:
+        logger.warning(f"Keys outside the dataset schema (kept, not validated): {', '.join(unknown)}")
+    return data
+
+
+def encode(data: Any, indent: Optional[int] = None) -> bytes:
+    buf = _encoder.encode(data)
+    return msgspec.json.format(buf, indent=indent) if indent else buf
+
+
+def load(filename: str) -> Dataset:
+    """Decode and validate a whole dataset file"""
+    with open(filename, 'rb') as f:
+        return decode(f.read())
+
+
+def strains_of(data: Dataset) -> List[Strain]:
+    """The strain list of any dataset file (listing, enhanced or a bare array)"""
+    if isinstance(data, list):
+        return data
+    if 'enhanced_strains' in data:
+        return data['enhanced_strains']
+    return data.get('strains', [])
+
+
+def load_strains(filename: str) -> List[Strain]:
+    return strains_of(load(filename))
+
+
+def dump(data: Any, filename: str, indent: Optional[int] = None):
+    """Write a dataset file through a temp file so readers never see a partial one"""
+    with open(filename + '.tmp', 'wb') as f:
+        f.write(encode(data, indent))
+    os.replace(filename + '.tmp', filename)
+
+
+def save_strains(strains: List[Strain], filename: str, key: str = 'enhanced_strains',
+                 indent: Optional[int] = None, **fields):
+    """Write strains with the usual total_strains/scrape_timestamp header"""
+    data = {'total_strains': len(strains), 'scrape_timestamp': time.strftime('%Y-%m-%d %H:%M:%S')}
+    data.update(fields)
+    data[key] = strains
+    dump(data, filename, indent)
@@ -5,21 +5,264 @@ Reads data.json and scrapes detailed information from each strain's individual p
 """
 
 import requests
+import bs4
 from bs4 import BeautifulSoup
-import json
+import argparse
 import time
 import re
 from urllib.parse import urljoin
 import logging
+import dataset_io
+import metrics
+import profiling
+import strain_record
 import os
 from pathlib import Path
+from rate_limiter import retry_after, throttle, MAX_THROTTLE_RETRIES
+from parse_memo import ParseMemo, PartialParse, PARSE_MEMO_FILE, parser_version
+from keyword_tagger import KeywordTagger, FLAVOR_KEYWORDS, variants
+from strain_identity import StrainIdentityIndex, INDEX_FILE, slug_from_url
+from refresh import (STATE_FILE, fingerprint, strain_key, load_state, save_state, seed_state, plan_refresh,
+                     with_discovered)
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Flavors for pages without a flavors section, matched as whole words in the description
+FLAVOR_TAGGER = KeywordTagger.from_keywords('flavors', FLAVOR_KEYWORDS)
+
+
+def parse_detail_page(html_content):
+    """Fields parsed from a strain page; depends only on the HTML, so results are memoized"""
+    soup = BeautifulSoup(html_content, 'html.parser')
+    fields = {}
+    
+    try:
+        # Extract main strain image
+        image_url = None
+        main_image = soup.find('img', {'data-testid': 'image-picture-image'})
+        if main_image and main_image.get('srcset'):
+            # Get the highest quality image from srcset
+            srcset = main_image['srcset']
+            # Parse srcset to get the highest resolution image
+            srcset_parts = srcset.split(',')
+            if srcset_parts:
+                # Take the first URL (usually highest quality)
+                image_url = srcset_parts[0].strip().split(' ')[0]
+        elif main_image and main_image.get('src'):
+            image_url = main_image['src']
+        
+        if image_url:
+            fields['image_url'] = image_url
+        
+        # Extract description
+        description_container = soup.find('div', {'data-testid': 'strain-description-container'})
+        if description_container:
+            description_text = description_container.get_text(strip=True)
+            fields['description'] = description_text
+        
+        # Extract detailed effects (positive and negative)
+        effects_section = soup.find('section', id=lambda x: x and 'strain-sensations' in x)
+        if not effects_section:
+            effects_section = soup.find('div', id='strain-sensations-section')
+        
+        if effects_section:
+            # Positive effects
+            positive_effects = []
+            positive_section = effects_section.find('h3', string=lambda x: x and 'Positive Effects' in x)
+            if positive_section:
+                effects_container = positive_section.find_next('div', class_='row')
+                if effects_container:
+                    effect_links = effects_container.find_all('a', {'data-testid': 'icon-tile-link'})
+                    for link in effect_links:
+                        effect_name = link.find('p', {'data-testid': 'item-name'})
+                        if effect_name:
+                            positive_effects.append(effect_name.get_text(strip=True).title())
+            
+            # Negative effects
+            negative_effects = []
+            negative_section = effects_section.find('h3', string=lambda x: x and 'Negative Effects' in x)
+            if negative_section:
+                effects_container = negative_section.find_next('div', class_='row')
+                if effects_container:
+                    effect_links = effects_container.find_all('a', {'data-testid': 'icon-tile-link'})
+                    for link in effect_links:
+                        effect_name = link.find('p', {'data-testid': 'item-name'})
+                        if effect_name:
+                            negative_effects.append(effect_name.get_text(strip=True).title())
+            
+            fields['positive_effects'] = positive_effects
+            fields['negative_effects'] = negative_effects
+        
+        # Extract flavors
+        flavors = []
+        
+        # Look for flavors section by finding the h2 with "strain flavors"
+        flavors_section = soup.find('h2', string=lambda x: x and 'strain flavors' in x)
+        if flavors_section:
+            flavors_container = flavors_section.find_next('div', class_='row')
+            if flavors_container:
+                flavor_links = flavors_container.find_all('a', {'data-testid': 'icon-tile-link'})
+                for link in flavor_links:
+                    flavor_name = link.find('p', {'data-testid': 'item-name'})
+                    if flavor_name:
+                        flavor_text = flavor_name.get_text(strip=True).title()
+                        if not flavor_text.startswith('Loading'):
+                            flavors.append(flavor_text)
+        
+        # Alternative: Extract flavors from description text
+        if not flavors and fields.get('description'):
+            flavors = FLAVOR_TAGGER.tag(fields['description'])['flavors']
+        
+        fields['flavors'] = flavors
+        
+        # Extract terpenes with more detail
+        terpenes = []
+        
+        # Look for terpenes in the science section
+        terpenes_section = soup.find('h3', string=lambda x: x and 'terpenes' in x)
+        if terpenes_section:
+            # Find the parent container and look for terpene info
+            terpene_container = terpenes_section.find_next('div')
+            if terpene_container:
+                # Look for individual terpene entries
+                terpene_entries = terpene_container.find_all('div', class_='flex relative mb-sm')
+                for entry in terpene_entries:
+                    terpene_info = {}
+                    name_element = entry.find('span', class_='font-bold')
+                    if name_element:
+                        terpene_info['name'] = name_element.get_text(strip=True)
+                        
+                        # Get terpene type/flavor (in parentheses)
+                        type_element = entry.find('span', class_='text-grey')
+                        if type_element:
+                            type_text = type_element.get_text(strip=True)
+                            if type_text.startswith('(') and type_text.endswith(')'):
+                                terpene_info['type'] = type_text[1:-1]
+                        
+                        # Get description if available
+                        desc_element = entry.find('div', class_='text-xs')
+                        if desc_element:
+                            desc_text = desc_element.get_text(strip=True)
+                            if desc_text and not desc_text.startswith('('):
+                                terpene_info['description'] = desc_text
+                        
+                        terpenes.append(terpene_info)
+        
+        # Alternative: look for terpenes in the top section
+        if not terpenes:
+            terpene_elements = soup.find_all('div', class_='inline-flex relative mb-sm mr-[24px]')
+            for elem in terpene_elements:
+                terpene_name = elem.get_text(strip=True)
+                if terpene_name:
+                    terpenes.append({'name': terpene_name, 'type': '', 'description': ''})
+        
+        fields['detailed_terpenes'] = terpenes
+        
+        # Extract "helps with" conditions
+        helps_with = []
+        helps_section = soup.find('div', id='helps-with-section')
+        if helps_section:
+            condition_items = helps_section.find_all('li', class_='mb-xl')
+            for item in condition_items:
+                condition_link = item.find('a', class_='font-bold underline')
+                percentage_text = item.find('span', class_='font-bold')
+                if condition_link and percentage_text:
+                    condition_name = condition_link.get_text(strip=True)
+                    percentage_str = percentage_text.get_text(strip=True)
+                    # Convert percentage to number (remove % sign)
+                    try:
+                        percentage_num = int(percentage_str.replace('%', '').strip())
+                    except ValueError:
+                        percentage_num = 0
+                    
+                    helps_with.append({
+                        'condition': condition_name,
+                        'percentage': percentage_num
+                    })
+        
+        fields['helps_with'] = helps_with
+        
+        # Extract genetics/lineage
+        genetics = {}
+        lineage_section = soup.find('section', id='strain-lineage-section')
+        if lineage_section:
+            parents = []
+            children = []
+            parent_slugs = []
+            child_slugs = []
+            
+            # Look for strain links in lineage section
+            strain_links = lineage_section.find_all('a', href=lambda x: x and '/strains/' in x)
+            for link in strain_links:
+                # Get strain name from the href
+                href = link.get('href', '')
+                if '/strains/' in href:
+                    strain_slug = slug_from_url(href)
+                    strain_name = strain_slug.replace('-', ' ').title()
+                    
+                    # Check if it's a parent or child
+                    type_elem = link.find('div', class_='text-green text-xs')
+                    if type_elem:
+                        type_text = type_elem.get_text(strip=True)
+                        if type_text == 'parent':
+                            parents.append(strain_name)
+                            parent_slugs.append(strain_slug)
+                        elif type_text == 'child':
+                            children.append(strain_name)
+                            child_slugs.append(strain_slug)
+            
+            genetics['parents'] = parents
+            genetics['children'] = children
+            # Keep the raw slugs so lineage_graph.py can resolve canonical strains
+            genetics['parent_slugs'] = parent_slugs
+            genetics['child_slugs'] = child_slugs
+        
+        fields['genetics'] = genetics
+        
+        # Extract grow information
+        grow_info = {}
+        grow_section = soup.find('section', id='strain-grow-info-section')
+        if grow_section:
+            grow_notes = grow_section.find('div', {'data-testid': 'grow-notes'})
+            if grow_notes:
+                grow_info['notes'] = grow_notes.get_text(strip=True)
+        
+        fields['grow_info'] = grow_info
+        
+        # Extract rating details
+        rating_element = soup.find('span', string=lambda x: x and 'ratings' in x)
+        if rating_element:
+            rating_text = rating_element.get_text(strip=True)
+            # Extract number from text like "(2,631 ratings)"
+            rating_match = re.search(r'\(([0-9,]+)\s+ratings?\)', rating_text)
+            if rating_match:
+                fields['detailed_review_count'] = rating_match.group(1)
+        
+    except Exception as e:
+        logger.error(f"Error extracting detailed info: {e}")
+        raise PartialParse(fields)
+    return fields
+
+
+def parse_detail_fields(html_content):
+    """parse_detail_page without a memo: the partial fields when it fails part-way"""
+    try:
+        return parse_detail_page(html_content)
+    except PartialParse as e:
+        return e.record
+
+
+# Changes whenever parse_detail_page, a helper it calls, the flavor vocabulary or BeautifulSoup
+# changes, invalidating memoized results
+PARSER_VERSION = parser_version(parse_detail_page, slug_from_url, KeywordTagger, variants,
+                                extra=bs4.__version__ + FLAVOR_TAGGER.fingerprint)
+
+
 class EnhancedLeaflyStrainScraper:
-    def __init__(self):
+    def __init__(self, download_images=True, request_delay=10, images_dir="images", index_file=INDEX_FILE,
+                 parse_memo_file=PARSE_MEMO_FILE):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -30,15 +273,20 @@ class EnhancedLeaflyStrainScraper:
             'Upgrade-Insecure-Requests': '1',
         })
         self.enhanced_data = []
-        self.images_dir = Path("images")
+        self.download_images = download_images
+        self.request_delay = request_delay
+        self.images_dir = Path(images_dir)
         self.images_dir.mkdir(exist_ok=True)
+        self.index_file = index_file
+        self.identity_index = StrainIdentityIndex.load(index_file) if index_file else StrainIdentityIndex()
+        self.parse_memo = ParseMemo(parse_memo_file, PARSER_VERSION) if parse_memo_file else None
+        # Set by concurrent callers so a 429 pauses their shared request budget
+        self.rate_limiter = None
 
     def load_basic_data(self, filename="data.json"):
         """Load the basic strain data from JSON file"""
         try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('strains', [])
+            return dataset_io.load_strains(filename)
         except Exception as e:
             logger.error(f"Error loading basic data: {e}")
             return []
@@ -47,23 +295,29 @@ class EnhancedLeaflyStrainScraper:
         """Fetch a page with error handling"""
         try:
             logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=30)
+            for attempt in range(MAX_THROTTLE_RETRIES + 1):
+                with metrics.timer('fetch_seconds', kind='detail'):
+                    response = self.session.get(url, timeout=30)
+                metrics.inc('fetch_requests_total', kind='detail', status=response.status_code)
+                metrics.inc('fetch_bytes_total', len(response.content), kind='detail')
+                delay = retry_after(response)
+                if delay is None or attempt == MAX_THROTTLE_RETRIES:
+                    break
+                logger.warning(f"Throttled ({response.status_code}) on {url}; backing off {delay:.0f}s")
+                throttle(self.rate_limiter, delay)
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
             return None
 
-    def download_image(self, image_url, strain_name):
-        """Download strain image and save with strain name"""
+    def download_image(self, image_url, strain_data):
+        """Download strain image and save under the strain's canonical slug"""
+        strain_name = strain_data.get('name', 'unknown')
         try:
             if not image_url:
                 return None
             
-            # Clean strain name for filename
-            safe_name = re.sub(r'[^\w\s-]', '', strain_name).strip()
-            safe_name = re.sub(r'[-\s]+', '_', safe_name).lower()
-            
             # Get image extension from URL
             if '?' in image_url:
                 image_url_clean = image_url.split('?')[0]
@@ -80,7 +334,7 @@ class EnhancedLeaflyStrainScraper:
             else:
                 ext = '.jpg'  # default
             
-            filename = f"{safe_name}{ext}"
+            filename = self.identity_index.image_filename(strain_data, ext)
             filepath = self.images_dir / filename
             
             # Skip if file already exists
@@ -90,7 +344,10 @@ class EnhancedLeaflyStrainScraper:
             
             # Download image
             logger.info(f"Downloading image: {image_url}")
-            response = self.session.get(image_url, timeout=30)
+            with metrics.timer('fetch_seconds', kind='image'):
+                response = self.session.get(image_url, timeout=30)
+            metrics.inc('fetch_requests_total', kind='image', status=response.status_code)
+            metrics.inc('fetch_bytes_total', len(response.content), kind='image')
             response.raise_for_status()
             
             # Save image
@@ -106,224 +363,23 @@ class EnhancedLeaflyStrainScraper:
 
     def extract_detailed_info(self, html_content, basic_strain_data):
         """Extract detailed information from strain page HTML"""
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if self.parse_memo is not None:
+            fields = self.parse_memo.parse(html_content, parse_detail_page)
+        else:
+            fields = parse_detail_fields(html_content)
         
         # Start with basic data
         enhanced_strain = basic_strain_data.copy()
         
-        try:
-            # Extract main strain image
-            image_url = None
-            main_image = soup.find('img', {'data-testid': 'image-picture-image'})
-            if main_image and main_image.get('srcset'):
-                # Get the highest quality image from srcset
-                srcset = main_image['srcset']
-                # Parse srcset to get the highest resolution image
-                srcset_parts = srcset.split(',')
-                if srcset_parts:
-                    # Take the first URL (usually highest quality)
-                    image_url = srcset_parts[0].strip().split(' ')[0]
-            elif main_image and main_image.get('src'):
-                image_url = main_image['src']
-            
-            # Download image if found
+        # Download image if found
+        if fields.get('image_url'):
             image_path = None
-            if image_url:
-                image_path = self.download_image(image_url, basic_strain_data.get('name', 'unknown'))
-                enhanced_strain['image_path'] = image_path
-                enhanced_strain['image_url'] = image_url
-            
-            # Extract description
-            description_container = soup.find('div', {'data-testid': 'strain-description-container'})
-            if description_container:
-                description_text = description_container.get_text(strip=True)
-                enhanced_strain['description'] = description_text
-            
-            # Extract detailed effects (positive and negative)
-            effects_section = soup.find('section', id=lambda x: x and 'strain-sensations' in x)
-            if not effects_section:
-                effects_section = soup.find('div', id='strain-sensations-section')
-            
-            if effects_section:
-                # Positive effects
-                positive_effects = []
-                positive_section = effects_section.find('h3', string=lambda x: x and 'Positive Effects' in x)
-                if positive_section:
-                    effects_container = positive_section.find_next('div', class_='row')
-                    if effects_container:
-                        effect_links = effects_container.find_all('a', {'data-testid': 'icon-tile-link'})
-                        for link in effect_links:
-                            effect_name = link.find('p', {'data-testid': 'item-name'})
-                            if effect_name:
-                                positive_effects.append(effect_name.get_text(strip=True).title())
-                
-                # Negative effects
-                negative_effects = []
-                negative_section = effects_section.find('h3', string=lambda x: x and 'Negative Effects' in x)
-                if negative_section:
-                    effects_container = negative_section.find_next('div', class_='row')
-                    if effects_container:
-                        effect_links = effects_container.find_all('a', {'data-testid': 'icon-tile-link'})
-                        for link in effect_links:
-                            effect_name = link.find('p', {'data-testid': 'item-name'})
-                            if effect_name:
-                                negative_effects.append(effect_name.get_text(strip=True).title())
-                
-                enhanced_strain['positive_effects'] = positive_effects
-                enhanced_strain['negative_effects'] = negative_effects
-            
-            # Extract flavors
-            flavors = []
-            
-            # Look for flavors section by finding the h2 with "strain flavors"
-            flavors_section = soup.find('h2', string=lambda x: x and 'strain flavors' in x)
-            if flavors_section:
-                flavors_container = flavors_section.find_next('div', class_='row')
-                if flavors_container:
-                    flavor_links = flavors_container.find_all('a', {'data-testid': 'icon-tile-link'})
-                    for link in flavor_links:
-                        flavor_name = link.find('p', {'data-testid': 'item-name'})
-                        if flavor_name:
-                            flavor_text = flavor_name.get_text(strip=True).title()
-                            if not flavor_text.startswith('Loading'):
-                                flavors.append(flavor_text)
-            
-            # Alternative: Extract flavors from description text
-            if not flavors and enhanced_strain.get('description'):
-                description = enhanced_strain['description']
-                # Look for flavor keywords in description
-                flavor_keywords = ['vanilla', 'pepper', 'butter', 'lemon', 'citrus', 'berry', 'sweet', 'sour', 'earthy', 'pine', 'diesel', 'cheese', 'mint', 'chocolate', 'coffee', 'grape', 'apple', 'cherry', 'orange', 'tropical', 'floral', 'spicy', 'herbal']
-                
-                for keyword in flavor_keywords:
-                    if keyword.lower() in description.lower():
-                        flavors.append(keyword.title())
-                
-                # Remove duplicates while preserving order
-                flavors = list(dict.fromkeys(flavors))
-            
-            enhanced_strain['flavors'] = flavors
-            
-            # Extract terpenes with more detail
-            terpenes = []
-            
-            # Look for terpenes in the science section
-            terpenes_section = soup.find('h3', string=lambda x: x and 'terpenes' in x)
-            if terpenes_section:
-                # Find the parent container and look for terpene info
-                terpene_container = terpenes_section.find_next('div')
-                if terpene_container:
-                    # Look for individual terpene entries
-                    terpene_entries = terpene_container.find_all('div', class_='flex relative mb-sm')
-                    for entry in terpene_entries:
-                        terpene_info = {}
-                        name_element = entry.find('span', class_='font-bold')
-                        if name_element:
-                            terpene_info['name'] = name_element.get_text(strip=True)
-                            
-                            # Get terpene type/flavor (in parentheses)
-                            type_element = entry.find('span', class_='text-grey')
-                            if type_element:
-                                type_text = type_element.get_text(strip=True)
-                                if type_text.startswith('(') and type_text.endswith(')'):
-                                    terpene_info['type'] = type_text[1:-1]
-                            
-                            # Get description if available
-                            desc_element = entry.find('div', class_='text-xs')
-                            if desc_element:
-                                desc_text = desc_element.get_text(strip=True)
-                                if desc_text and not desc_text.startswith('('):
-                                    terpene_info['description'] = desc_text
-                            
-                            terpenes.append(terpene_info)
-            
-            # Alternative: look for terpenes in the top section
-            if not terpenes:
-                terpene_elements = soup.find_all('div', class_='inline-flex relative mb-sm mr-[24px]')
-                for elem in terpene_elements:
-                    terpene_name = elem.get_text(strip=True)
-                    if terpene_name:
-                        terpenes.append({'name': terpene_name, 'type': '', 'description': ''})
-            
-            enhanced_strain['detailed_terpenes'] = terpenes
-            
-            # Extract "helps with" conditions
-            helps_with = []
-            helps_section = soup.find('div', id='helps-with-section')
-            if helps_section:
-                condition_items = helps_section.find_all('li', class_='mb-xl')
-                for item in condition_items:
-                    condition_link = item.find('a', class_='font-bold underline')
-                    percentage_text = item.find('span', class_='font-bold')
-                    if condition_link and percentage_text:
-                        condition_name = condition_link.get_text(strip=True)
-                        percentage_str = percentage_text.get_text(strip=True)
-                        # Convert percentage to number (remove % sign)
-                        try:
-                            percentage_num = int(percentage_str.replace('%', '').strip())
-                        except ValueError:
-                            percentage_num = 0
-                        
-                        helps_with.append({
-                            'condition': condition_name,
-                            'percentage': percentage_num
-                        })
-            
-            enhanced_strain['helps_with'] = helps_with
-            
-            # Extract genetics/lineage
-            genetics = {}
-            lineage_section = soup.find('section', id='strain-lineage-section')
-            if lineage_section:
-                parents = []
-                children = []
-                
-                # Look for strain links in lineage section
-                strain_links = lineage_section.find_all('a', href=lambda x: x and '/strains/' in x)
-                for link in strain_links:
-                    # Get strain name from the href
-                    href = link.get('href', '')
-                    if '/strains/' in href:
-                        strain_slug = href.split('/strains/')[-1]
-                        strain_name = strain_slug.replace('-', ' ').title()
-                        
-                        # Check if it's a parent or child
-                        type_elem = link.find('div', class_='text-green text-xs')
-                        if type_elem:
-                            type_text = type_elem.get_text(strip=True)
-                            if type_text == 'parent':
-                                parents.append(strain_name)
-                            elif type_text == 'child':
-                                children.append(strain_name)
-                
-                genetics['parents'] = parents
-                genetics['children'] = children
-            
-            enhanced_strain['genetics'] = genetics
-            
-            # Extract grow information
-            grow_info = {}
-            grow_section = soup.find('section', id='strain-grow-info-section')
-            if grow_section:
-                grow_notes = grow_section.find('div', {'data-testid': 'grow-notes'})
-                if grow_notes:
-                    grow_info['notes'] = grow_notes.get_text(strip=True)
-            
-            enhanced_strain['grow_info'] = grow_info
-            
-            # Extract rating details
-            rating_element = soup.find('span', string=lambda x: x and 'ratings' in x)
-            if rating_element:
-                rating_text = rating_element.get_text(strip=True)
-                # Extract number from text like "(2,631 ratings)"
-                rating_match = re.search(r'\(([0-9,]+)\s+ratings?\)', rating_text)
-                if rating_match:
-                    enhanced_strain['detailed_review_count'] = rating_match.group(1)
-            
-            return enhanced_strain
-            
-        except Exception as e:
-            logger.error(f"Error extracting detailed info: {e}")
-            return enhanced_strain
+            if self.download_images:
+                image_path = self.download_image(fields['image_url'], basic_strain_data)
+            enhanced_strain['image_path'] = image_path
+        
+        enhanced_strain.update(fields)
+        return enhanced_strain
 
     def scrape_strain_details(self, strain_data):
         """Scrape detailed information for a single strain"""
@@ -337,7 +393,8 @@ class EnhancedLeaflyStrainScraper:
             logger.error(f"Failed to fetch details for: {strain_data.get('name', 'Unknown')}")
             return strain_data
         
-        enhanced_strain = self.extract_detailed_info(html_content, strain_data)
+        with metrics.timer('parse_seconds', kind='detail'):
+            enhanced_strain = self.extract_detailed_info(html_content, strain_data)
         logger.info(f"Enhanced data for: {enhanced_strain.get('name', 'Unknown')}")
         
         return enhanced_strain
@@ -355,21 +412,52 @@ class EnhancedLeaflyStrainScraper:
             self.enhanced_data.append(enhanced_strain)
             
             # Add delay between requests
-            if i < len(strain_list):
-                logger.info("Waiting 10 seconds before next request...")
-                time.sleep(10)
+            if i < len(strain_list) and self.request_delay:
+                logger.info(f"Waiting {self.request_delay} seconds before next request...")
+                time.sleep(self.request_delay)
         
+        if self.index_file:
+            self.identity_index.save(self.index_file)
         logger.info(f"Enhanced scraping complete! Processed {len(self.enhanced_data)} strains")
 
+    def refresh_enhanced_data(self, basic_strains, previous_file="enhanced-data.json", state_file=STATE_FILE,
+                              max_age_days=30, max_stale=None):
+        """Refetch only new, changed and stale strains; reuse previous detail data for the rest"""
+        previous, previous_time = {}, time.time()
+        try:
+            data = dataset_io.load(previous_file)
+            # Held as compact records for the whole refresh; unchanged strains are written back from them
+            previous = {strain_key(s): s for s in strain_record.compact(data.get('enhanced_strains', []))}
+            previous_time = time.mktime(time.strptime(data['scrape_timestamp'], '%Y-%m-%d %H:%M:%S'))
+        except (FileNotFoundError, dataset_io.DecodeError, AttributeError, KeyError, ValueError):
+            logger.info(f"No usable previous snapshot in {previous_file}; fetching everything")
+        
+        state = load_state(state_file) or seed_state(previous, previous_time)
+        plan = plan_refresh(basic_strains, previous, state, max_age_days, max_stale)
+        logger.info(f"Refresh plan: {len(plan['new'])} new, {len(plan['changed'])} changed, "
+                    f"{len(plan['stale'])} stale, {len(plan['unchanged'])} unchanged")
+        
+        to_fetch = plan['new'] + plan['changed'] + plan['stale']
+        self.enhanced_data = []
+        self.scrape_enhanced_data(to_fetch)
+        
+        fetched = {}
+        now = time.time()
+        for basic, enhanced in zip(to_fetch, self.enhanced_data):
+            # scrape_strain_details hands back the basic record when the fetch fails
+            if enhanced is not basic:
+                fetched[strain_key(basic)] = enhanced
+                state[strain_key(basic)] = {'fingerprint': fingerprint(basic), 'fetched_at': now}
+        
+        self.enhanced_data = with_discovered([fetched.get(strain_key(s)) or previous.get(strain_key(s)) or s
+                                              for s in basic_strains], previous.values())
+        save_state(state, state_file)
+        logger.info(f"Refreshed {len(fetched)}/{len(to_fetch)} detail pages")
+
     def save_enhanced_data(self, filename="enhanced-data.json"):
         """Save enhanced data to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'total_strains': len(self.enhanced_data),
-                    'scrape_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'enhanced_strains': self.enhanced_data
-                }, f, indent=2, ensure_ascii=False)
+            dataset_io.save_strains(self.enhanced_data, filename)
             
             logger.info(f"Enhanced data saved to {filename}")
             return True
@@ -410,14 +498,30 @@ class EnhancedLeaflyStrainScraper:
                 desc = strain['description'][:200] + "..." if len(strain['description']) > 200 else strain['description']
                 print(f"   Description: {desc}")
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape detail pages for the strains in data.json")
+    parser.add_argument('--refresh', action='store_true',
+                        help='only refetch new, changed (by listing fingerprint) and stale strains')
+    parser.add_argument('--max-age-days', type=float, default=30,
+                        help='refetch pages older than this even if unchanged')
+    parser.add_argument('--max-stale', type=int, help='cap on stale (unchanged but old) pages per refresh')
+    parser.add_argument('--state-file', default=STATE_FILE)
+    parser.add_argument('--no-parse-memo', action='store_true',
+                        help=f'always re-parse pages instead of reusing results memoized in {PARSE_MEMO_FILE}')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    return parser.parse_args()
+
 def main():
     """Main function to run the enhanced scraper"""
-    scraper = EnhancedLeaflyStrainScraper()
+    args = parse_args()
+    scraper = EnhancedLeaflyStrainScraper(parse_memo_file=None if args.no_parse_memo else PARSE_MEMO_FILE)
+    metrics.start_run('enhanced_scraper')
     
     try:
         # Load basic strain data
         logger.info("Loading basic strain data from data.json...")
-        basic_strains = scraper.load_basic_data("data.json")
+        with profiling.stage('load'):
+            basic_strains = scraper.load_basic_data("data.json")
         
         if not basic_strains:
             logger.error("No strain data found in data.json")
@@ -426,11 +530,18 @@ def main():
         logger.info(f"Loaded {len(basic_strains)} strains from data.json")
         
         # Process all strains (including image downloads)
-        logger.info("Processing all strains (including image downloads)...")
-        scraper.scrape_enhanced_data(basic_strains)
+        with profiling.stage('scrape'):
+            if args.refresh:
+                logger.info("Refreshing new, changed and stale strains...")
+                scraper.refresh_enhanced_data(basic_strains, "enhanced-data.json", args.state_file,
+                                              args.max_age_days, args.max_stale)
+            else:
+                logger.info("Processing all strains (including image downloads)...")
+                scraper.scrape_enhanced_data(basic_strains)
         
         # Save enhanced data
-        scraper.save_enhanced_data("enhanced-data.json")
+        with profiling.stage('save'):
+            scraper.save_enhanced_data("enhanced-data.json")
         
         # Print summary
         scraper.print_enhanced_summary()
@@ -440,6 +551,9 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         raise
+    finally:
+        metrics.write_run_report('enhanced_scraper')
 
 if __name__ == "__main__":
-    main()
+    with profiling.profile_run('enhanced_scraper'):
+        main()
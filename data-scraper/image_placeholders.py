@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Low-quality image placeholders
+For every unique strain image, computes an inline 16px WebP data URI (a few
+hundred bytes, shown blurred until the real image loads) and the image's width
+and height. Images are decoded in a process pool, in batches. The results are
+written into the dataset as image_placeholder / image_width / image_height,
+which import_to_db.py stores on strains so the API returns them inline.
+
+    python image_placeholders.py                      # images/ -> enhanced-data.json
+    python image_placeholders.py --fetch --processes 8
+"""
+
+import argparse
+import base64
+import io
+import multiprocessing
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from PIL import Image
+
+import dataset_io
+import metrics
+import profiling
+from sprite_atlas import read_image
+
+PLACEHOLDER_SIZE = 16
+QUALITY = 40
+BATCH_SIZE = 32
+
+PLACEHOLDER_FIELDS = ('image_placeholder', 'image_width', 'image_height')
+
+
+def placeholder(data: bytes, size: int = PLACEHOLDER_SIZE) -> Optional[Dict[str, Any]]:
+    """Placeholder data URI plus the full image size, or None for an unreadable image"""
+    try:
+        image = Image.open(io.BytesIO(data))
+        width, height = image.size
+        image.draft('RGB', (size, size))
+        image = image.convert('RGBA')
+        image.thumbnail((size, size), Image.LANCZOS)
+    except (OSError, Image.DecompressionBombError):
+        return None
+    buf = io.BytesIO()
+    image.save(buf, 'WEBP', quality=QUALITY)
+    return {
+        'image_placeholder': 'data:image/webp;base64,' + base64.b64encode(buf.getvalue()).decode('ascii'),
+        'image_width': width,
+        'image_height': height,
+    }
+
+
+def _placeholder_job(job: Tuple[str, Dict[str, Any], bool]) -> Tuple[str, Optional[Dict[str, Any]]]:
+    # Runs in a pool worker; reads (or downloads) and decodes the image there
+    key, strain, fetch = job
+    data = read_image(strain, fetch)
+    return key, placeholder(data) if data else None
+
+
+def image_key(strain: Dict[str, Any]) -> Optional[str]:
+    """Strains that share an image file or URL share one placeholder"""
+    image_path = strain.get('image_path')
+    if image_path and os.path.exists(image_path):
+        return image_path
+    image_url = strain.get('image_url')
+    return image_url.split('?')[0] if image_url else None
+
+
+def compute_placeholders(strains: List[Dict[str, Any]], fetch: bool = False, processes: Optional[int] = None,
+                         force: bool = False) -> int:
+    """Fill in the placeholder fields in place; returns how many strains were updated"""
+    jobs: Dict[str, Dict[str, Any]] = {}
+    for strain in strains:
+        if force or not strain.get('image_placeholder'):
+            key = image_key(strain)
+            if key and key not in jobs:
+                jobs[key] = {'image_path': strain.get('image_path'), 'image_url': strain.get('image_url')}
+    if not jobs:
+        return 0
+
+    results = {}
+    with multiprocessing.Pool(processes) as pool:
+        for key, fields in pool.imap_unordered(_placeholder_job, [(k, s, fetch) for k, s in jobs.items()],
+                                               chunksize=BATCH_SIZE):
+            results[key] = fields
+    print(f"🖼️  Computed {sum(1 for f in results.values() if f)} placeholders for {len(jobs)} unique images")
+
+    updated = 0
+    for strain in strains:
+        fields = results.get(image_key(strain))
+        if fields and (force or not strain.get('image_placeholder')):
+            strain.update(fields)
+            updated += 1
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compute inline image placeholders and image sizes")
+    parser.add_argument('--input', default='enhanced-data.json')
+    parser.add_argument('--output', help='defaults to updating --input in place')
+    parser.add_argument('--processes', type=int, help='pool size (default: one per CPU)')
+    parser.add_argument('--fetch', action='store_true', help='download images that are not in images/')
+    parser.add_argument('--force', action='store_true', help='recompute existing placeholders')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    metrics.start_run('image_placeholders')
+    try:
+        with profiling.profile_run('image_placeholders', args.profile or ''):
+            with profiling.stage('load'):
+                data = dataset_io.load(args.input)
+                strains = dataset_io.strains_of(data)
+            with profiling.stage('placeholders'):
+                updated = compute_placeholders(strains, args.fetch, args.processes, args.force)
+            dataset_io.dump(data, args.output or args.input)
+        print(f"✅ Updated {updated} strains in {args.output or args.input}")
+    finally:
+        metrics.write_run_report('image_placeholders')
+
+
+if __name__ == "__main__":
+    main()
@@ -6,7 +6,6 @@ Downloads strain images from Leafly and uploads to S3 bucket
 
 import os
 import sys
-import json
 import requests
 import boto3
 from urllib.parse import urlparse, parse_qs
@@ -14,6 +13,10 @@ from typing import List, Dict, Any
 import time
 from botocore.exceptions import ClientError, NoCredentialsError
 from dotenv import load_dotenv
+import dataset_io
+import metrics
+import profiling
+from strain_identity import StrainIdentityIndex
 
 # Load environment variables
 load_dotenv()
@@ -29,13 +32,7 @@ S3_CONFIG = {
 def load_strain_data() -> List[Dict[str, Any]]:
     """Load strain data from enhanced-data.json"""
     try:
-        with open('enhanced-data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            
-        if 'enhanced_strains' in data:
-            strains = data['enhanced_strains']
-        else:
-            strains = data
+        strains = dataset_io.load_strains('enhanced-data.json')
             
         print(f"📊 Loaded {len(strains)} strains from enhanced-data.json")
         return strains
@@ -43,7 +40,7 @@ def load_strain_data() -> List[Dict[str, Any]]:
     except FileNotFoundError:
         print("❌ Error: enhanced-data.json not found")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except dataset_io.DecodeError as e:
         print(f"❌ Error parsing JSON: {e}")
         sys.exit(1)
 
@@ -56,6 +53,7 @@ def init_s3_client():
             aws_secret_access_key=S3_CONFIG['SECRET_KEY'],
             region_name=S3_CONFIG['REGION']
         )
+        metrics.instrument_s3(s3_client)
         
         # Test connection
         s3_client.head_bucket(Bucket=S3_CONFIG['BUCKET'])
@@ -89,7 +87,10 @@ def download_image(url: str, timeout: int = 30) -> bytes:
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=timeout)
+        with metrics.timer('fetch_seconds', kind='image'):
+            response = requests.get(url, headers=headers, timeout=timeout)
+        metrics.inc('fetch_requests_total', kind='image', status=response.status_code)
+        metrics.inc('fetch_bytes_total', len(response.content), kind='image')
         response.raise_for_status()
         
         return response.content
@@ -114,17 +115,9 @@ def upload_to_s3(s3_client, image_data: bytes, s3_key: str) -> bool:
         print(f"❌ Failed to upload to S3: {e}")
         return False
 
-def generate_s3_key(strain_name: str) -> str:
-    """Generate S3 key from strain name"""
-    # Convert strain name to URL-friendly format
-    clean_name = strain_name.lower().replace(' ', '-').replace('/', '-').replace('\\', '-')
-    # Remove special characters except hyphens and alphanumeric
-    clean_name = ''.join(c for c in clean_name if c.isalnum() or c == '-')
-    # Remove multiple consecutive hyphens
-    while '--' in clean_name:
-        clean_name = clean_name.replace('--', '-')
-    
-    return f"strains/{clean_name}.png"
+def generate_s3_key(strain: Dict[str, Any], identity_index: StrainIdentityIndex) -> str:
+    """Generate S3 key from the strain's canonical slug"""
+    return identity_index.s3_key(strain)
 
 def process_strain_images(strains: List[Dict[str, Any]], s3_client):
     """Process all strain images"""
@@ -134,6 +127,8 @@ def process_strain_images(strains: List[Dict[str, Any]], s3_client):
     skipped = 0
     errors = 0
     
+    identity_index = StrainIdentityIndex.build(strains)
+    
     print(f"🖼️  Processing {total_strains} strain images...")
     print("=" * 50)
     
@@ -161,7 +156,7 @@ def process_strain_images(strains: List[Dict[str, Any]], s3_client):
                 continue
             
             # Generate S3 key
-            s3_key = generate_s3_key(strain_name)
+            s3_key = generate_s3_key(strain, identity_index)
             
             # Check if image already exists in S3
             try:
@@ -214,14 +209,22 @@ def main():
     print("🌿 Cannabis Strain Image Uploader")
     print("=" * 40)
     
-    # Load strain data
-    strains = load_strain_data()
-    
-    # Initialize S3 client
-    s3_client = init_s3_client()
-    
-    # Process images
-    process_strain_images(strains, s3_client)
+    metrics.start_run('image_uploader')
+    try:
+        # Load strain data
+        with profiling.stage('load'):
+            strains = load_strain_data()
+        
+        # Initialize S3 client
+        with profiling.stage('connect'):
+            s3_client = init_s3_client()
+        
+        # Process images
+        with profiling.stage('upload'):
+            process_strain_images(strains, s3_client)
+    finally:
+        metrics.write_run_report('image_uploader')
 
 if __name__ == "__main__":
-    main()
+    with profiling.profile_run('image_uploader'):
+        main()
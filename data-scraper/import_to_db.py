@@ -3,13 +3,20 @@
 Import enhanced-data.json into PostgreSQL database
 """
 
-import json
 import psycopg2
 from psycopg2.extras import execute_batch
+import pyarrow as pa
+import pyarrow.compute as pc
 import os
+import re
+import sqlite3
 import sys
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Tuple
 from dotenv import load_dotenv
+import dataset_io
+from lineage_graph import build_lineage_graph, lineage_pairs, import_lineage_graph
+import metrics
+import profiling
 
 # Load environment variables
 load_dotenv()
@@ -23,6 +30,16 @@ DB_CONFIG = {
     'database': os.getenv('DB_NAME')
 }
 
+def execute_batch_timed(cursor, sql: str, records: List[tuple]):
+    """execute_batch with statement, row and latency metrics for the target table"""
+    table = re.search(r'INSERT INTO (\w+)', sql).group(1)
+    with metrics.db_statement(table, len(records)):
+        if isinstance(cursor, sqlite3.Cursor):
+            # sqlite_mirror.py reuses these inserts; same SQL with qmark placeholders
+            cursor.executemany(sql.replace('%s', '?'), records)
+        else:
+            execute_batch(cursor, sql, records)
+
 def connect_to_db():
     """Connect to PostgreSQL database"""
     try:
@@ -34,10 +51,15 @@ def connect_to_db():
         sys.exit(1)
 
 def load_json_data(file_path: str) -> List[Dict[str, Any]]:
-    """Load strain data from JSON file"""
+    """Load strain data from a JSON file or a columnar_export.py directory/Parquet file"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        if os.path.isdir(file_path) or file_path.endswith(('.parquet', '.arrow')):
+            from columnar_export import load_strains
+            strains = load_strains(file_path)
+            print(f"Loaded {len(strains)} strains from {file_path}")
+            return strains
+        
+        data = dataset_io.load(file_path)
         
         # Handle the nested structure - extract enhanced_strains array
         if isinstance(data, dict) and 'enhanced_strains' in data:
@@ -56,7 +78,7 @@ def load_json_data(file_path: str) -> List[Dict[str, Any]]:
     except FileNotFoundError:
         print(f"Error: File {file_path} not found")
         sys.exit(1)
-    except json.JSONDecodeError as e:
+    except dataset_io.DecodeError as e:
         print(f"Error parsing JSON: {e}")
         sys.exit(1)
 
@@ -69,19 +91,159 @@ def clean_string(value: Any, max_length: int = None) -> str:
         return cleaned[:max_length]
     return cleaned
 
+# "THC 18%", "18.5%", "15-20%", "CBD <1%"; "THC —" has no number
+POTENCY_PATTERN = r'(?P<below><)?\s*(?P<low>\d+(?:\.\d+)?)(?:\s*[-–]\s*(?P<high>\d+(?:\.\d+)?))?'
+
+POTENCY_SCHEMA = """
+ALTER TABLE strains
+    ADD COLUMN IF NOT EXISTS thc_min NUMERIC(5,2),
+    ADD COLUMN IF NOT EXISTS thc_max NUMERIC(5,2),
+    ADD COLUMN IF NOT EXISTS cbd_min NUMERIC(5,2),
+    ADD COLUMN IF NOT EXISTS cbd_max NUMERIC(5,2);
+CREATE INDEX IF NOT EXISTS idx_strains_thc ON strains (thc_min, thc_max);
+CREATE INDEX IF NOT EXISTS idx_strains_cbd ON strains (cbd_min, cbd_max);
+-- The API sorts DESC with NULLS LAST; these also serve the thc_max >= / cbd_max >= filters
+CREATE INDEX IF NOT EXISTS idx_strains_thc_max ON strains (thc_max DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_strains_cbd_max ON strains (cbd_max DESC NULLS LAST);
+CREATE INDEX IF NOT EXISTS idx_strains_rating ON strains (rating DESC NULLS LAST);
+"""
+
+def potency_ranges(values: List[Any]) -> Tuple[List[Optional[float]], List[Optional[float]]]:
+    """Numeric (min, max) percentages for display strings, parsed for the whole column at once"""
+    parts = pc.extract_regex(pa.array([clean_string(v) for v in values], pa.string()), POTENCY_PATTERN)
+    low = pc.struct_field(parts, 'low')
+    high = pc.struct_field(parts, 'high')
+    below = pc.not_equal(pc.struct_field(parts, 'below'), '')
+    # "<1%" is 0-1; a single value is its own min and max
+    minimum = pc.if_else(below, pa.scalar('0'), low)
+    maximum = pc.cast(pc.if_else(pc.equal(high, ''), low, high), pa.float64())
+    minimum = pc.cast(minimum, pa.float64())
+    # Anything past 100% ("1000%", a typo'd range) is not a percentage and would overflow
+    # NUMERIC(5,2), aborting the whole batch; the range is dropped and the display string kept
+    valid = pc.and_(pc.less_equal(minimum, 100), pc.less_equal(maximum, 100))
+    null = pa.scalar(None, pa.float64())
+    return (pc.if_else(valid, minimum, null).to_pylist(), pc.if_else(valid, maximum, null).to_pylist())
+
+IMAGE_SCHEMA = """
+ALTER TABLE strains
+    ADD COLUMN IF NOT EXISTS image_placeholder TEXT,
+    ADD COLUMN IF NOT EXISTS image_width INT,
+    ADD COLUMN IF NOT EXISTS image_height INT;
+"""
+
+# strain_complete selects s.*, which Postgres expands when the view is created, so
+# columns added above only show up once it is recreated (same definition as views.sql)
+STRAIN_VIEWS = """
+DROP VIEW IF EXISTS strain_complete;
+CREATE VIEW strain_complete AS
+SELECT
+    s.*,
+    STRING_AGG(DISTINCT sa.aka, ', ') as aliases,
+    STRING_AGG(DISTINCT CASE WHEN e.type = 'positive' THEN e.effect END, ', ') as positive_effects,
+    STRING_AGG(DISTINCT CASE WHEN e.type = 'negative' THEN e.effect END, ', ') as negative_effects,
+    STRING_AGG(DISTINCT f.flavor, ', ') as flavors,
+    STRING_AGG(DISTINCT t.terpene_name, ', ') as terpenes,
+    STRING_AGG(DISTINCT CONCAT(mc.condition_name, ' (', smb.percentage, '%)'), ', ') as medical_benefits,
+    STRING_AGG(DISTINCT CASE WHEN sg.relationship = 'parent' THEN sg.related_strain END, ', ') as parents,
+    STRING_AGG(DISTINCT CASE WHEN sg.relationship = 'child' THEN sg.related_strain END, ', ') as children
+FROM strains s
+LEFT JOIN strain_akas sa ON s.name = sa.strain_name
+LEFT JOIN strain_effects se ON s.name = se.strain_name
+LEFT JOIN effects e ON se.effect = e.effect
+LEFT JOIN strain_flavors sf ON s.name = sf.strain_name
+LEFT JOIN flavors f ON sf.flavor = f.flavor
+LEFT JOIN strain_terpenes st ON s.name = st.strain_name
+LEFT JOIN terpenes t ON st.terpene_name = t.terpene_name
+LEFT JOIN strain_medical_benefits smb ON s.name = smb.strain_name
+LEFT JOIN medical_conditions mc ON smb.condition_name = mc.condition_name
+LEFT JOIN strain_genetics sg ON s.name = sg.strain_name
+GROUP BY s.name, s.url, s.type, s.thc, s.cbd, s.thc_min, s.thc_max, s.cbd_min, s.cbd_max,
+         s.rating, s.review_count, s.top_effect, s.category, s.image_path, s.image_url, s.image_placeholder,
+         s.image_width, s.image_height, s.description, s.created_at, s.updated_at;
+"""
+
+# Lineage closure tables and the family-tree view over them (same definitions as models.sql
+# and views.sql), for databases created before them; import_lineage_graph truncates both tables
+LINEAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS strain_lineage_nodes (
+    id INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    slug VARCHAR(100) UNIQUE NOT NULL,
+    strain_name VARCHAR(100),
+    FOREIGN KEY (strain_name) REFERENCES strains(name) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_lineage_nodes_strain_name ON strain_lineage_nodes (strain_name);
+CREATE TABLE IF NOT EXISTS strain_lineage_closure (
+    ancestor_id INT NOT NULL,
+    descendant_id INT NOT NULL,
+    depth INT NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id),
+    FOREIGN KEY (ancestor_id) REFERENCES strain_lineage_nodes(id) ON DELETE CASCADE,
+    FOREIGN KEY (descendant_id) REFERENCES strain_lineage_nodes(id) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_lineage_closure_descendant ON strain_lineage_closure (descendant_id, depth);
+CREATE OR REPLACE VIEW strain_family_tree AS
+SELECT
+    n.strain_name,
+    rel.name AS related_name,
+    rel.strain_name AS related_strain,
+    'ancestor' AS direction,
+    c.depth
+FROM strain_lineage_nodes n
+JOIN strain_lineage_closure c ON c.descendant_id = n.id AND c.depth > 0
+JOIN strain_lineage_nodes rel ON rel.id = c.ancestor_id
+UNION ALL
+SELECT
+    n.strain_name,
+    rel.name AS related_name,
+    rel.strain_name AS related_strain,
+    'descendant' AS direction,
+    c.depth
+FROM strain_lineage_nodes n
+JOIN strain_lineage_closure c ON c.ancestor_id = n.id AND c.depth > 0
+JOIN strain_lineage_nodes rel ON rel.id = c.descendant_id;
+"""
+
+def ensure_columns(conn):
+    """Add the potency and image columns and their indexes to databases created before them,
+    recreate strain_complete so its s.* includes them, and create the lineage tables and view"""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(POTENCY_SCHEMA)
+        cursor.execute(IMAGE_SCHEMA)
+        cursor.execute(STRAIN_VIEWS)
+        cursor.execute(LINEAGE_SCHEMA)
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"Error updating the database schema: {e}")
+        raise
+
 def insert_strains(conn, strains_data: List[Dict[str, Any]]):
     """Insert strain data into strains table"""
     cursor = conn.cursor()
     
     strain_sql = """
         INSERT INTO strains (name, url, type, thc, cbd, rating, review_count, 
-                           top_effect, category, image_path, image_url, description)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        ON CONFLICT (name) DO NOTHING
+                           top_effect, category, image_path, image_url, description,
+                           image_placeholder, image_width, image_height,
+                           thc_min, thc_max, cbd_min, cbd_max)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        ON CONFLICT (name) DO UPDATE SET
+            thc_min = COALESCE(EXCLUDED.thc_min, strains.thc_min),
+            thc_max = COALESCE(EXCLUDED.thc_max, strains.thc_max),
+            cbd_min = COALESCE(EXCLUDED.cbd_min, strains.cbd_min),
+            cbd_max = COALESCE(EXCLUDED.cbd_max, strains.cbd_max),
+            image_placeholder = COALESCE(EXCLUDED.image_placeholder, strains.image_placeholder),
+            image_width = COALESCE(EXCLUDED.image_width, strains.image_width),
+            image_height = COALESCE(EXCLUDED.image_height, strains.image_height)
     """
     
+    thc_min, thc_max = potency_ranges([strain.get('thc') for strain in strains_data])
+    cbd_min, cbd_max = potency_ranges([strain.get('cbd') for strain in strains_data])
+    
     strain_records = []
-    for strain in strains_data:
+    for i, strain in enumerate(strains_data):
         # Map strain type to valid values
         strain_type = strain.get('type', 'Hybrid')
         if strain_type not in ['Indica', 'Sativa', 'Hybrid']:
@@ -99,12 +261,19 @@ def insert_strains(conn, strains_data: List[Dict[str, Any]]):
             clean_string(strain.get('category')),
             clean_string(strain.get('image_path')),
             clean_string(strain.get('image_url')),
-            clean_string(strain.get('description'))  # No length limit for descriptions
+            clean_string(strain.get('description')),  # No length limit for descriptions
+            strain.get('image_placeholder'),
+            strain.get('image_width'),
+            strain.get('image_height'),
+            thc_min[i],
+            thc_max[i],
+            cbd_min[i],
+            cbd_max[i]
         )
         strain_records.append(record)
     
     try:
-        execute_batch(cursor, strain_sql, strain_records)
+        execute_batch_timed(cursor, strain_sql, strain_records)
         conn.commit()
         print(f"Inserted {len(strain_records)} strains")
     except psycopg2.Error as e:
@@ -134,7 +303,7 @@ def insert_strain_akas(conn, strains_data: List[Dict[str, Any]]):
     
     if aka_records:
         try:
-            execute_batch(cursor, aka_sql, aka_records)
+            execute_batch_timed(cursor, aka_sql, aka_records)
             conn.commit()
             print(f"Inserted {len(aka_records)} strain aliases")
         except psycopg2.Error as e:
@@ -174,7 +343,7 @@ def insert_effects(conn, strains_data: List[Dict[str, Any]]):
     
     if effect_records:
         try:
-            execute_batch(cursor, effect_sql, effect_records)
+            execute_batch_timed(cursor, effect_sql, effect_records)
             conn.commit()
             print(f"Inserted {len(effect_records)} unique effects")
         except psycopg2.Error as e:
@@ -210,7 +379,7 @@ def insert_strain_effects(conn, strains_data: List[Dict[str, Any]]):
     
     if junction_records:
         try:
-            execute_batch(cursor, junction_sql, junction_records)
+            execute_batch_timed(cursor, junction_sql, junction_records)
             conn.commit()
             print(f"Inserted {len(junction_records)} strain-effect relationships")
         except psycopg2.Error as e:
@@ -241,7 +410,7 @@ def insert_flavors(conn, strains_data: List[Dict[str, Any]]):
     
     if flavor_records:
         try:
-            execute_batch(cursor, flavor_sql, flavor_records)
+            execute_batch_timed(cursor, flavor_sql, flavor_records)
             conn.commit()
             print(f"Inserted {len(flavor_records)} unique flavors")
         except psycopg2.Error as e:
@@ -270,7 +439,7 @@ def insert_strain_flavors(conn, strains_data: List[Dict[str, Any]]):
     
     if junction_records:
         try:
-            execute_batch(cursor, junction_sql, junction_records)
+            execute_batch_timed(cursor, junction_sql, junction_records)
             conn.commit()
             print(f"Inserted {len(junction_records)} strain-flavor relationships")
         except psycopg2.Error as e:
@@ -312,7 +481,7 @@ def insert_terpenes(conn, strains_data: List[Dict[str, Any]]):
     
     if terpene_records:
         try:
-            execute_batch(cursor, terpene_sql, terpene_records)
+            execute_batch_timed(cursor, terpene_sql, terpene_records)
             conn.commit()
             print(f"Inserted {len(terpene_records)} unique terpenes")
         except psycopg2.Error as e:
@@ -343,7 +512,7 @@ def insert_strain_terpenes(conn, strains_data: List[Dict[str, Any]]):
     
     if junction_records:
         try:
-            execute_batch(cursor, junction_sql, junction_records)
+            execute_batch_timed(cursor, junction_sql, junction_records)
             conn.commit()
             print(f"Inserted {len(junction_records)} strain-terpene relationships")
         except psycopg2.Error as e:
@@ -376,7 +545,7 @@ def insert_medical_conditions(conn, strains_data: List[Dict[str, Any]]):
     
     if condition_records:
         try:
-            execute_batch(cursor, condition_sql, condition_records)
+            execute_batch_timed(cursor, condition_sql, condition_records)
             conn.commit()
             print(f"Inserted {len(condition_records)} unique medical conditions")
         except psycopg2.Error as e:
@@ -413,7 +582,7 @@ def insert_medical_benefits(conn, strains_data: List[Dict[str, Any]]):
     
     if junction_records:
         try:
-            execute_batch(cursor, junction_sql, junction_records)
+            execute_batch_timed(cursor, junction_sql, junction_records)
             conn.commit()
             print(f"Inserted {len(junction_records)} strain-medical condition relationships")
         except psycopg2.Error as e:
@@ -421,9 +590,11 @@ def insert_medical_benefits(conn, strains_data: List[Dict[str, Any]]):
             print(f"Error inserting medical benefits: {e}")
             raise
 
-def insert_genetics(conn, strains_data: List[Dict[str, Any]]):
-    """Insert strain genetics (parents and children)"""
+def insert_genetics(conn, strains_data: List[Dict[str, Any]], graph=None):
+    """Insert strain genetics (parents and children), resolved to canonical strain names"""
     cursor = conn.cursor()
+    if graph is None:
+        graph = build_lineage_graph(strains_data)
     
     genetics_sql = """
         INSERT INTO strain_genetics (strain_name, related_strain, relationship)
@@ -437,20 +608,16 @@ def insert_genetics(conn, strains_data: List[Dict[str, Any]]):
         genetics = strain.get('genetics', {})
         
         # Parents
-        parents = genetics.get('parents', [])
-        for parent in parents:
-            if parent and parent.strip():
-                genetics_records.append((strain_name, clean_string(parent), 'parent'))
+        for parent, slug in lineage_pairs(genetics, 'parents'):
+            genetics_records.append((strain_name, clean_string(graph.canonical_name(parent, slug)), 'parent'))
         
         # Children
-        children = genetics.get('children', [])
-        for child in children:
-            if child and child.strip():
-                genetics_records.append((strain_name, clean_string(child), 'child'))
+        for child, slug in lineage_pairs(genetics, 'children'):
+            genetics_records.append((strain_name, clean_string(graph.canonical_name(child, slug)), 'child'))
     
     if genetics_records:
         try:
-            execute_batch(cursor, genetics_sql, genetics_records)
+            execute_batch_timed(cursor, genetics_sql, genetics_records)
             conn.commit()
             print(f"Inserted {len(genetics_records)} genetic relationships")
         except psycopg2.Error as e:
@@ -460,16 +627,19 @@ def insert_genetics(conn, strains_data: List[Dict[str, Any]]):
 
 def main():
     """Main import function"""
-    # Get the current directory and construct the JSON file path
+    # Get the current directory and construct the JSON file path (or take a file/export directory argument)
     current_dir = os.path.dirname(os.path.abspath(__file__))
-    json_file_path = os.path.join(current_dir, 'enhanced-data.json')
+    paths = [arg for arg in sys.argv[1:] if not arg.startswith('--') and arg not in profiling.MODES]
+    json_file_path = paths[0] if paths else os.path.join(current_dir, 'enhanced-data.json')
     
     print("🌿 Cannabis Strain Database Importer")
     print("=" * 40)
+    metrics.start_run('import_to_db')
     
     # Load JSON data
     print("📊 Loading strain data...")
-    strains_data = load_json_data(json_file_path)
+    with profiling.stage('load'):
+        strains_data = load_json_data(json_file_path)
     
     # Connect to database
     print("🔌 Connecting to database...")
@@ -480,21 +650,30 @@ def main():
         
         # Import in order of dependencies
         # 1. Main strain data
-        insert_strains(conn, strains_data)
-        insert_strain_akas(conn, strains_data)
+        with profiling.stage('strains'):
+            ensure_columns(conn)
+            insert_strains(conn, strains_data)
+            insert_strain_akas(conn, strains_data)
         
         # 2. Normalized lookup tables first
-        insert_effects(conn, strains_data)
-        insert_flavors(conn, strains_data)
-        insert_terpenes(conn, strains_data)
-        insert_medical_conditions(conn, strains_data)
+        with profiling.stage('lookups'):
+            insert_effects(conn, strains_data)
+            insert_flavors(conn, strains_data)
+            insert_terpenes(conn, strains_data)
+            insert_medical_conditions(conn, strains_data)
         
         # 3. Junction tables (relationships)
-        insert_strain_effects(conn, strains_data)
-        insert_strain_flavors(conn, strains_data)
-        insert_strain_terpenes(conn, strains_data)
-        insert_medical_benefits(conn, strains_data)
-        insert_genetics(conn, strains_data)
+        with profiling.stage('junctions'):
+            insert_strain_effects(conn, strains_data)
+            insert_strain_flavors(conn, strains_data)
+            insert_strain_terpenes(conn, strains_data)
+            insert_medical_benefits(conn, strains_data)
+            lineage = build_lineage_graph(strains_data)
+            insert_genetics(conn, strains_data, lineage)
+        
+        # 4. Precomputed lineage closure (ancestor/descendant lookups)
+        with profiling.stage('lineage'):
+            import_lineage_graph(conn, lineage)
         
         print("\n✅ Import completed successfully!")
         print(f"📈 Total strains processed: {len(strains_data)}")
@@ -507,6 +686,8 @@ def main():
     finally:
         conn.close()
         print("🔐 Database connection closed")
+        metrics.write_run_report('import_to_db')
 
 if __name__ == "__main__":
-    main()
+    with profiling.profile_run('import_to_db'):
+        main()
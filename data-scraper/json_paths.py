@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Learned JSON-path extraction for Leafly strain payloads
+Remembers where flavors and helps-with data live in a page's embedded JSON
+(json-paths.json) and jumps straight there; only when a learned path stops
+resolving does it fall back to a bounded breadth-first search and relearn. Paths
+are kept relative to the page's own strain object, which is checked by slug on
+every page, and the search is scoped to it, so related strains embedded in the
+same payload are never picked up.
+"""
+
+import json
+import logging
+import threading
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+PATHS_FILE = 'json-paths.json'
+
+# Candidate keys for each field, in preference order
+FIELD_KEYS = {
+    'flavors': ('flavors',),
+    'helps_with': ('helps_with', 'medical', 'conditions', 'benefits', 'treats'),
+}
+
+# Bounds for the fallback search so a layout change can't cost a full walk
+MAX_SEARCH_NODES = 20000
+MAX_SEARCH_DEPTH = 12
+
+
+def normalize_flavors(value: Any) -> List[str]:
+    if not isinstance(value, list):
+        return []
+    return [f.get('name', f) if isinstance(f, dict) else str(f) for f in value]
+
+
+def normalize_helps_with(value: Any) -> List[Dict[str, Any]]:
+    if not isinstance(value, list):
+        return []
+    helps_with = []
+    for item in value:
+        if isinstance(item, dict):
+            condition = item.get('condition', item.get('name', ''))
+            percentage = item.get('percentage', item.get('percent', 0))
+            if condition:
+                helps_with.append({
+                    'condition': condition,
+                    'percentage': float(percentage) if percentage else 0
+                })
+        elif isinstance(item, str):
+            helps_with.append({'condition': item, 'percentage': 0})
+    return helps_with
+
+
+# The fields missing_data_scraper.py backfills; importable without the scraper's logging setup
+TARGET_FIELDS = tuple(FIELD_KEYS)
+
+NORMALIZERS = {
+    'flavors': normalize_flavors,
+    'helps_with': normalize_helps_with,
+}
+
+
+def follow_path(obj: Any, path: List[Any]) -> Any:
+    """Walk a recorded key/index path; returns None if any step is missing"""
+    for step in path:
+        if isinstance(obj, dict) and isinstance(step, str):
+            obj = obj.get(step)
+        elif isinstance(obj, list) and isinstance(step, int) and step < len(obj):
+            obj = obj[step]
+        else:
+            return None
+    return obj
+
+
+def _is_strain(obj: Any, slug: Optional[str], name: Optional[str]) -> bool:
+    """obj carries this strain's slug, or its lowercased name and no other slug"""
+    if not isinstance(obj, dict):
+        return False
+    if slug and obj.get('slug') == slug:
+        return True
+    return bool(name) and isinstance(obj.get('name'), str) and obj['name'].strip().lower() == name \
+        and not _other_strain(obj, slug)
+
+
+def _other_strain(obj: Any, slug: Optional[str]) -> bool:
+    return bool(slug) and isinstance(obj, dict) and 'slug' in obj and obj['slug'] != slug
+
+
+class JSONPathExtractor:
+    """Extracts fields via learned paths with a bounded BFS fallback"""
+
+    def __init__(self, paths: Optional[Dict[str, Dict[str, Any]]] = None, filename: Optional[str] = PATHS_FILE):
+        self.paths = paths or {}
+        self.filename = filename
+        self.lock = threading.Lock()
+
+    @classmethod
+    def load(cls, filename: str = PATHS_FILE) -> 'JSONPathExtractor':
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                return cls(json.load(f), filename)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return cls(filename=filename)
+
+    def save(self):
+        if not self.filename:
+            return
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            json.dump(self.paths, f, indent=2)
+
+    def learned_script(self, field: str) -> Optional[str]:
+        """ID of the <script> the field was last found in (e.g. __NEXT_DATA__)"""
+        learned = self.paths.get(field)
+        return learned.get('script') if learned else None
+
+    def extract(self, json_data: Any, fields, script_id: Optional[str] = None,
+                slug: Optional[str] = None, name: Optional[str] = None) -> Dict[str, Any]:
+        """Return normalized values for the requested fields found in json_data
+
+        slug/name identify the page's strain. Learned paths are stored relative to
+        that strain's object, whose position is checked (and re-located when it moved)
+        on every page, and the fallback search only looks inside it.
+        """
+        name = name.strip().lower() if name else None
+        found = {}
+        to_search = []
+        located = []  # [(root, root_path) or None], filled on first use
+
+        def strain_root(hint: Optional[List[Any]] = None) -> Optional[Tuple[Any, List[Any]]]:
+            if not (slug or name):
+                return json_data, []
+            if hint is not None:
+                candidate = follow_path(json_data, hint)
+                if _is_strain(candidate, slug, name):
+                    return candidate, hint
+            if not located:
+                located.append(self._strain_root(json_data, slug, name))
+            return located[0]
+
+        for field in fields:
+            learned = self.paths.get(field)
+            # Entries without a root predate relative paths and are relearned
+            if learned and learned.get('script') == script_id and 'root' in learned:
+                root = strain_root(learned['root'])
+                raw = follow_path(root[0], learned['path']) if root else None
+                # A path that still resolves to a list is right even when this strain's list is empty
+                if isinstance(raw, list):
+                    value = NORMALIZERS[field](raw)
+                    if value:
+                        found[field] = value
+                    continue
+            to_search.append(field)
+
+        if to_search:
+            root = strain_root()
+            if root is None:
+                return found
+            for field, path, raw in self._search(root[0], to_search, slug):
+                value = NORMALIZERS[field](raw)
+                if value:
+                    found[field] = value
+                    self._learn(field, script_id, root[1], path)
+
+        return found
+
+    def _learn(self, field: str, script_id: Optional[str], root: List[Any], path: List[Any]):
+        entry = {'script': script_id, 'root': root, 'path': path}
+        with self.lock:
+            if self.paths.get(field) != entry:
+                logging.info(f"Learned JSON path for {field}: {script_id or '<script>'} {root} + {path}")
+                self.paths[field] = entry
+                self.save()
+
+    @staticmethod
+    def _strain_root(json_data: Any, slug: Optional[str], name: Optional[str]) -> Optional[Tuple[Any, List[Any]]]:
+        """Shallowest object describing this strain (matching slug, else lowercased name) and its path"""
+        queue = deque([(json_data, [])])
+        visited = 0
+        while queue and visited < MAX_SEARCH_NODES:
+            obj, path = queue.popleft()
+            visited += 1
+            if isinstance(obj, dict):
+                if _is_strain(obj, slug, name):
+                    return obj, path
+                if len(path) < MAX_SEARCH_DEPTH:
+                    queue.extend((v, path + [k]) for k, v in obj.items() if isinstance(v, (dict, list)))
+            elif isinstance(obj, list) and len(path) < MAX_SEARCH_DEPTH:
+                queue.extend((v, path + [i]) for i, v in enumerate(obj) if isinstance(v, (dict, list)))
+        return None
+
+    def _search(self, json_data: Any, fields: List[str], slug: Optional[str] = None) -> List[Tuple[str, List[Any], Any]]:
+        """Bounded breadth-first search for the shallowest match of each field
+
+        Objects carrying another strain's slug (parents, related strains) are not entered.
+        """
+        pending = set(fields)
+        results = []
+        queue = deque([(json_data, [])])
+        visited = 0
+
+        while queue and pending and visited < MAX_SEARCH_NODES:
+            obj, path = queue.popleft()
+            visited += 1
+
+            if isinstance(obj, dict):
+                for field in list(pending):
+                    for key in FIELD_KEYS[field]:
+                        value = obj.get(key)
+                        if isinstance(value, list) and NORMALIZERS[field](value):
+                            results.append((field, path + [key], value))
+                            pending.discard(field)
+                            break
+                if len(path) < MAX_SEARCH_DEPTH:
+                    queue.extend((v, path + [k]) for k, v in obj.items()
+                                 if isinstance(v, (dict, list)) and not _other_strain(v, slug))
+            elif isinstance(obj, list) and len(path) < MAX_SEARCH_DEPTH:
+                queue.extend((v, path + [i]) for i, v in enumerate(obj)
+                             if isinstance(v, (dict, list)) and not _other_strain(v, slug))
+
+        if pending and visited >= MAX_SEARCH_NODES:
+            logging.debug(f"JSON search budget exhausted looking for {', '.join(pending)}")
+        return results
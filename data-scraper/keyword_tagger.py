@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Keyword tagger for description-derived attributes
+Compiles flavor, effect, terpene and condition vocabularies (multi-word phrases
+and simple inflections included) into one trie over words, then tags a text in a
+single pass: the text is lowercased and tokenized once, and each token costs one
+dict lookup unless it starts a known phrase. Matching on whole tokens gives word
+boundaries for free, so "pine" no longer matches inside "pineapple".
+
+    tagger = KeywordTagger.from_dataset(strains)
+    tagger.tag("Sweet pineapple flavor, leaves users relaxed")
+    # {'flavors': ['Sweet'], 'positive_effects': ['Relaxed'], ...}
+
+    python keyword_tagger.py                 # fill empty fields in enhanced-data.json from descriptions
+    python keyword_tagger.py --dry-run
+"""
+
+import argparse
+import hashlib
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import dataset_io
+import metrics
+import profiling
+
+TOKEN = re.compile(r"[^\W_]+")
+MATCH = None  # trie key holding the (category, value) pairs a phrase ends in
+
+# The detail scraper's fallback vocabulary for pages without a flavors section
+FLAVOR_KEYWORDS = ['vanilla', 'pepper', 'butter', 'lemon', 'citrus', 'berry', 'sweet', 'sour', 'earthy', 'pine',
+                   'diesel', 'cheese', 'mint', 'chocolate', 'coffee', 'grape', 'apple', 'cherry', 'orange',
+                   'tropical', 'floral', 'spicy', 'herbal']
+
+# Dataset fields each category fills, in tag() output order
+CATEGORIES = ('flavors', 'positive_effects', 'negative_effects', 'terpenes', 'conditions')
+
+# -y adjectives that are ordinary words with another meaning (apple -> apply)
+NOT_ADJECTIVES = {'apply'}
+
+
+def variants(surface: str, adjective: bool = False) -> List[str]:
+    """The phrase plus plural and -ing forms of a single word (berry -> berries, relaxed -> relaxing),
+    and with adjective the -y form flavors are described by (pepper -> peppery, spice -> spicy)"""
+    forms = [surface]
+    if ' ' not in surface and surface.isalpha() and len(surface) > 3:
+        if surface.endswith('y') and surface[-2] not in 'aeiou':
+            forms.append(surface[:-1] + 'ies')
+        elif surface.endswith(('s', 'x', 'ch', 'sh')):
+            forms.append(surface + 'es')
+        else:
+            forms.append(surface + 's')
+        if surface.endswith('ed'):
+            forms.append(surface[:-2] + 'ing')
+        if adjective and not surface.endswith('y'):
+            form = surface[:-1] + 'y' if surface.endswith('e') else surface + 'y'
+            if form not in NOT_ADJECTIVES:
+                forms.append(form)
+            if surface.endswith('e'):
+                forms.append(surface + 'y')  # piney, as well as piny
+    return forms
+
+
+class KeywordTagger:
+    """Word-trie matcher over {category: {surface phrase: canonical value}}"""
+
+    def __init__(self, vocabularies: Dict[str, Dict[str, str]]):
+        self.categories = list(vocabularies)
+        self.trie: Dict[Any, Any] = {}
+        # tag() tokenizes text with the same pattern, so it is part of the behaviour too
+        digest = hashlib.blake2b(TOKEN.pattern.encode('utf-8'), digest_size=8)
+        for category, surfaces in vocabularies.items():
+            for surface, canonical in sorted(surfaces.items()):
+                for form in variants(surface.lower(), adjective=category == 'flavors'):
+                    tokens = TOKEN.findall(form)
+                    if not tokens:
+                        continue
+                    node = self.trie
+                    for token in tokens:
+                        node = node.setdefault(token, {})
+                    entries = node.setdefault(MATCH, [])
+                    if (category, canonical) not in entries:
+                        entries.append((category, canonical))
+                    digest.update(f"{category}\0{' '.join(tokens)}\0{canonical}\n".encode('utf-8'))
+        # Hash of the compiled trie (every token sequence and what it maps to), so changes to the
+        # vocabulary, variants(), NOT_ADJECTIVES or TOKEN all change it; part of the parser's memo version
+        self.fingerprint = digest.hexdigest()
+
+    @classmethod
+    def from_keywords(cls, category: str, keywords: Iterable[str]) -> 'KeywordTagger':
+        return cls({category: {keyword: keyword.title() for keyword in keywords}})
+
+    @classmethod
+    def from_dataset(cls, strains: List[Dict[str, Any]]) -> 'KeywordTagger':
+        """Every flavor, effect, terpene and condition the dataset uses, plus the fallback flavors"""
+        vocabularies = {category: {} for category in CATEGORIES}
+        vocabularies['flavors'].update({keyword: keyword.title() for keyword in FLAVOR_KEYWORDS})
+
+        def add(category: str, value: Optional[str]):
+            if not value:
+                return
+            vocabularies[category].setdefault(value.lower(), value)
+            # Composite labels like Spicy/Herbal are also found by either part
+            if '/' in value:
+                for part in value.split('/'):
+                    vocabularies[category].setdefault(part.strip().lower(), value)
+
+        for strain in strains:
+            for field in ('flavors', 'positive_effects', 'negative_effects'):
+                for value in strain.get(field) or ():
+                    add(field, value)
+            for terpene in strain.get('detailed_terpenes') or ():
+                add('terpenes', terpene.get('name') if isinstance(terpene, dict) else terpene)
+            for condition in strain.get('helps_with') or ():
+                add('conditions', condition.get('condition'))
+        return cls(vocabularies)
+
+    def tag(self, text: Optional[str]) -> Dict[str, List[str]]:
+        """Canonical values per category, in order of first appearance"""
+        found = {category: [] for category in self.categories}
+        if not text:
+            return found
+        tokens = TOKEN.findall(text.lower())
+        trie, seen = self.trie, set()
+        for i, token in enumerate(tokens):
+            node = trie.get(token)
+            j = i + 1
+            while node is not None:
+                for entry in node.get(MATCH, ()):
+                    if entry not in seen:
+                        seen.add(entry)
+                        found[entry[0]].append(entry[1])
+                node = node.get(tokens[j]) if j < len(tokens) else None
+                j += 1
+        return found
+
+
+def fill_gaps(strains: List[Dict[str, Any]], tagger: KeywordTagger) -> Dict[str, int]:
+    """Fill empty attribute lists from each strain's description; returns strains filled per field"""
+    filled = {category: 0 for category in CATEGORIES}
+    for strain in strains:
+        tags = tagger.tag(strain.get('description'))
+        for field in ('flavors', 'positive_effects', 'negative_effects'):
+            if tags[field] and not strain.get(field):
+                strain[field] = tags[field]
+                filled[field] += 1
+        if tags['terpenes'] and not strain.get('detailed_terpenes'):
+            strain['detailed_terpenes'] = [{'name': name} for name in tags['terpenes']]
+            filled['terpenes'] += 1
+        if tags['conditions'] and not strain.get('helps_with') and not strain.get('mined_conditions'):
+            # Kept out of helps_with: a mention has no percentage, and the importer, the audit and the
+            # missing-data backfill all treat helps_with as what the strain page reported
+            strain['mined_conditions'] = tags['conditions']
+            filled['conditions'] += 1
+    return filled
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fill empty strain attributes from their descriptions")
+    parser.add_argument('--input', default='enhanced-data.json')
+    parser.add_argument('--output', help='defaults to updating --input in place')
+    parser.add_argument('--dry-run', action='store_true', help='report what would be filled without writing')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    metrics.start_run('keyword_tagger')
+    try:
+        with profiling.profile_run('keyword_tagger', args.profile or ''):
+            with profiling.stage('load'):
+                data = dataset_io.load(args.input)
+                strains = dataset_io.strains_of(data)
+            with profiling.stage('tag'):
+                tagger = KeywordTagger.from_dataset(strains)
+                started = time.perf_counter()
+                filled = fill_gaps(strains, tagger)
+                elapsed = time.perf_counter() - started
+            print(f"🏷️  Tagged {len(strains)} descriptions in {elapsed:.2f}s; filled " +
+                  ', '.join(f"{field} {count}" for field, count in filled.items()))
+            if not args.dry_run:
+                dataset_io.dump(data, args.output or args.input)
+                print(f"💾 Saved {args.output or args.input}")
+    finally:
+        metrics.write_run_report('keyword_tagger')
+
+
+if __name__ == "__main__":
+    main()
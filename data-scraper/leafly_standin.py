@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+Local Leafly stand-in server
+An asyncio HTTP server that serves listing pages, detail pages and images
+synthesized from the fixture corpus, with configurable latency, bandwidth,
+429/503 error rates, Retry-After headers and ETag revalidation, so the scrapers
+can be load-tested without touching the live site.
+
+    python leafly_standin.py --strains 2300 --latency-ms 80 --rate-429 0.02
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+STATUS_TEXT = {200: 'OK', 304: 'Not Modified', 404: 'Not Found', 429: 'Too Many Requests',
+               503: 'Service Unavailable'}
+
+
+@dataclass
+class StandInConfig:
+    strains: int = 120
+    page_size: int = 12
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    bandwidth_kbps: float = 0.0          # 0 = unlimited
+    rate_429: float = 0.0
+    rate_503: float = 0.0
+    retry_after: int = 1
+    etag: bool = True
+    image_bytes: int = 40_000
+    corpus: str = 'v1'
+    seed: int = 0
+    unlisted: bool = False               # serve detail pages for slugs missing from the listing
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    bytes_sent: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    routes: Counter = field(default_factory=Counter)
+
+
+class StandInCorpus:
+    """Synthesizes any number of strains from the fixture pages"""
+
+    def __init__(self, config: StandInConfig):
+        corpus = FIXTURES_DIR / config.corpus
+        listing_html = (corpus / 'listing' / 'page-1.html').read_text(encoding='utf-8')
+        start = listing_html.index('"strains":[') + len('"strains":')
+        templates = json.JSONDecoder().raw_decode(listing_html[start:])[0]
+
+        self.details = []
+        for page in sorted((corpus / 'detail').glob('*.html')):
+            self.details.append((page.stem, page.read_text(encoding='utf-8')))
+
+        self.unlisted = config.unlisted
+        self.page_size = config.page_size
+        self.image_bytes = config.image_bytes
+        self.strains: List[Dict] = []
+        for i in range(config.strains):
+            template = dict(templates[i % len(templates)])
+            generation = i // len(templates)
+            if generation:
+                template['name'] = f"{template['name']} #{generation}"
+                template['slug'] = f"{template['slug']}-{generation}"
+            template['id'] = i + 1
+            self.strains.append(template)
+        self.by_slug = {s['slug']: s for s in self.strains}
+
+    def listing(self, page: int) -> str:
+        chunk = self.strains[(page - 1) * self.page_size:page * self.page_size]
+        payload = json.dumps({'props': {'pageProps': {'initialState': {'strains': chunk}}}},
+                             separators=(',', ':'))
+        return ('<!DOCTYPE html><html><body><div id="__next"><main><h1>Strains</h1></main></div>'
+                f'<script id="__NEXT_DATA__" type="application/json">{payload}</script></body></html>')
+
+    def detail(self, slug: str, base_url: str) -> Optional[str]:
+        strain = self.by_slug.get(slug)
+        if strain is None:
+            if not self.unlisted:
+                return None
+            # Lineage-only strain: stable template choice and a name derived from the slug
+            strain = {'id': int(hashlib.sha1(slug.encode()).hexdigest(), 16) % 997 + 1,
+                      'name': slug.replace('-', ' ').title()}
+        template_slug, html = self.details[(strain['id'] - 1) % len(self.details)]
+        template_name = re.search(r'<h1[^>]*>([^<]+)</h1>', html).group(1)
+        html = html.replace(template_name, strain['name']).replace(template_slug, slug)
+        return html.replace('https://images.leafly.com', base_url)
+
+    def expected_strains(self) -> List[Dict]:
+        return self.strains
+
+    def image(self, name: str) -> bytes:
+        # Deterministic PNG-signed payload of the configured size
+        rng = random.Random(name)
+        return b'\x89PNG\r\n\x1a\n' + rng.randbytes(max(0, self.image_bytes - 8))
+
+
+class LeaflyStandIn:
+    def __init__(self, config: StandInConfig, host: str = '127.0.0.1', port: int = 0):
+        self.config = config
+        self.host = host
+        self.port = port
+        self.corpus = StandInCorpus(config)
+        self.stats = StandInStats()
+        self.rng = random.Random(config.seed)
+        self.server = None
+        self.writers = set()
+        self._loop = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def route(self, target: str) -> Tuple[int, str, bytes]:
+        parts = urlsplit(target)
+        path = parts.path.rstrip('/') or '/'
+        if path == '/strains':
+            page = int(parse_qs(parts.query).get('page', ['1'])[0])
+            self.stats.routes['listing'] += 1
+            return 200, 'text/html; charset=utf-8', self.corpus.listing(page).encode()
+        if path.startswith('/strains/'):
+            self.stats.routes['detail'] += 1
+            html = self.corpus.detail(path.split('/strains/')[-1], self.base_url)
+            if html is not None:
+                return 200, 'text/html; charset=utf-8', html.encode()
+        elif path.startswith('/flower-images/'):
+            self.stats.routes['image'] += 1
+            return 200, 'image/png', self.corpus.image(path.rsplit('/', 1)[-1])
+        return 404, 'text/plain', b'not found'
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.writers.add(writer)
+        try:
+            while True:
+                head = await reader.readuntil(b'\r\n\r\n')
+                lines = head.decode('latin-1').split('\r\n')
+                method, target, _ = lines[0].split(' ', 2)
+                headers = {k.strip().lower(): v.strip() for k, v in
+                           (line.split(':', 1) for line in lines[1:] if ':' in line)}
+                await self.respond(writer, method, target, headers)
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.writers.discard(writer)
+            writer.close()
+
+    async def respond(self, writer, method: str, target: str, headers: Dict[str, str]):
+        config = self.config
+        delay = config.latency_ms + self.rng.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+
+        extra = {}
+        roll = self.rng.random()
+        if roll < config.rate_429:
+            status, content_type, body = 429, 'text/plain', b'rate limited'
+            extra['Retry-After'] = str(config.retry_after)
+        elif roll < config.rate_429 + config.rate_503:
+            status, content_type, body = 503, 'text/plain', b'unavailable'
+            extra['Retry-After'] = str(config.retry_after)
+        else:
+            status, content_type, body = self.route(target)
+            if status == 200 and config.etag:
+                etag = '"%s"' % hashlib.sha1(body).hexdigest()
+                extra['ETag'] = etag
+                if headers.get('if-none-match') == etag:
+                    status, body = 304, b''
+
+        header = [f"HTTP/1.1 {status} {STATUS_TEXT.get(status, 'OK')}",
+                  f"Content-Type: {content_type}",
+                  f"Content-Length: {len(body)}",
+                  "Connection: keep-alive"]
+        header += [f"{k}: {v}" for k, v in extra.items()]
+        writer.write(('\r\n'.join(header) + '\r\n\r\n').encode('latin-1'))
+        if method != 'HEAD':
+            await self.send_body(writer, body)
+        await writer.drain()
+
+        self.stats.requests += 1
+        self.stats.bytes_sent += len(body)
+        self.stats.statuses[status] += 1
+
+    async def send_body(self, writer, body: bytes):
+        if not self.config.bandwidth_kbps:
+            writer.write(body)
+            return
+        chunk = 16 * 1024
+        bytes_per_sec = self.config.bandwidth_kbps * 1024
+        for i in range(0, len(body), chunk):
+            writer.write(body[i:i + chunk])
+            await writer.drain()
+            await asyncio.sleep(min(chunk, len(body) - i) / bytes_per_sec)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def start_in_thread(self) -> 'LeaflyStandIn':
+        """Run the server on its own event loop thread (for in-process load tests)"""
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self._loop.run_until_complete(self.start())
+            ready.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self
+
+    async def shutdown(self):
+        self.server.close()
+        for writer in list(self.writers):
+            writer.close()
+        # Let connection handlers observe EOF and finish before the loop stops
+        await asyncio.sleep(0.1)
+
+    def stop(self):
+        if self._loop:
+            asyncio.run_coroutine_threadsafe(self.shutdown(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._loop.close()
+
+
+def config_from_args(args) -> StandInConfig:
+    return StandInConfig(strains=args.strains, page_size=args.page_size, latency_ms=args.latency_ms,
+                         jitter_ms=args.jitter_ms, bandwidth_kbps=args.bandwidth_kbps,
+                         rate_429=args.rate_429, rate_503=args.rate_503, retry_after=args.retry_after,
+                         etag=not args.no_etag, image_bytes=args.image_bytes, corpus=args.corpus,
+                         seed=args.seed, unlisted=args.unlisted)
+
+
+def add_config_args(parser: argparse.ArgumentParser):
+    parser.add_argument('--strains', type=int, default=120)
+    parser.add_argument('--page-size', type=int, default=12)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--bandwidth-kbps', type=float, default=0.0, help='per-response bandwidth (0 = unlimited)')
+    parser.add_argument('--rate-429', type=float, default=0.0, help='fraction of requests answered 429')
+    parser.add_argument('--rate-503', type=float, default=0.0, help='fraction of requests answered 503')
+    parser.add_argument('--retry-after', type=int, default=1)
+    parser.add_argument('--no-etag', action='store_true')
+    parser.add_argument('--image-bytes', type=int, default=40_000)
+    parser.add_argument('--corpus', default='v1')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--unlisted', action='store_true',
+                        help='serve detail pages for lineage slugs that are not in the listing')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local Leafly stand-in for load tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8899)
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    standin = LeaflyStandIn(config_from_args(args), args.host, args.port)
+
+    async def serve():
+        await standin.start()
+        print(f"🌿 Leafly stand-in serving {args.strains} strains at {standin.base_url}/strains")
+        async with standin.server:
+            await standin.server.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print(f"\n📊 Served {standin.stats.requests} requests: {dict(standin.stats.statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Lineage-frontier crawler
+Strains that only appear as a parent or child in strain-lineage-section never
+reach the listing, so they leave holes in strain_genetics. This crawls them
+breadth-first: every unseen lineage slug in enhanced-data.json is fetched with
+the detail scraper, and the lineage links on those pages form the next level.
+A Bloom filter answers "definitely unseen" for most slugs without touching the
+identity index, which confirms the rest exactly.
+
+    python lineage_crawler.py --max-depth 2 --budget 500
+"""
+
+import argparse
+import hashlib
+import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Tuple
+
+import dataset_io
+import metrics
+import profiling
+from enhanced_scraper import EnhancedLeaflyStrainScraper
+from lineage_graph import lineage_pairs
+from rate_limiter import RateLimiter
+from strain_identity import StrainIdentityIndex, INDEX_FILE, BASE_URL, normalize_name
+
+logger = logging.getLogger(__name__)
+
+
+class BloomFilter:
+    """Fixed-size bit array with k hash probes derived from one blake2b digest"""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _probes(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        for bit in self._probes(key):
+            self.bits[bit >> 3] |= 1 << (bit & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[bit >> 3] & (1 << (bit & 7)) for bit in self._probes(key))
+
+
+class SeenSet:
+    """Bloom filter in front of an exact check against the identity index and this run's fetches"""
+
+    def __init__(self, index: StrainIdentityIndex, capacity: int):
+        self.index = index
+        self.bloom = BloomFilter(capacity)
+        self.crawled = set()
+        self.bloom_negatives = 0
+        self.exact_checks = 0
+        for record in index.strains:
+            self.remember(record)
+
+    def remember(self, record: Dict[str, Any]):
+        """Every form the index resolves a strain by (slug, name, akas), normalized like the lookups"""
+        for ref in (record['slug'], record['name'], *record['akas']):
+            self.bloom.add(normalize_name(ref))
+
+    def add(self, slug: str):
+        self.bloom.add(normalize_name(slug))
+        self.crawled.add(slug)
+
+    def __contains__(self, slug: str) -> bool:
+        if normalize_name(slug) not in self.bloom:
+            self.bloom_negatives += 1
+            return False
+        self.exact_checks += 1
+        return slug in self.crawled or self.index.resolve(slug) is not None
+
+
+def lineage_links(strain: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(name, slug) for every parent and child on a strain page"""
+    genetics = strain.get('genetics') or {}
+    return [(name, slug.lower()) for key in ('parents', 'children')
+            for name, slug in lineage_pairs(genetics, key) if slug]
+
+
+class LineageCrawler:
+    def __init__(self, workers: int = 4, rate: float = 1.0, max_depth: int = 2, budget: int = None,
+                 index_file: str = INDEX_FILE, base_url: str = BASE_URL):
+        self.workers = workers
+        self.base_url = base_url
+        self.limiter = RateLimiter(rate, burst=workers)
+        self.max_depth = max_depth
+        self.budget = budget
+        self.index_file = index_file
+        self.local = threading.local()
+        self.fetched = 0
+        self.discovered: List[Dict[str, Any]] = []
+
+    def scraper(self) -> EnhancedLeaflyStrainScraper:
+        if not hasattr(self.local, 'scraper'):
+            self.local.scraper = EnhancedLeaflyStrainScraper(request_delay=0, index_file=None)
+            self.local.scraper.rate_limiter = self.limiter
+        return self.local.scraper
+
+    def fetch(self, name: str, slug: str) -> Dict[str, Any]:
+        self.limiter.acquire()
+        basic = {'name': name, 'url': f"{self.base_url}/strains/{slug}"}
+        result = self.scraper().scrape_strain_details(basic)
+        return None if result is basic else result
+
+    def crawl(self, strains: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Breadth-first over lineage links; returns the newly discovered strains"""
+        index = StrainIdentityIndex.build(strains, filename=self.index_file)
+        seen = SeenSet(index, capacity=len(index.strains) * 4 + 10_000)
+
+        frontier = []
+        for strain in strains:
+            for name, slug in lineage_links(strain):
+                if slug not in seen:
+                    seen.add(slug)
+                    frontier.append((name, slug))
+
+        depth = 1
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while frontier and depth <= self.max_depth:
+                if self.budget is not None:
+                    frontier = frontier[:max(0, self.budget - self.fetched)]
+                if not frontier:
+                    break
+                logger.info(f"Lineage depth {depth}: fetching {len(frontier)} unseen strains")
+
+                next_frontier = []
+                for strain in executor.map(lambda link: self.fetch(*link), frontier):
+                    self.fetched += 1
+                    metrics.inc('lineage_pages_total', outcome='found' if strain else 'missing')
+                    if not strain:
+                        continue
+                    strain['discovered_via'] = 'lineage'
+                    # The page may live under another slug than the link (an alias), so its canonical
+                    # slug, name and akas go into the filter too
+                    seen.remember(index.get(index.register(strain)))
+                    self.discovered.append(strain)
+                    for name, slug in lineage_links(strain):
+                        if slug not in seen:
+                            seen.add(slug)
+                            next_frontier.append((name, slug))
+                frontier = next_frontier
+                depth += 1
+
+        if self.index_file:
+            index.save(self.index_file)
+        logger.info(f"Fetched {self.fetched} lineage pages, discovered {len(self.discovered)} strains "
+                    f"({len(frontier)} left on the frontier); seen-set: {seen.bloom_negatives} bloom negatives, "
+                    f"{seen.exact_checks} exact checks")
+        return self.discovered
+
+
+def append_to_dataset(strains: List[Dict[str, Any]], filename: str = 'enhanced-data.json'):
+    data = dataset_io.load(filename)
+    data['enhanced_strains'].extend(strains)
+    data['total_strains'] = len(data['enhanced_strains'])
+    dataset_io.dump(data, filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl strains reachable only through lineage links")
+    parser.add_argument('--input', default='enhanced-data.json')
+    parser.add_argument('--max-depth', type=int, default=2, help='lineage hops beyond the dataset')
+    parser.add_argument('--budget', type=int, help='maximum detail pages to fetch')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent fetches (same default as pipeline.py)')
+    parser.add_argument('--rate', type=float, default=1.0, help='shared request budget (requests/second)')
+    parser.add_argument('--base-url', default=BASE_URL)
+    parser.add_argument('--dry-run', action='store_true', help='crawl but do not modify the dataset')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    metrics.start_run('lineage_crawler')
+    try:
+        with profiling.profile_run('lineage_crawler', args.profile or ''):
+            strains = dataset_io.load_strains(args.input)
+            crawler = LineageCrawler(args.workers, args.rate, args.max_depth, args.budget,
+                                     index_file=None if args.dry_run else INDEX_FILE, base_url=args.base_url)
+            discovered = crawler.crawl(strains)
+            if discovered and not args.dry_run:
+                append_to_dataset(discovered, args.input)
+                print(f"💾 Added {len(discovered)} lineage-only strains to {args.input}")
+    finally:
+        metrics.write_run_report('lineage_crawler')
+
+
+if __name__ == "__main__":
+    main()
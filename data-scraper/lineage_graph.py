@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Lineage graph builder
+Resolves parent/child lineage slugs from enhanced-data.json to canonical strains,
+builds an integer-keyed lineage graph and precomputes an ancestor/descendant
+closure table so a full family tree is one indexed lookup in the database.
+"""
+
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, Tuple
+
+import metrics
+from strain_identity import StrainIdentityIndex
+
+
+LINEAGE_SLUG_KEYS = {'parents': 'parent_slugs', 'children': 'child_slugs'}
+
+
+def slug_from_lineage_name(name: str) -> str:
+    """Invert the slug.replace('-', ' ').title() naming used for lineage entries"""
+    return name.strip().lower().replace(' ', '-')
+
+
+class LineageGraph:
+    """Integer-keyed lineage graph resolved through the strain identity index"""
+
+    def __init__(self, index: Optional[StrainIdentityIndex] = None):
+        self.index = index or StrainIdentityIndex()
+        self.nodes: List[Dict[str, Any]] = []
+        self.by_strain_id: Dict[int, int] = {}
+        self.by_slug: Dict[str, int] = {}
+        self.parents: Dict[int, set] = {}
+        self.unresolved = 0
+
+    def add_strain(self, strain: Dict[str, Any]) -> int:
+        """Register a dataset strain as a node and return its node ID"""
+        record = self.index.get(self.index.register(strain))
+        node_id = self.by_slug.get(record['slug'])
+        if node_id is None:
+            node_id = self._add_node(record['name'], record['slug'], in_dataset=True)
+        else:
+            # A lineage placeholder created earlier becomes the real strain
+            self.nodes[node_id].update({'name': record['name'], 'in_dataset': True})
+        self.by_strain_id[record['id']] = node_id
+        return node_id
+
+    def _add_node(self, name: str, slug: str, in_dataset: bool) -> int:
+        node_id = len(self.nodes)
+        self.nodes.append({'id': node_id, 'name': name, 'slug': slug, 'in_dataset': in_dataset})
+        self.by_slug[slug] = node_id
+        return node_id
+
+    def resolve(self, lineage_name: str, slug: Optional[str] = None) -> int:
+        """Resolve a lineage entry to a node ID, creating a placeholder if unknown"""
+        slug = (slug or slug_from_lineage_name(lineage_name)).lower()
+        if slug in self.by_slug:
+            return self.by_slug[slug]
+
+        strain_id = self.index.resolve(slug)
+        if strain_id is None:
+            strain_id = self.index.resolve(lineage_name)
+        if strain_id is not None and strain_id in self.by_strain_id:
+            return self.by_strain_id[strain_id]
+
+        self.unresolved += 1
+        return self._add_node(lineage_name.strip(), slug, in_dataset=False)
+
+    def add_edge(self, parent_id: int, child_id: int):
+        if parent_id != child_id:
+            self.parents.setdefault(child_id, set()).add(parent_id)
+
+    def edges(self) -> List[Tuple[int, int]]:
+        return sorted((p, c) for c, ps in self.parents.items() for p in ps)
+
+    def closure(self) -> List[Tuple[int, int, int]]:
+        """Return (ancestor_id, descendant_id, depth) rows, shortest depth per pair"""
+        rows = []
+        for node in self.nodes:
+            descendant = node['id']
+            rows.append((descendant, descendant, 0))
+            seen = {descendant}
+            queue = deque((p, 1) for p in self.parents.get(descendant, ()))
+            while queue:
+                ancestor, depth = queue.popleft()
+                if ancestor in seen:
+                    continue
+                seen.add(ancestor)
+                rows.append((ancestor, descendant, depth))
+                queue.extend((p, depth + 1) for p in self.parents.get(ancestor, ()))
+        return rows
+
+    def canonical_name(self, lineage_name: str, slug: Optional[str] = None) -> str:
+        return self.nodes[self.resolve(lineage_name, slug)]['name']
+
+
+def lineage_pairs(genetics: Dict[str, Any], key: str) -> List[Tuple[str, Optional[str]]]:
+    """Pair lineage names with their recorded slugs (when the scraper kept them)"""
+    names = genetics.get(key, []) or []
+    slugs = genetics.get(LINEAGE_SLUG_KEYS[key], []) or []
+    if len(slugs) != len(names):
+        slugs = [None] * len(names)
+    return [(n, s) for n, s in zip(names, slugs) if n and n.strip()]
+
+
+def build_lineage_graph(strains_data: List[Dict[str, Any]],
+                        index: Optional[StrainIdentityIndex] = None) -> LineageGraph:
+    """Build the lineage graph for every strain in the dataset"""
+    graph = LineageGraph(index)
+
+    # Register all dataset strains first so lineage entries resolve to them
+    strain_ids = [graph.add_strain(strain) for strain in strains_data if strain.get('name')]
+
+    for strain_id, strain in zip(strain_ids, (s for s in strains_data if s.get('name'))):
+        genetics = strain.get('genetics', {}) or {}
+        for name, slug in lineage_pairs(genetics, 'parents'):
+            graph.add_edge(graph.resolve(name, slug), strain_id)
+        for name, slug in lineage_pairs(genetics, 'children'):
+            graph.add_edge(strain_id, graph.resolve(name, slug))
+
+    return graph
+
+
+def save_lineage_graph(graph: LineageGraph, filename: str = 'lineage-graph.json'):
+    """Save nodes, integer edges and the closure table to JSON"""
+    closure = graph.closure()
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump({
+            'generated_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'total_nodes': len(graph.nodes),
+            'nodes': graph.nodes,
+            'edges': graph.edges(),
+            'closure': closure
+        }, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"💾 Saved {len(graph.nodes)} nodes, {len(graph.edges())} edges, "
+          f"{len(closure)} closure rows to {filename}")
+
+
+def lineage_node_records(graph: LineageGraph) -> List[Tuple[int, str, str, Optional[str]]]:
+    """(id, name, slug, strain_name) rows; strain_name is cleaned the way insert_strains cleans strains.name"""
+    from import_to_db import clean_string
+
+    return [
+        (n['id'], clean_string(n['name'], 100), n['slug'][:100],
+         clean_string(n['name'], 100) if n['in_dataset'] else None)
+        for n in graph.nodes
+    ]
+
+
+def import_lineage_graph(conn, graph: LineageGraph):
+    """Replace the lineage node and closure tables with the freshly built graph"""
+    from psycopg2.extras import execute_values
+
+    cursor = conn.cursor()
+    node_records = lineage_node_records(graph)
+    closure = graph.closure()
+
+    try:
+        cursor.execute("TRUNCATE strain_lineage_closure, strain_lineage_nodes")
+        with metrics.db_statement('strain_lineage_nodes', len(node_records)):
+            execute_values(cursor,
+                           "INSERT INTO strain_lineage_nodes (id, name, slug, strain_name) VALUES %s",
+                           node_records, page_size=1000)
+        with metrics.db_statement('strain_lineage_closure', len(closure)):
+            execute_values(cursor,
+                           "INSERT INTO strain_lineage_closure (ancestor_id, descendant_id, depth) VALUES %s",
+                           closure, page_size=5000)
+        conn.commit()
+        print(f"Inserted {len(node_records)} lineage nodes")
+        print(f"Inserted {len(closure)} lineage closure rows")
+    except Exception as e:
+        conn.rollback()
+        print(f"Error inserting lineage graph: {e}")
+        raise
+
+
+def main():
+    """Build the lineage graph and optionally import it (pass --import)"""
+    from import_to_db import load_json_data
+
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    json_file_path = os.path.join(current_dir, 'enhanced-data.json')
+
+    print("🧬 Strain Lineage Graph Builder")
+    print("=" * 40)
+
+    strains_data = load_json_data(json_file_path)
+    index = StrainIdentityIndex.build(strains_data, os.path.join(current_dir, 'strain-index.json'), save=True)
+    graph = build_lineage_graph(strains_data, index)
+
+    in_dataset = sum(1 for n in graph.nodes if n['in_dataset'])
+    print(f"🔗 Resolved {len(graph.edges())} lineage edges")
+    print(f"   • Dataset strains: {in_dataset}")
+    print(f"   • Lineage-only strains: {len(graph.nodes) - in_dataset}")
+
+    save_lineage_graph(graph, os.path.join(current_dir, 'lineage-graph.json'))
+
+    if '--import' in sys.argv[1:]:
+        from import_to_db import connect_to_db, ensure_columns
+        conn = connect_to_db()
+        try:
+            ensure_columns(conn)
+            import_lineage_graph(conn, graph)
+        finally:
+            conn.close()
+            print("🔐 Database connection closed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Load test the scrapers against the local Leafly stand-in
+Runs scrape_all_pages, scrape_enhanced_data and the image downloader against
+leafly_standin.py and reports throughput, tail latency and correctness.
+
+    python load_test.py --strains 500 --latency-ms 50 --rate-429 0.02
+"""
+
+import argparse
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+
+from leafly_standin import LeaflyStandIn, add_config_args, config_from_args
+from main import LeaflyStrainScraper
+from enhanced_scraper import EnhancedLeaflyStrainScraper
+import image_uploader
+
+
+class TimedSession:
+    """Wraps session.get to record per-request latency"""
+
+    def __init__(self, get: Callable, latencies: List[float]):
+        self.get_inner = get
+        self.latencies = latencies
+
+    def __call__(self, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return self.get_inner(*args, **kwargs)
+        finally:
+            self.latencies.append(time.perf_counter() - start)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(stage: str, elapsed: float, latencies: List[float], correct: int, expected: int) -> Dict[str, Any]:
+    return {
+        'stage': stage,
+        'requests': len(latencies),
+        'elapsed_s': round(elapsed, 2),
+        'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'max_ms': round(max(latencies, default=0) * 1000, 1),
+        'correct': correct,
+        'expected': expected,
+    }
+
+
+def run_listing(standin: LeaflyStandIn):
+    scraper = LeaflyStrainScraper(base_url=standin.base_url, page_delay=0)
+    latencies = []
+    scraper.session.get = TimedSession(scraper.session.get, latencies)
+
+    start = time.perf_counter()
+    scraper.scrape_all_pages()
+    elapsed = time.perf_counter() - start
+
+    expected = {s['slug'] for s in standin.corpus.expected_strains()}
+    scraped = {s['url'].rsplit('/', 1)[-1] for s in scraper.strains_data}
+    return scraper.strains_data, summarize('listing', elapsed, latencies, len(expected & scraped), len(expected))
+
+
+def run_details(standin: LeaflyStandIn, strains: List[Dict[str, Any]], images_dir: str):
+    scraper = EnhancedLeaflyStrainScraper(request_delay=0, images_dir=images_dir, index_file=None,
+                                          parse_memo_file=None)
+    latencies = []
+    scraper.session.get = TimedSession(scraper.session.get, latencies)
+
+    start = time.perf_counter()
+    scraper.scrape_enhanced_data(strains)
+    elapsed = time.perf_counter() - start
+
+    # Every fixture-derived detail page carries a description
+    correct = sum(1 for s in scraper.enhanced_data if s.get('description'))
+    return scraper.enhanced_data, summarize('detail+images', elapsed, latencies, correct, len(strains))
+
+
+def run_image_downloads(standin: LeaflyStandIn, strains: List[Dict[str, Any]]):
+    latencies = []
+    urls = [image_uploader.clean_image_url(s['image_url']) for s in strains if s.get('image_url')]
+    expected_size = standin.config.image_bytes
+
+    start = time.perf_counter()
+    correct = 0
+    for url in urls:
+        request_start = time.perf_counter()
+        data = image_uploader.download_image(url)
+        latencies.append(time.perf_counter() - request_start)
+        if data and len(data) == expected_size:
+            correct += 1
+    elapsed = time.perf_counter() - start
+    return summarize('image_uploader', elapsed, latencies, correct, len(urls))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the scrapers against a local Leafly stand-in")
+    add_config_args(parser)
+    args = parser.parse_args()
+
+    standin = LeaflyStandIn(config_from_args(args)).start_in_thread()
+    print(f"🌿 Stand-in at {standin.base_url} ({args.strains} strains)")
+
+    results = []
+    try:
+        strains, listing = run_listing(standin)
+        results.append(listing)
+        with tempfile.TemporaryDirectory() as images_dir:
+            enhanced, details = run_details(standin, strains, images_dir)
+        results.append(details)
+        results.append(run_image_downloads(standin, enhanced))
+    finally:
+        standin.stop()
+
+    print("\n" + "=" * 86)
+    print(f"{'stage':<16} {'reqs':>6} {'secs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'p99 ms':>8} {'correct':>14}")
+    print("-" * 86)
+    for r in results:
+        print(f"{r['stage']:<16} {r['requests']:>6} {r['elapsed_s']:>7} {r['throughput_rps']:>8} "
+              f"{r['p50_ms']:>8} {r['p95_ms']:>8} {r['p99_ms']:>8} {r['correct']:>6}/{r['expected']:<7}")
+    print("=" * 86)
+    stats = standin.stats
+    print(f"Server: {stats.requests} requests, {stats.bytes_sent / 1e6:.1f} MB, "
+          f"statuses {dict(stats.statuses)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -11,15 +11,19 @@ import time
 import re
 from urllib.parse import urljoin
 import logging
+import dataset_io
+import metrics
+import profiling
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 class LeaflyStrainScraper:
-    def __init__(self):
-        self.base_url = "https://www.leafly.com"
-        self.strains_url = "https://www.leafly.com/strains"
+    def __init__(self, base_url="https://www.leafly.com", page_delay=10):
+        self.base_url = base_url
+        self.strains_url = f"{base_url}/strains"
+        self.page_delay = page_delay
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -35,7 +39,10 @@ class LeaflyStrainScraper:
         """Fetch a page with error handling"""
         try:
             logger.info(f"Fetching: {url}")
-            response = self.session.get(url, timeout=30)
+            with metrics.timer('fetch_seconds', kind='listing'):
+                response = self.session.get(url, timeout=30)
+            metrics.inc('fetch_requests_total', kind='listing', status=response.status_code)
+            metrics.inc('fetch_bytes_total', len(response.content), kind='listing')
             response.raise_for_status()
             return response.text
         except requests.RequestException as e:
@@ -202,14 +209,15 @@ class LeaflyStrainScraper:
             return []
         
         # Extract strain data from embedded JSON
-        strains_json = self.extract_json_data(html_content)
-        
-        page_strains = []
-        for strain_json in strains_json:
-            strain_data = self.parse_json_strain(strain_json)
-            if strain_data and strain_data.get('name'):
-                page_strains.append(strain_data)
-                logger.info(f"Scraped: {strain_data['name']}")
+        with metrics.timer('parse_seconds', kind='listing'):
+            strains_json = self.extract_json_data(html_content)
+            
+            page_strains = []
+            for strain_json in strains_json:
+                strain_data = self.parse_json_strain(strain_json)
+                if strain_data and strain_data.get('name'):
+                    page_strains.append(strain_data)
+                    logger.info(f"Scraped: {strain_data['name']}")
         
         return page_strains
 
@@ -232,8 +240,9 @@ class LeaflyStrainScraper:
             logger.info(f"Page {page_num} complete. Found {len(page_strains)} strains. Total so far: {len(self.strains_data)}")
             
             # Add delay between pages
-            logger.info("Waiting 10 seconds before next page...")
-            time.sleep(10)
+            if self.page_delay:
+                logger.info(f"Waiting {self.page_delay} seconds before next page...")
+                time.sleep(self.page_delay)
             
             page_num += 1
         
@@ -242,12 +251,7 @@ class LeaflyStrainScraper:
     def save_to_json(self, filename="data.json"):
         """Save scraped data to JSON file"""
         try:
-            with open(filename, 'w', encoding='utf-8') as f:
-                json.dump({
-                    'total_strains': len(self.strains_data),
-                    'scrape_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
-                    'strains': self.strains_data
-                }, f, indent=2, ensure_ascii=False)
+            dataset_io.save_strains(self.strains_data, filename, key='strains')
             
             logger.info(f"Data saved to {filename}")
             return True
@@ -280,13 +284,16 @@ class LeaflyStrainScraper:
 def main():
     """Main function to run the scraper"""
     scraper = LeaflyStrainScraper()
+    metrics.start_run('main')
     
     try:
         # Scrape all available pages
-        scraper.scrape_all_pages()
+        with profiling.stage('scrape'):
+            scraper.scrape_all_pages()
         
         # Save to JSON
-        scraper.save_to_json("data.json")
+        with profiling.stage('save'):
+            scraper.save_to_json("data.json")
         
         # Print summary
         scraper.print_summary()
@@ -296,6 +303,9 @@ def main():
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
         raise
+    finally:
+        metrics.write_run_report('main')
 
 if __name__ == "__main__":
-    main()
+    with profiling.profile_run('main'):
+        main()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Strain map layout
+Precomputes the genealogy map (front/src/pages/map.astro) offline: lineage edges
+are resolved through the lineage graph, the family-tree layout the page used to
+run in the browser is computed here, and nodes, integer edges and tile bounding
+boxes are written to one compact JSON artifact the page loads with a single fetch.
+
+    python map_layout.py                 # writes strain-map.json
+    python map_layout.py --upload        # also uploads it to S3 as map/strain-map.json
+"""
+
+import argparse
+import json
+import math
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Tuple
+
+import dataset_io
+import metrics
+import profiling
+from lineage_graph import build_lineage_graph
+from strain_identity import StrainIdentityIndex, INDEX_FILE
+
+MAP_FILE = 'strain-map.json'
+MAP_S3_KEY = 'map/strain-map.json'
+FORMAT_VERSION = 1
+
+# Same geometry as the map page
+NODE_SIZE = 60
+NODE_SPACING = 120
+LEVEL_HEIGHT = NODE_SPACING * 1.8
+TREE_SPACING = 800
+MAX_TREES_PER_ROW = 4
+MAX_TREE_WIDTH = 600
+MAX_DEPTH = 6
+UNCONNECTED_X = -1200
+TILE_SIZE = 2048
+
+TYPES = ('Hybrid', 'Indica', 'Sativa')
+
+
+def family_trees(node_count: int, children: Dict[int, List[int]],
+                 has_parent: List[bool]) -> Tuple[List[List[List[int]]], set]:
+    """Breadth-first levels below every root (a strain with no parent on the map)"""
+    trees = []
+    positioned = set()
+    for root in range(node_count):
+        if has_parent[root] or root in positioned:
+            continue
+        levels = []
+        queue = deque([(root, 0)])
+        positioned.add(root)
+        while queue:
+            node, level = queue.popleft()
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(node)
+            if level + 1 >= MAX_DEPTH:
+                continue
+            for child in children.get(node, ()):
+                if child not in positioned:
+                    positioned.add(child)
+                    queue.append((child, level + 1))
+        trees.append(levels)
+    return trees, positioned
+
+
+def layout(node_count: int, edges: List[Tuple[int, int]]) -> Tuple[List[int], List[int], List[int]]:
+    """x, y and tree level per node; strains outside every tree go in the left column"""
+    children: Dict[int, List[int]] = {}
+    has_parent = [False] * node_count
+    for parent, child in edges:
+        children.setdefault(parent, []).append(child)
+        has_parent[child] = True
+
+    trees, positioned = family_trees(node_count, children, has_parent)
+    xs, ys, levels = [0] * node_count, [0] * node_count, [0] * node_count
+
+    per_row = min(MAX_TREES_PER_ROW, math.ceil(math.sqrt(len(trees)))) if trees else 1
+    for tree_index, tree in enumerate(trees):
+        row, col = divmod(tree_index, per_row)
+        offset_x = (col - (per_row - 1) / 2) * TREE_SPACING
+        start_y = 100 + row * TREE_SPACING
+        for level_index, level in enumerate(tree):
+            width = min(MAX_TREE_WIDTH, len(level) * NODE_SPACING * 1.5)
+            spacing = width / (len(level) - 1) if len(level) > 1 else 0
+            for i, node in enumerate(level):
+                xs[node] = round(offset_x if len(level) == 1 else offset_x - width / 2 + i * spacing)
+                ys[node] = round(start_y + level_index * LEVEL_HEIGHT)
+                levels[node] = level_index
+
+    # Cycles without a root and strains deeper than MAX_DEPTH
+    unconnected = [n for n in range(node_count) if n not in positioned]
+    for i, node in enumerate(unconnected):
+        xs[node], ys[node], levels[node] = UNCONNECTED_X, 100 + i * (NODE_SIZE + 20), 1000
+    return xs, ys, levels
+
+
+def tile_of(x: int, y: int) -> Tuple[int, int]:
+    return x // TILE_SIZE, y // TILE_SIZE
+
+
+def build_map(strains_data: List[Dict[str, Any]],
+              index: Optional[StrainIdentityIndex] = None) -> Dict[str, Any]:
+    """Resolve, lay out and tile every dataset strain into the map artifact"""
+    graph = build_lineage_graph(strains_data, index)
+    by_name = {}
+    for strain in strains_data:
+        by_name.setdefault(strain.get('name'), strain)
+
+    # Only strains that are on the site get a node; lineage placeholders are dropped
+    dataset_nodes = [n for n in graph.nodes if n['in_dataset']]
+    node_index = {n['id']: i for i, n in enumerate(dataset_nodes)}
+    edges = [(node_index[p], node_index[c]) for p, c in graph.edges()
+             if p in node_index and c in node_index]
+
+    xs, ys, levels = layout(len(dataset_nodes), edges)
+
+    # Order nodes by tile so each tile is one contiguous slice of the node arrays
+    order = sorted(range(len(dataset_nodes)), key=lambda n: (tile_of(xs[n], ys[n])[::-1], n))
+    position = {old: new for new, old in enumerate(order)}
+    edges = sorted(((position[p], position[c]) for p, c in edges),
+                   key=lambda e: (tile_of(xs[order[e[1]]], ys[order[e[1]]])[::-1], e))
+
+    names, slugs, types, ratings, thcs = [], [], [], [], []
+    for old in order:
+        node = dataset_nodes[old]
+        strain = by_name.get(node['name'], {})
+        strain_type = strain.get('type')
+        names.append(node['name'])
+        slugs.append(node['slug'])
+        types.append(TYPES.index(strain_type) if strain_type in TYPES else 0)
+        ratings.append(float(strain['rating']) if strain.get('rating') else None)
+        thcs.append(strain.get('thc') or None)
+    xs, ys, levels = ([column[old] for old in order] for column in (xs, ys, levels))
+
+    # Tiles: [tx, ty, node_start, node_end, edge_start, edge_end, min_x, min_y, max_x, max_y].
+    # Edges belong to their child's tile and the box covers the edge's parent end too.
+    half = NODE_SIZE // 2
+    tiles: Dict[Tuple[int, int], List[int]] = {}
+    for n in range(len(names)):
+        key = tile_of(xs[n], ys[n])
+        tile = tiles.get(key)
+        if tile is None:
+            tile = tiles[key] = [key[0], key[1], n, n, 0, 0,
+                                 xs[n] - half, ys[n] - half, xs[n] + half, ys[n] + half]
+        tile[3] = n + 1
+        tile[6], tile[7] = min(tile[6], xs[n] - half), min(tile[7], ys[n] - half)
+        tile[8], tile[9] = max(tile[8], xs[n] + half), max(tile[9], ys[n] + half)
+    for e, (parent, child) in enumerate(edges):
+        tile = tiles[tile_of(xs[child], ys[child])]
+        if tile[5] == 0:
+            tile[4] = e
+        tile[5] = e + 1
+        tile[6], tile[7] = min(tile[6], xs[parent]), min(tile[7], ys[parent])
+        tile[8], tile[9] = max(tile[8], xs[parent]), max(tile[9], ys[parent])
+
+    tile_list = list(tiles.values())
+    bounds = [min((t[6] for t in tile_list), default=0), min((t[7] for t in tile_list), default=0),
+              max((t[8] for t in tile_list), default=0), max((t[9] for t in tile_list), default=0)]
+    return {
+        'version': FORMAT_VERSION,
+        'generated_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'node_size': NODE_SIZE,
+        'tile_size': TILE_SIZE,
+        'bounds': bounds,
+        'types': list(TYPES),
+        'nodes': {'name': names, 'slug': slugs, 'type': types, 'rating': ratings, 'thc': thcs,
+                  'x': xs, 'y': ys, 'level': levels},
+        'edges': [v for edge in edges for v in edge],
+        'tiles': tile_list,
+    }
+
+
+def save_map(artifact: Dict[str, Any], filename: str = MAP_FILE) -> bytes:
+    body = json.dumps(artifact, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    with open(filename + '.tmp', 'wb') as f:
+        f.write(body)
+    os.replace(filename + '.tmp', filename)
+    print(f"🗺️  Saved {len(artifact['nodes']['name'])} nodes, {len(artifact['edges']) // 2} edges, "
+          f"{len(artifact['tiles'])} tiles to {filename} ({len(body) / 1024:.0f} KB)")
+    return body
+
+
+def upload_map(s3_client, body: bytes, s3_key: str = MAP_S3_KEY) -> bool:
+    """Upload the artifact next to the strain images; short cache so new layouts show up"""
+    from botocore.exceptions import ClientError
+    from image_uploader import S3_CONFIG
+
+    try:
+        s3_client.put_object(
+            Bucket=S3_CONFIG['BUCKET'],
+            Key=s3_key,
+            Body=body,
+            ContentType='application/json',
+            CacheControl='max-age=300'
+        )
+        print(f"☁️  Uploaded {s3_key}")
+        return True
+    except ClientError as e:
+        print(f"❌ Failed to upload {s3_key}: {e}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute the strain genealogy map layout")
+    parser.add_argument('--input', default='enhanced-data.json')
+    parser.add_argument('--output', default=MAP_FILE)
+    parser.add_argument('--upload', action='store_true', help=f'upload to S3 as {MAP_S3_KEY}')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    metrics.start_run('map_layout')
+    try:
+        with profiling.profile_run('map_layout', args.profile or ''):
+            with profiling.stage('load'):
+                strains_data = dataset_io.load_strains(args.input)
+                index = StrainIdentityIndex.build(strains_data, INDEX_FILE)
+            with profiling.stage('layout'):
+                artifact = build_map(strains_data, index)
+            body = save_map(artifact, args.output)
+            if args.upload:
+                import image_uploader
+                upload_map(image_uploader.init_s3_client(), body)
+    finally:
+        metrics.write_run_report('map_layout')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Lightweight run metrics shared by the pipeline scripts
+Thread-safe counters and latency histograms (fetches, bytes, parse time, retries,
+S3 calls, DB statements) written at the end of a run as a Prometheus textfile
+and a JSON run report under METRICS_DIR (default: metrics/).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+METRICS_DIR = os.getenv('METRICS_DIR', 'metrics')
+
+# Latency buckets in seconds (Prometheus histogram upper bounds)
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HELP = {
+    'fetch_requests_total': 'HTTP requests made, by script, kind and status',
+    'fetch_bytes_total': 'Response bytes received',
+    'fetch_seconds': 'HTTP request latency',
+    'parse_seconds': 'Time spent parsing pages',
+    'parse_memo_total': 'Parse memo lookups, by outcome (hit skips parsing)',
+    'retries_total': 'Requests retried after a failure or rate limit',
+    's3_requests_total': 'S3 API calls, by operation and outcome',
+    's3_seconds': 'S3 API call latency',
+    'db_statements_total': 'Database batch statements executed, by table',
+    'db_rows_total': 'Rows sent to the database, by table',
+    'db_seconds': 'Database statement latency',
+    'pipeline_items_total': 'Items handled by each streaming pipeline stage, by outcome',
+    'lineage_pages_total': 'Lineage-only strain pages fetched, by outcome',
+    'queue_tasks_total': 'Work-queue tasks finished by this worker, by kind and outcome',
+    'atlas_bytes_total': 'Encoded sprite atlas bytes written',
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt_labels(key: LabelKey, extra: Dict[str, str] = None) -> str:
+    items = list(key) + sorted((extra or {}).items())
+    if not items:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in items) + '}'
+
+
+class Registry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Dict[str, float]]] = {}
+        self.started = time.time()
+        self.script = None
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = _key(labels)
+        with self.lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = _key(labels)
+        with self.lock:
+            series = self.histograms.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(BUCKETS)}
+            hist['count'] += 1
+            hist['sum'] += seconds
+            hist['max'] = max(hist['max'], seconds)
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    hist['buckets'][i] += 1
+                    break
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def prometheus_text(self) -> str:
+        # Every series carries the script name so textfiles from all scripts can coexist
+        lines = []
+        run = {'script': self.script or 'pipeline'}
+        with self.lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# HELP budedex_{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE budedex_{name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"budedex_{name}{_fmt_labels(key, run)} {value}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# HELP budedex_{name} {HELP.get(name, name)}")
+                lines.append(f"# TYPE budedex_{name} histogram")
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, hist['buckets']):
+                        cumulative += count
+                        lines.append(f"budedex_{name}_bucket{_fmt_labels(key, {**run, 'le': str(bound)})} {cumulative}")
+                    lines.append(f"budedex_{name}_bucket{_fmt_labels(key, {**run, 'le': '+Inf'})} {hist['count']}")
+                    lines.append(f"budedex_{name}_sum{_fmt_labels(key, run)} {hist['sum']:.6f}")
+                    lines.append(f"budedex_{name}_count{_fmt_labels(key, run)} {hist['count']}")
+            lines.append("# TYPE budedex_run_duration_seconds gauge")
+            lines.append(f"budedex_run_duration_seconds{_fmt_labels((), run)} {time.time() - self.started:.3f}")
+        return '\n'.join(lines) + '\n'
+
+    def report(self) -> Dict:
+        with self.lock:
+            return {
+                'script': self.script,
+                'started': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.started)),
+                'duration_seconds': round(time.time() - self.started, 3),
+                'counters': {
+                    name: [{'labels': dict(key), 'value': value} for key, value in sorted(series.items())]
+                    for name, series in sorted(self.counters.items())
+                },
+                'histograms': {
+                    name: [{
+                        'labels': dict(key),
+                        'count': hist['count'],
+                        'total_seconds': round(hist['sum'], 6),
+                        'mean_seconds': round(hist['sum'] / hist['count'], 6) if hist['count'] else 0,
+                        'max_seconds': round(hist['max'], 6),
+                    } for key, hist in sorted(series.items())]
+                    for name, series in sorted(self.histograms.items())
+                },
+            }
+
+
+REGISTRY = Registry()
+inc = REGISTRY.inc
+observe = REGISTRY.observe
+timer = REGISTRY.timer
+
+
+@contextmanager
+def db_statement(table: str, rows: int):
+    """Count and time one batched statement against a table"""
+    inc('db_statements_total', table=table)
+    inc('db_rows_total', rows, table=table)
+    with timer('db_seconds', table=table):
+        yield
+
+
+def instrument_s3(client):
+    """Count and time every API call made through a boto3 S3 client"""
+    def before(model, context, **kwargs):
+        context['metrics_started'] = time.perf_counter()
+
+    def after(model, http_response, context, **kwargs):
+        started = context.pop('metrics_started', None)
+        if started is not None:
+            observe('s3_seconds', time.perf_counter() - started, operation=model.name)
+        inc('s3_requests_total', operation=model.name, status=http_response.status_code)
+
+    client.meta.events.register('before-call.s3', before)
+    client.meta.events.register('after-call.s3', after)
+    return client
+
+
+def start_run(script: str):
+    """Mark the start of a script run (resets the clock used for run duration)"""
+    REGISTRY.script = script
+    REGISTRY.started = time.time()
+
+
+def write_run_report(script: str = None, directory: str = METRICS_DIR):
+    """Write <script>.prom (node_exporter textfile format) and <script>-report.json"""
+    script = script or REGISTRY.script or 'pipeline'
+    REGISTRY.script = script
+    os.makedirs(directory, exist_ok=True)
+
+    prom_path = os.path.join(directory, f"{script}.prom")
+    with open(prom_path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(REGISTRY.prometheus_text())
+    os.replace(prom_path + '.tmp', prom_path)
+
+    report_path = os.path.join(directory, f"{script}-report.json")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        json.dump(REGISTRY.report(), f, indent=2)
+    return prom_path, report_path
@@ -3,17 +3,30 @@
 Missing Data Scraper for Leafly Strains
 Checks enhanced-data.json for strains with missing flavors/helps_with data
 and re-scrapes only those specific strains to fill in the gaps.
+
+Batch mode (cron-friendly, no prompt):
+    python missing_data_scraper.py --batch --workers 8 --rate 2 --merge
 """
 
+import argparse
 import json
+import sys
+import threading
 import requests
 from bs4 import BeautifulSoup
 import time
 import logging
 import re
-import os
 from urllib.parse import urljoin, urlparse
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import dataset_io
+import metrics
+import profiling
+import strain_record
+from json_paths import JSONPathExtractor, TARGET_FIELDS
+from rate_limiter import RateLimiter, retry_after, throttle, MAX_THROTTLE_RETRIES
+from strain_identity import StrainIdentityIndex, slugify, slug_from_url
 
 # Configure logging
 logging.basicConfig(
@@ -25,6 +38,8 @@ logging.basicConfig(
     ]
 )
 
+PATCH_FILE = 'enhanced-data.patch.json'
+
 class MissingDataScraper:
     def __init__(self):
         self.session = requests.Session()
@@ -33,22 +48,26 @@ class MissingDataScraper:
         })
         self.base_url = "https://www.leafly.com"
         self.enhanced_data = None
+        self.identity_index = None
+        self.json_paths = JSONPathExtractor.load()
         self.missing_strains = []
         self.updated_strains = []
+        self.rate_limiter = None
         
     def load_enhanced_data(self):
         """Load the existing enhanced data and identify strains with missing data"""
         try:
-            with open('enhanced-data.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                self.enhanced_data = data
+            data = dataset_io.load('enhanced-data.json')
+            self.enhanced_data = data
                 
             if 'enhanced_strains' not in data:
                 logging.error("No enhanced_strains found in enhanced-data.json")
                 return False
                 
-            strains = data['enhanced_strains']
+            # Compact records: the gap list points at them and update_strain_data fills them in place
+            strains = strain_record.compact(data['enhanced_strains'])
             logging.info(f"Loaded {len(strains)} strains from enhanced-data.json")
+            self.identity_index = StrainIdentityIndex.build(strains)
             
             # Find strains with missing data
             for strain in strains:
@@ -66,8 +85,10 @@ class MissingDataScraper:
                     missing_fields.append('helps_with')
                 
                 if has_missing_data:
-                    # Generate URL from strain name
-                    strain_url = self.generate_strain_url(strain.get('name', ''))
+                    # Prefer the scraped URL; fall back to the identity index, then the name
+                    strain_url = (strain.get('url')
+                                  or self.identity_index.url_for(strain.get('name', ''))
+                                  or self.generate_strain_url(strain.get('name', '')))
                     self.missing_strains.append({
                         'name': strain.get('name', ''),
                         'url': strain_url,
@@ -84,108 +105,74 @@ class MissingDataScraper:
         except FileNotFoundError:
             logging.error("enhanced-data.json not found")
             return False
-        except json.JSONDecodeError as e:
+        except dataset_io.DecodeError as e:
             logging.error(f"Error parsing enhanced-data.json: {e}")
             return False
             
     def generate_strain_url(self, strain_name):
-        """Generate strain URL from name by hyphenating spaces"""
+        """Generate strain URL from name (last resort when no stored URL resolves)"""
         if not strain_name:
             return None
-            
-        # Convert to lowercase and replace spaces with hyphens
-        url_slug = strain_name.lower().replace(' ', '-')
-        # Remove special characters except hyphens
-        url_slug = re.sub(r'[^a-z0-9\-]', '', url_slug)
-        # Remove multiple consecutive hyphens
-        url_slug = re.sub(r'-+', '-', url_slug)
-        # Remove leading/trailing hyphens
-        url_slug = url_slug.strip('-')
         
-        return f"https://www.leafly.com/strains/{url_slug}"
+        return f"{self.base_url}/strains/{slugify(strain_name)}"
         
-    def extract_strain_data(self, url, strain_name):
-        """Extract detailed strain data from individual strain page"""
+    def extract_strain_data(self, url, strain_name, fields=TARGET_FIELDS, session=None):
+        """Extract the requested fields from an individual strain page; {} when the fetch fails"""
         try:
-            response = self.session.get(url, timeout=30)
-            response.raise_for_status()
-            
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Look for JSON data in script tags
-            script_tags = soup.find_all('script', type='application/json')
-            strain_data = {}
-            
-            for script in script_tags:
-                try:
-                    json_data = json.loads(script.string)
-                    if self.extract_from_json(json_data, strain_data):
-                        break
-                except:
-                    continue
-            
-            # If no JSON data found, try HTML parsing
-            if not strain_data.get('flavors') and not strain_data.get('helps_with'):
-                self.extract_from_html(soup, strain_data)
-            
-            return strain_data
-            
+            return self.fetch_strain_data(url, strain_name, fields, session)
         except Exception as e:
             logging.error(f"Error extracting data from {url}: {e}")
             return {}
-    
-    def extract_from_json(self, json_data, strain_data):
-        """Extract strain data from JSON structure"""
-        found_data = False
+
+    def fetch_strain_data(self, url, strain_name, fields=TARGET_FIELDS, session=None):
+        """extract_strain_data that raises on fetch errors, for callers that retry"""
+        for attempt in range(MAX_THROTTLE_RETRIES + 1):
+            with metrics.timer('fetch_seconds', kind='detail'):
+                response = (session or self.session).get(url, timeout=30)
+            metrics.inc('fetch_requests_total', kind='detail', status=response.status_code)
+            metrics.inc('fetch_bytes_total', len(response.content), kind='detail')
+            delay = retry_after(response)
+            if delay is None or attempt == MAX_THROTTLE_RETRIES:
+                break
+            logging.warning(f"Throttled ({response.status_code}) on {url}; backing off {delay:.0f}s")
+            throttle(self.rate_limiter, delay)
+        response.raise_for_status()
         
-        def search_json(obj, path=""):
-            nonlocal found_data
-            
-            if isinstance(obj, dict):
-                # Look for flavors
-                if 'flavors' in obj and isinstance(obj['flavors'], list):
-                    flavors = [f.get('name', f) if isinstance(f, dict) else str(f) for f in obj['flavors']]
-                    if flavors:
-                        strain_data['flavors'] = flavors
-                        found_data = True
-                        logging.debug(f"Found flavors in JSON: {flavors}")
-                
-                # Look for helps_with / medical conditions
-                helps_with_keys = ['helps_with', 'medical', 'conditions', 'benefits', 'treats']
-                for key in helps_with_keys:
-                    if key in obj and isinstance(obj[key], list):
-                        helps_with = []
-                        for item in obj[key]:
-                            if isinstance(item, dict):
-                                condition = item.get('condition', item.get('name', ''))
-                                percentage = item.get('percentage', item.get('percent', 0))
-                                if condition:
-                                    helps_with.append({
-                                        'condition': condition,
-                                        'percentage': float(percentage) if percentage else 0
-                                    })
-                            elif isinstance(item, str):
-                                helps_with.append({
-                                    'condition': item,
-                                    'percentage': 0
-                                })
-                        
-                        if helps_with:
-                            strain_data['helps_with'] = helps_with
-                            found_data = True
-                            logging.debug(f"Found helps_with in JSON: {[h['condition'] for h in helps_with]}")
-                        break
-                
-                # Recursively search nested objects
-                for key, value in obj.items():
-                    search_json(value, f"{path}.{key}" if path else key)
-                    
-            elif isinstance(obj, list):
-                for i, item in enumerate(obj):
-                    search_json(item, f"{path}[{i}]" if path else f"[{i}]")
+        parse_start = time.perf_counter()
+        soup = BeautifulSoup(response.content, 'html.parser')
         
-        search_json(json_data)
-        return found_data
+        # Look for JSON data in script tags, starting with the one the paths were learned from
+        script_tags = soup.find_all('script', type='application/json')
+        learned_ids = {self.json_paths.learned_script(field) for field in fields}
+        script_tags.sort(key=lambda script: script.get('id') not in learned_ids)
+        strain_data = {}
+        
+        for script in script_tags:
+            try:
+                json_data = json.loads(script.string)
+                self.extract_from_json(json_data, strain_data, fields, script.get('id'),
+                                       slug_from_url(url), strain_name)
+                if all(strain_data.get(field) for field in fields):
+                    break
+            except:
+                continue
+        
+        # If the JSON didn't cover every requested field, try HTML parsing
+        if not all(strain_data.get(field) for field in fields):
+            html_data = {}
+            self.extract_from_html(soup, html_data)
+            for field in fields:
+                if not strain_data.get(field) and html_data.get(field):
+                    strain_data[field] = html_data[field]
+        
+        metrics.observe('parse_seconds', time.perf_counter() - parse_start, kind='detail')
+        return {field: strain_data[field] for field in fields if strain_data.get(field)}
+    
+    def extract_from_json(self, json_data, strain_data, fields=TARGET_FIELDS, script_id=None, slug=None, name=None):
+        """Extract strain data from JSON via learned paths (bounded search on layout changes)"""
+        found = self.json_paths.extract(json_data, fields, script_id, slug, name)
+        strain_data.update(found)
+        return bool(found)
     
     def extract_from_html(self, soup, strain_data):
         """Extract strain data from HTML as fallback"""
@@ -231,8 +218,8 @@ class MissingDataScraper:
             logging.error(f"Error extracting from HTML: {e}")
     
     def update_strain_data(self, original_strain, new_data):
-        """Update original strain data with newly scraped data"""
-        updated_strain = original_strain.copy()
+        """Update the original strain record in place with newly scraped data"""
+        updated_strain = original_strain
         
         # Update flavors if found
         if new_data.get('flavors'):
@@ -261,7 +248,8 @@ class MissingDataScraper:
                 logging.info(f"Fetching: {strain_info['url']}")
                 
                 # Extract new data
-                new_data = self.extract_strain_data(strain_info['url'], strain_info['name'])
+                new_data = self.extract_strain_data(strain_info['url'], strain_info['name'],
+                                                    strain_info['missing_fields'])
                 
                 if new_data:
                     # Update the original strain data
@@ -283,6 +271,72 @@ class MissingDataScraper:
                 # Keep original data on error
                 self.updated_strains.append(strain_info['original_data'])
     
+    def prioritize(self, queue_file):
+        """Reorder the gap list by an audit refetch queue (unranked strains go last)"""
+        with open(queue_file, 'r', encoding='utf-8') as f:
+            queue = json.load(f).get('queue', [])
+        rank = {}
+        for position, item in enumerate(queue):
+            strain_id = self.identity_index.resolve(item.get('url') or item.get('name', ''))
+            if strain_id is not None:
+                rank.setdefault(strain_id, position)
+        
+        def strain_rank(strain_info):
+            strain_id = self.identity_index.resolve(strain_info['url'] or strain_info['name'])
+            return rank.get(strain_id, len(queue))
+        
+        self.missing_strains.sort(key=strain_rank)
+    
+    def scrape_missing_data_batch(self, workers=8, rate=2.0):
+        """Fetch the gap list concurrently under a shared rate budget, collecting field patches"""
+        if not self.missing_strains:
+            logging.info("No strains with missing data found")
+            return {}
+        
+        limiter = RateLimiter(rate, burst=workers)
+        self.rate_limiter = limiter
+        local = threading.local()
+        patches = {}
+        
+        def fetch(strain_info):
+            if not hasattr(local, 'session'):
+                local.session = requests.Session()
+                local.session.headers.update(self.session.headers)
+            limiter.acquire()
+            return self.extract_strain_data(strain_info['url'], strain_info['name'],
+                                            strain_info['missing_fields'], session=local.session)
+        
+        logging.info(f"Batch scraping {len(self.missing_strains)} strains "
+                     f"({workers} workers, {rate} requests/s)...")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(fetch, info): info for info in self.missing_strains}
+            for i, future in enumerate(as_completed(futures), 1):
+                strain_info = futures[future]
+                try:
+                    new_data = future.result()
+                except Exception as e:
+                    logging.error(f"Error processing {strain_info['name']}: {e}")
+                    continue
+                
+                if new_data:
+                    patches[strain_info['url']] = new_data
+                    logging.info(f"[{i}/{len(futures)}] Found {', '.join(new_data)} for: {strain_info['name']}")
+                else:
+                    logging.warning(f"[{i}/{len(futures)}] No additional data found for: {strain_info['name']}")
+        
+        return patches
+    
+    def save_patch(self, patches, filename=PATCH_FILE):
+        """Write only the changed fields of the changed strains"""
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({
+                'patch_timestamp': datetime.now().isoformat(),
+                'patched_strains_count': len(patches),
+                'patches': patches
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        logging.info(f"Patch for {len(patches)} strains saved to {filename}")
+    
     def save_updated_data(self):
         """Save the updated enhanced data"""
         if not self.enhanced_data:
@@ -311,8 +365,7 @@ class MissingDataScraper:
         
         # Save to new file
         output_file = 'enhanced-data-updated.json'
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(updated_data, f, indent=2, ensure_ascii=False)
+        dataset_io.dump(updated_data, output_file)
         
         logging.info(f"Updated data saved to {output_file}")
         
@@ -339,11 +392,100 @@ class MissingDataScraper:
                     print(f"   Helps With: {', '.join(conditions)}")
                 print("-" * 40)
 
+def apply_patch(patch_file=PATCH_FILE, data_file='enhanced-data.json'):
+    """Merge a field patch into the main dataset in place (atomic file replace)"""
+    with open(patch_file, 'r', encoding='utf-8') as f:
+        patches = json.load(f).get('patches', {})
+    if not patches:
+        logging.info("Patch is empty, nothing to merge")
+        return 0
+    
+    data = dataset_io.load(data_file)
+    
+    strains = strain_record.compact(data['enhanced_strains'])
+    index = StrainIdentityIndex.build(strains, filename=None)
+    by_slug = {index.slug_for(strain): strain for strain in strains}
+    
+    merged = 0
+    for url, fields in patches.items():
+        record = index.lookup(url)
+        strain = by_slug.get(record['slug']) if record else None
+        if strain is None:
+            logging.warning(f"Patched strain not in dataset: {url}")
+            continue
+        strain.update(fields)
+        merged += 1
+    
+    data['missing_data_update_timestamp'] = datetime.now().isoformat()
+    data['updated_strains_count'] = merged
+    
+    dataset_io.dump(data, data_file)
+    
+    logging.info(f"Merged {merged} patched strains into {data_file}")
+    return merged
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill missing flavors/helps_with data")
+    parser.add_argument('--batch', action='store_true',
+                        help='non-interactive concurrent mode that writes a patch file')
+    parser.add_argument('--workers', type=int, default=8, help='concurrent fetches in batch mode')
+    parser.add_argument('--rate', type=float, default=2.0, help='shared request budget (requests/second)')
+    parser.add_argument('--patch-file', default=PATCH_FILE, help='where batch mode writes its patch')
+    parser.add_argument('--merge', action='store_true',
+                        help='merge the patch into enhanced-data.json in place after a batch run')
+    parser.add_argument('--apply-patch', action='store_true',
+                        help='only merge an existing patch file into enhanced-data.json')
+    parser.add_argument('--queue', help='refetch-queue.json from audit_dataset.py; fetch in its priority order')
+    parser.add_argument('--budget', type=int, help='maximum number of strains to fetch in batch mode')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES,
+                        help=f'write a profile of the run under {profiling.PROFILE_DIR}/')
+    return parser.parse_args()
+
+def run_batch(args):
+    scraper = MissingDataScraper()
+    with profiling.stage('load'):
+        if not scraper.load_enhanced_data():
+            logging.error("Failed to load enhanced data. Exiting.")
+            sys.exit(1)
+    
+    if args.queue:
+        scraper.prioritize(args.queue)
+    if args.budget is not None:
+        scraper.missing_strains = scraper.missing_strains[:args.budget]
+    
+    with profiling.stage('scrape'):
+        patches = scraper.scrape_missing_data_batch(workers=args.workers, rate=args.rate)
+    with profiling.stage('save'):
+        scraper.save_patch(patches, args.patch_file)
+    
+    if args.merge:
+        with profiling.stage('merge'):
+            apply_patch(args.patch_file)
+
 def main():
+    args = parse_args()
+    metrics.start_run('missing_data_scraper')
+    try:
+        with profiling.profile_run('missing_data_scraper', args.profile or ''):
+            run(args)
+    finally:
+        metrics.write_run_report('missing_data_scraper')
+
+def run(args):
+    if args.apply_patch:
+        apply_patch(args.patch_file)
+        return
+    
+    if args.batch:
+        run_batch(args)
+        return
+    
     scraper = MissingDataScraper()
     
     # Load existing data and identify missing data
-    if not scraper.load_enhanced_data():
+    with profiling.stage('load'):
+        loaded = scraper.load_enhanced_data()
+    if not loaded:
         logging.error("Failed to load enhanced data. Exiting.")
         return
     
@@ -360,10 +502,12 @@ def main():
         return
     
     # Scrape missing data
-    scraper.scrape_missing_data()
+    with profiling.stage('scrape'):
+        scraper.scrape_missing_data()
     
     # Save updated data
-    scraper.save_updated_data()
+    with profiling.stage('save'):
+        scraper.save_updated_data()
     
     print(f"\nMissing data scraping complete!")
     print(f"Updated data saved to: enhanced-data-updated.json")
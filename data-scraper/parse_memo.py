@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Parse-result memo store
+Maps (parser version, hash of the page) to the structured record the parser
+produced, in one SQLite file shared by threads and processes. The parser version
+is derived from the parser's own source code, so editing the extraction code
+invalidates every entry without a manual bump; rows left by older versions are
+pruned when the store is opened.
+
+    memo = ParseMemo(PARSE_MEMO_FILE, parser_version(parse_fn, *helpers))
+    record = memo.parse(html, parse_fn)     # parse_fn raises PartialParse to skip the store
+
+    python parse_memo.py            # entries per parser version
+    python parse_memo.py --clear
+"""
+
+import argparse
+import hashlib
+import inspect
+import sqlite3
+import threading
+from typing import Any, Callable, Dict, Optional
+
+import msgspec
+
+import dataset_io
+import metrics
+
+PARSE_MEMO_FILE = 'parse-memo.db'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parse_memo (
+    parser TEXT NOT NULL,
+    digest BLOB NOT NULL,
+    record BLOB NOT NULL,
+    PRIMARY KEY (parser, digest)
+) WITHOUT ROWID;
+"""
+
+
+class PartialParse(Exception):
+    """Raised by a parser that hit an error part-way; carries the fields it got, which are used but not stored"""
+
+    def __init__(self, record: Dict[str, Any]):
+        super().__init__('partial parse')
+        self.record = record
+
+
+def parser_version(*parsers: Callable, extra: str = '') -> str:
+    """Short hash of the source of the parsers and every helper they call (plus e.g. library versions)"""
+    source = ''.join(inspect.getsource(parser) for parser in parsers) + extra
+    return hashlib.blake2b(source.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def page_digest(content: str) -> bytes:
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=16).digest()
+
+
+class ParseMemo:
+    """Memoized parse results for one parser version; safe to share between threads"""
+
+    def __init__(self, filename: str = PARSE_MEMO_FILE, version: str = ''):
+        self.version = version
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(filename, timeout=60, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=wal")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA busy_timeout=60000")
+        self.conn.executescript(SCHEMA)
+        self.conn.execute("DELETE FROM parse_memo WHERE parser != ?", (version,))
+
+    def close(self):
+        self.conn.close()
+
+    def get(self, digest: bytes) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute("SELECT record FROM parse_memo WHERE parser = ? AND digest = ?",
+                                    (self.version, digest)).fetchone()
+        return msgspec.json.decode(row[0]) if row else None
+
+    def put(self, digest: bytes, record: Dict[str, Any]):
+        with self.lock:
+            self.conn.execute("INSERT OR REPLACE INTO parse_memo (parser, digest, record) VALUES (?, ?, ?)",
+                              (self.version, digest, dataset_io.encode(record)))
+
+    def parse(self, content: str, parse_fn: Callable[[str], Dict[str, Any]], kind: str = 'detail') -> Dict[str, Any]:
+        """parse_fn(content), or the stored result for identical content and parser code"""
+        digest = page_digest(content)
+        record = self.get(digest)
+        if record is not None:
+            metrics.inc('parse_memo_total', kind=kind, outcome='hit')
+            return record
+        try:
+            record = parse_fn(content)
+        except PartialParse as e:
+            # A parse that failed part-way may succeed on a retry or a fixed parser; never pin it
+            metrics.inc('parse_memo_total', kind=kind, outcome='partial')
+            return e.record
+        metrics.inc('parse_memo_total', kind=kind, outcome='miss')
+        self.put(digest, record)
+        return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the parse-result memo store")
+    parser.add_argument('--db', default=PARSE_MEMO_FILE)
+    parser.add_argument('--clear', action='store_true', help='delete every memoized result')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    conn.executescript(SCHEMA)
+    if args.clear:
+        conn.execute("DELETE FROM parse_memo")
+        conn.commit()
+        conn.execute("VACUUM")
+        print(f"🧹 Cleared {args.db}")
+    for version, count, size in conn.execute("SELECT parser, COUNT(*), SUM(LENGTH(record)) FROM parse_memo "
+                                             "GROUP BY parser"):
+        print(f"   parser {version}: {count} pages, {size / 1024:.0f} KB of records")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+Streaming pipeline orchestrator
+Runs discovery -> detail -> images -> upload -> import as concurrent stages
+connected by bounded queues, so each strain is written to Postgres shortly after
+its page is fetched instead of waiting for whole-file handoffs. data.json,
+enhanced-data.json, strain-index.json and the map layout (strain-map.json) are
+still written at the end so the standalone tools keep working; a run limited by
+--limit or --pages is merged into the previous files rather than replacing them.
+
+    python pipeline.py run                       # full pipeline
+    python pipeline.py run --no-upload --limit 50
+    python pipeline.py import enhanced-data.json
+    python pipeline.py upload enhanced-data.json
+
+boto3 and psycopg2 are only imported by the stages that need them.
+"""
+
+import argparse
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import dataset_io
+import map_layout
+import metrics
+import profiling
+import strain_record
+from main import LeaflyStrainScraper
+from enhanced_scraper import EnhancedLeaflyStrainScraper
+from rate_limiter import RateLimiter
+from refresh import strain_key, with_discovered, with_updates
+from strain_identity import StrainIdentityIndex, INDEX_FILE
+
+logger = logging.getLogger(__name__)
+
+# Tells a stage worker its input is exhausted
+SENTINEL = object()
+
+
+class Stage:
+    """A pool of worker threads draining a bounded inbox into downstream stages"""
+
+    def __init__(self, name: str, handler: Callable[[Any, Callable], None], workers: int = 1,
+                 queue_size: int = 64, flush: Optional[Callable[[], None]] = None,
+                 flush_interval: float = 2.0):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.inbox = queue.Queue(maxsize=queue_size)
+        self.outputs: List['Stage'] = []
+        self.flush = flush
+        self.flush_interval = flush_interval
+        self.remaining = workers
+        self.lock = threading.Lock()
+        self.threads: List[threading.Thread] = []
+
+    def connect(self, stage: 'Stage') -> 'Stage':
+        self.outputs.append(stage)
+        return stage
+
+    def emit(self, item):
+        for stage in self.outputs:
+            stage.inbox.put(item)  # blocks while downstream is full (backpressure)
+
+    def close(self):
+        for _ in range(self.workers):
+            self.inbox.put(SENTINEL)
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def join(self):
+        for thread in self.threads:
+            thread.join()
+
+    def _work(self):
+        while True:
+            try:
+                item = self.inbox.get(timeout=self.flush_interval if self.flush else None)
+            except queue.Empty:
+                self._flush()
+                continue
+            if item is SENTINEL:
+                break
+            try:
+                self.handler(item, self.emit)
+                metrics.inc('pipeline_items_total', stage=self.name, outcome='ok')
+            except Exception as e:
+                logger.error(f"[{self.name}] {e}")
+                metrics.inc('pipeline_items_total', stage=self.name, outcome='error')
+
+        self._flush()
+        with self.lock:
+            self.remaining -= 1
+            last = self.remaining == 0
+        if last:
+            for stage in self.outputs:
+                stage.close()
+
+    def _flush(self):
+        if self.flush:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"[{self.name}] flush failed: {e}")
+
+
+def import_batch(conn, batch: List[Dict[str, Any]]):
+    """Insert one batch of strains with their lookups and junction rows (all idempotent)"""
+    import import_to_db as db
+    db.insert_strains(conn, batch)
+    db.insert_strain_akas(conn, batch)
+    db.insert_effects(conn, batch)
+    db.insert_flavors(conn, batch)
+    db.insert_terpenes(conn, batch)
+    db.insert_medical_conditions(conn, batch)
+    db.insert_strain_effects(conn, batch)
+    db.insert_strain_flavors(conn, batch)
+    db.insert_strain_terpenes(conn, batch)
+    db.insert_medical_benefits(conn, batch)
+
+
+def previous_strains(filename: str) -> List[Dict[str, Any]]:
+    """The last snapshot as compact records, which the merge reuses in place"""
+    try:
+        return strain_record.load_records(filename)
+    except (FileNotFoundError, dataset_io.DecodeError):
+        return []
+
+
+def import_lineage(conn, strains: List[Dict[str, Any]], index: Optional[StrainIdentityIndex] = None):
+    """Genetics and the lineage closure need the whole dataset, so they run once at the end"""
+    from import_to_db import insert_genetics
+    from lineage_graph import build_lineage_graph, import_lineage_graph
+    lineage = build_lineage_graph(strains, index)
+    insert_genetics(conn, strains, lineage)
+    import_lineage_graph(conn, lineage)
+
+
+class StreamingPipeline:
+    def __init__(self, args):
+        self.args = args
+        self.page_limiter = RateLimiter(args.rate, burst=args.workers)
+        self.image_limiter = RateLimiter(args.image_rate, burst=args.image_workers)
+        self.identity_index = StrainIdentityIndex.load(INDEX_FILE)
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.basic: List[Dict[str, Any]] = []
+        self.enhanced: Dict[str, Dict[str, Any]] = {}
+        self.s3_client = None
+        self.conn = None
+        self.pending: List[Dict[str, Any]] = []
+
+    def detail_scraper(self) -> EnhancedLeaflyStrainScraper:
+        """One scraper (and HTTP session) per worker thread"""
+        if not hasattr(self.local, 'scraper'):
+            scraper = EnhancedLeaflyStrainScraper(download_images=False, request_delay=0,
+                                                  images_dir=self.args.images_dir, index_file=None)
+            scraper.identity_index = self.identity_index
+            scraper.rate_limiter = self.page_limiter
+            self.local.scraper = scraper
+        return self.local.scraper
+
+    # Stages
+
+    def discover(self, _, emit):
+        scraper = LeaflyStrainScraper(base_url=self.args.base_url, page_delay=0)
+        page_num = 1
+        while self.args.pages is None or page_num <= self.args.pages:
+            self.page_limiter.acquire()
+            page_strains = scraper.scrape_page(page_num)
+            if not page_strains:
+                break
+            for strain in page_strains:
+                if self.args.limit is not None and len(self.basic) >= self.args.limit:
+                    return
+                self.identity_index.register(strain)
+                self.basic.append(strain)
+                emit(strain)
+            logger.info(f"Discovered page {page_num} ({len(self.basic)} strains so far)")
+            page_num += 1
+
+    def detail(self, strain, emit):
+        self.page_limiter.acquire()
+        enhanced = self.detail_scraper().scrape_strain_details(strain)
+        with self.lock:
+            self.enhanced[strain_key(strain)] = enhanced
+        emit(enhanced)
+
+    def fetch_image(self, strain, emit):
+        image_url = strain.get('image_url')
+        if not image_url:
+            emit(strain)
+            return
+
+        if self.args.no_upload:
+            self.image_limiter.acquire()
+            image_path = self.detail_scraper().download_image(image_url, strain)
+            if image_path:
+                strain['image_path'] = image_path
+            emit(strain)
+            return
+
+        import image_uploader
+        s3_key = image_uploader.generate_s3_key(strain, self.identity_index)
+        try:
+            self.s3_client.head_object(Bucket=image_uploader.S3_CONFIG['BUCKET'], Key=s3_key)
+            emit(strain)  # already uploaded
+            return
+        except image_uploader.ClientError:
+            pass
+        self.image_limiter.acquire()
+        emit((strain, image_uploader.download_image(image_uploader.clean_image_url(image_url)), s3_key))
+
+    def upload(self, item, emit):
+        if isinstance(item, tuple):
+            import image_uploader
+            strain, image_data, s3_key = item
+            if image_data and image_uploader.upload_to_s3(self.s3_client, image_data, s3_key):
+                logger.info(f"Uploaded {s3_key}")
+        else:
+            strain = item
+        emit(strain)
+
+    def import_strain(self, strain, emit):
+        self.pending.append(strain)
+        if len(self.pending) >= self.args.batch_size:
+            self.flush_imports()
+
+    def flush_imports(self):
+        if not self.pending:
+            return
+        batch, self.pending = self.pending, []
+        import_batch(self.conn, batch)
+        logger.info(f"Imported batch of {len(batch)} strains")
+
+    # Wiring
+
+    def build(self) -> List[Stage]:
+        args = self.args
+        discovery = Stage('discovery', self.discover, workers=1, queue_size=1)
+        tail = discovery.connect(Stage('detail', self.detail, workers=args.workers, queue_size=args.queue_size))
+        stages = [discovery, tail]
+
+        if not args.no_images:
+            tail = tail.connect(Stage('images', self.fetch_image, workers=args.image_workers,
+                                      queue_size=args.queue_size))
+            stages.append(tail)
+            if not args.no_upload:
+                tail = tail.connect(Stage('upload', self.upload, workers=args.image_workers,
+                                          queue_size=args.queue_size))
+                stages.append(tail)
+
+        if not args.no_import:
+            tail.connect(Stage('import', self.import_strain, workers=1, queue_size=args.queue_size,
+                               flush=self.flush_imports, flush_interval=args.flush_interval))
+            stages.append(tail.outputs[-1])
+        return stages
+
+    def connect_sinks(self):
+        if not self.args.no_images and not self.args.no_upload:
+            import image_uploader
+            self.s3_client = image_uploader.init_s3_client()
+        if not self.args.no_import:
+            import import_to_db
+            self.conn = import_to_db.connect_to_db()
+            import_to_db.ensure_columns(self.conn)
+
+    def run(self):
+        self.connect_sinks()
+        stages = self.build()
+        started = time.perf_counter()
+        for stage in stages:
+            stage.start()
+        stages[0].inbox.put(None)
+        stages[0].close()
+        for stage in stages:
+            stage.join()
+        logger.info(f"Streamed {len(self.enhanced)} strains in {time.perf_counter() - started:.1f}s")
+
+    def finalize(self):
+        """Write the file artifacts and the whole-dataset lineage tables
+
+        A run cut short by --limit or --pages is merged into the previous data.json and
+        enhanced-data.json, so the files, the lineage tables and the map still cover every
+        strain; a full run replaces them, keeping only the lineage-only records.
+        """
+        order = {strain_key(strain): i for i, strain in enumerate(self.basic)}
+        enhanced = [s for _, s in sorted(self.enhanced.items(), key=lambda kv: order.get(kv[0], len(order)))]
+        basic = self.basic
+        previous = previous_strains(self.args.output)
+        if self.args.limit is not None or self.args.pages is not None:
+            basic = with_updates(previous_strains(self.args.basic_output), basic)
+            enhanced = with_updates(previous, enhanced)
+            logger.info(f"Partial run: merged {len(self.enhanced)} strains into {len(enhanced)}")
+        else:
+            enhanced = with_discovered(enhanced, previous)
+
+        listing = LeaflyStrainScraper(base_url=self.args.base_url)
+        listing.strains_data = basic
+        listing.save_to_json(self.args.basic_output)
+        writer = EnhancedLeaflyStrainScraper(download_images=False, images_dir=self.args.images_dir,
+                                             index_file=None, parse_memo_file=None)
+        writer.enhanced_data = enhanced
+        writer.save_enhanced_data(self.args.output)
+        self.identity_index.save(INDEX_FILE)
+
+        if self.conn is not None:
+            import_lineage(self.conn, enhanced, self.identity_index)
+            self.conn.close()
+
+        body = map_layout.save_map(map_layout.build_map(enhanced, self.identity_index), self.args.map_output)
+        if self.s3_client is not None:
+            map_layout.upload_map(self.s3_client, body)
+
+
+def run_pipeline(args):
+    pipeline = StreamingPipeline(args)
+    with profiling.stage('stream'):
+        pipeline.run()
+    with profiling.stage('finalize'):
+        pipeline.finalize()
+
+
+def import_file(args):
+    from import_to_db import connect_to_db, ensure_columns, load_json_data
+    strains = load_json_data(args.file)
+    conn = connect_to_db()
+    try:
+        ensure_columns(conn)
+        import_batch(conn, strains)
+        import_lineage(conn, strains)
+    finally:
+        conn.close()
+
+
+def upload_file(args):
+    import image_uploader
+    from import_to_db import load_json_data
+    image_uploader.process_strain_images(load_json_data(args.file), image_uploader.init_s3_client())
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Budedex streaming data pipeline")
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='discover, scrape, upload and import in one streaming pass')
+    run.add_argument('--base-url', default='https://www.leafly.com')
+    run.add_argument('--pages', type=int, help='stop after this many listing pages')
+    run.add_argument('--limit', type=int, help='stop after this many strains')
+    run.add_argument('--workers', type=int, default=4, help='concurrent detail page fetches')
+    run.add_argument('--rate', type=float, default=1.0, help='shared leafly.com request budget (requests/second)')
+    run.add_argument('--image-workers', type=int, default=4)
+    run.add_argument('--image-rate', type=float, default=2.0, help='image download budget (requests/second)')
+    run.add_argument('--queue-size', type=int, default=64, help='bound on each inter-stage queue')
+    run.add_argument('--batch-size', type=int, default=25, help='strains per database batch')
+    run.add_argument('--flush-interval', type=float, default=2.0,
+                     help='seconds an import batch may wait before it is written anyway')
+    run.add_argument('--no-images', action='store_true', help='skip image download and upload')
+    run.add_argument('--no-upload', action='store_true', help='save images under --images-dir instead of S3')
+    run.add_argument('--no-import', action='store_true', help='do not write to Postgres')
+    run.add_argument('--images-dir', default='images')
+    run.add_argument('--basic-output', default='data.json')
+    run.add_argument('--output', default='enhanced-data.json')
+    run.add_argument('--map-output', default=map_layout.MAP_FILE)
+    run.set_defaults(func=run_pipeline)
+
+    imp = commands.add_parser('import', help='import a dataset file into Postgres')
+    imp.add_argument('file', nargs='?', default='enhanced-data.json')
+    imp.set_defaults(func=import_file)
+
+    upload = commands.add_parser('upload', help='upload a dataset file\'s images to S3')
+    upload.add_argument('file', nargs='?', default='enhanced-data.json')
+    upload.set_defaults(func=upload_file)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    metrics.start_run('pipeline')
+    try:
+        with profiling.profile_run('pipeline', args.profile or ''):
+            args.func(args)
+    finally:
+        metrics.write_run_report('pipeline')
+
+
+if __name__ == "__main__":
+    main()
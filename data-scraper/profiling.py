@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Opt-in profiling for the pipeline entry points
+Run any script with --profile (cProfile), --profile=sample (stack sampler that
+also sees worker threads) or --profile=memory (tracemalloc only, which would
+otherwise slow every allocation and skew the CPU timings). Each run gets its own
+folder under PROFILE_DIR (default: profiles/) containing:
+
+    profile.pstats          cProfile output (snakeviz, pstats, gprof2dot)
+    profile.txt             top functions by cumulative time
+    stacks.folded           sampled stacks (speedscope, flamegraph.pl)
+    stages.json             per-stage wall and CPU time (plus top allocations in memory mode)
+    <n>-<stage>.snapshot    memory mode: tracemalloc snapshot at each stage boundary
+                            (tracemalloc.Snapshot.load)
+"""
+
+import cProfile
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+MODES = ('cprofile', 'sample', 'memory')
+TOP_ALLOCATIONS = 10
+
+
+def mode_from_argv(argv: List[str] = None) -> Optional[str]:
+    """--profile -> 'cprofile', --profile=sample or --profile sample -> 'sample', absent -> None"""
+    argv = sys.argv[1:] if argv is None else argv
+    for i, arg in enumerate(argv):
+        if arg == '--profile':
+            return argv[i + 1] if i + 1 < len(argv) and argv[i + 1] in MODES else 'cprofile'
+        if arg.startswith('--profile='):
+            mode = arg.split('=', 1)[1]
+            if mode not in MODES:
+                raise SystemExit(f"--profile must be one of {', '.join(MODES)}")
+            return mode
+    return None
+
+
+class StackSampler:
+    """Samples every thread's stack at a fixed interval into folded-stack counts"""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.counts = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+
+    def _run(self):
+        own = threading.get_ident()
+        names = {}
+        while not self._stop.wait(self.interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.counts[';'.join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def write(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in self.counts.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class RunProfiler:
+    def __init__(self, script: str, mode: str, directory: str = PROFILE_DIR):
+        self.script = script
+        self.mode = mode
+        self.output_dir = os.path.join(directory, f"{script}-{time.strftime('%Y%m%d-%H%M%S')}")
+        self.stages: List[Dict] = []
+        self.profiler = cProfile.Profile() if mode == 'cprofile' else None
+        self.sampler = StackSampler() if mode == 'sample' else None
+        self.trace_memory = mode == 'memory'
+        self._last_snapshot = None
+
+    def start(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.trace_memory:
+            tracemalloc.start(10)
+            self._last_snapshot = tracemalloc.take_snapshot()
+        self.started = (time.perf_counter(), time.process_time())
+        if self.profiler:
+            self.profiler.enable()
+        if self.sampler:
+            self.sampler.start()
+
+    @contextmanager
+    def stage(self, name: str):
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            record = {
+                'stage': name,
+                'wall_seconds': round(time.perf_counter() - wall, 4),
+                'cpu_seconds': round(time.process_time() - cpu, 4),
+            }
+            if self.trace_memory:
+                record.update(self._snapshot(name))
+            self.stages.append(record)
+
+    def _snapshot(self, name: str) -> Dict:
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+        ))
+        snapshot.dump(os.path.join(self.output_dir, f"{len(self.stages) + 1:02d}-{name}.snapshot"))
+        top = snapshot.compare_to(self._last_snapshot, 'lineno')[:TOP_ALLOCATIONS]
+        self._last_snapshot = snapshot
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            'traced_kb': round(current / 1024, 1),
+            'peak_kb': round(peak / 1024, 1),
+            'top_allocations': [{
+                'location': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                'size_diff_kb': round(stat.size_diff / 1024, 1),
+                'count_diff': stat.count_diff,
+            } for stat in top],
+        }
+
+    def stop(self):
+        wall, cpu = self.started
+        if self.sampler:
+            self.sampler.stop()
+            self.sampler.write(os.path.join(self.output_dir, 'stacks.folded'))
+        if self.profiler:
+            self.profiler.disable()
+            self.profiler.dump_stats(os.path.join(self.output_dir, 'profile.pstats'))
+            text = io.StringIO()
+            pstats.Stats(self.profiler, stream=text).sort_stats('cumulative').print_stats(40)
+            with open(os.path.join(self.output_dir, 'profile.txt'), 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+        summary = {
+            'script': self.script,
+            'mode': self.mode,
+            'wall_seconds': round(time.perf_counter() - wall, 4),
+            'cpu_seconds': round(time.process_time() - cpu, 4),
+        }
+        if self.trace_memory:
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            summary['peak_kb'] = round(peak / 1024, 1)
+        summary['stages'] = self.stages
+
+        with open(os.path.join(self.output_dir, 'stages.json'), 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        print(f"🔬 Profile written to {self.output_dir}")
+
+
+ACTIVE: Optional[RunProfiler] = None
+
+
+@contextmanager
+def profile_run(script: str, mode: Optional[str] = None):
+    """Profile the enclosed run when mode is set (defaults to the --profile flag)"""
+    global ACTIVE
+    mode = mode if mode is not None else mode_from_argv()
+    if not mode:
+        yield None
+        return
+    ACTIVE = RunProfiler(script, mode)
+    ACTIVE.start()
+    try:
+        yield ACTIVE
+    finally:
+        ACTIVE.stop()
+        ACTIVE = None
+
+
+@contextmanager
+def stage(name: str):
+    """Stage boundary: per-stage wall/CPU time, plus a tracemalloc snapshot in memory mode (no-op unless profiling)"""
+    if ACTIVE is None:
+        yield
+        return
+    with ACTIVE.stage(name):
+        yield
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Shared request rate budget for concurrent scrapers
+A thread-safe token bucket: every worker calls acquire() before a request, so the
+combined request rate across all threads stays under one configured budget. A
+throttled response (429, or Retry-After on a server error) pauses the whole bucket.
+"""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+DEFAULT_BACKOFF = 30.0
+MAX_THROTTLE_RETRIES = 2
+
+
+def retry_after(response, default: float = DEFAULT_BACKOFF) -> Optional[float]:
+    """Seconds to back off after a throttled response, or None if it was not throttled"""
+    header = response.headers.get('Retry-After')
+    if response.status_code != 429 and not (header and response.status_code >= 500):
+        return None
+    if not header:
+        return default
+    try:
+        return max(0.0, float(header))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(header).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class RateLimiter:
+    """Token bucket allowing `rate` requests per second with bursts up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        if not rate > 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request token is available"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Drain the bucket so every worker backs off (e.g. after a 429)"""
+        with self.lock:
+            now = time.monotonic()
+            tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            # A shorter pause from another worker must not cut an existing one short
+            self.tokens = min(tokens, -seconds * self.rate)
+            self.updated = now
+
+
+def throttle(limiter: Optional[RateLimiter], seconds: float):
+    """Back off after a throttled response; with a shared limiter every worker using it waits too"""
+    if limiter:
+        limiter.pause(seconds)
+        limiter.acquire()
+    else:
+        time.sleep(seconds)
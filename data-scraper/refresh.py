@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Change detection for incremental detail refreshes
+Each listing entry carries averageRating, reviewCount, thc and topEffect. Their
+values at the last detail fetch are kept in refresh-state.json, so a refresh only
+refetches detail pages for new strains, strains whose listing fingerprint
+changed, and pages older than the staleness threshold.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+STATE_FILE = 'refresh-state.json'
+FINGERPRINT_FIELDS = ('rating', 'review_count', 'thc', 'top_effect')
+DAY = 24 * 60 * 60
+
+
+def fingerprint(strain: Dict[str, Any]) -> List[str]:
+    """Listing values that change when the detail page is likely to have changed"""
+    return [str(strain.get(field, '')) for field in FINGERPRINT_FIELDS]
+
+
+def strain_key(strain: Dict[str, Any]) -> Optional[str]:
+    return strain.get('url') or strain.get('name')
+
+
+def with_discovered(strains: List[Dict[str, Any]], previous) -> List[Dict[str, Any]]:
+    """strains plus the lineage-only records in previous, which no listing covers and a rebuild would drop"""
+    keys = {strain_key(s) for s in strains}
+    return strains + [s for s in previous if s.get('discovered_via') == 'lineage' and strain_key(s) not in keys]
+
+
+def with_updates(previous: List[Dict[str, Any]], strains: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """previous with each of strains replacing the record it shares a key with, and new ones appended,
+    for runs that only covered part of the listing"""
+    updates = {strain_key(s): s for s in strains}
+    merged = [updates.pop(strain_key(s), s) for s in previous]
+    return merged + list(updates.values())
+
+
+def load_state(filename: str = STATE_FILE) -> Dict[str, Dict[str, Any]]:
+    """{url: {'fingerprint': [...], 'fetched_at': epoch seconds}}"""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            return json.load(f).get('strains', {})
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_state(state: Dict[str, Dict[str, Any]], filename: str = STATE_FILE):
+    with open(filename + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump({
+            'state_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'strains': state
+        }, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(filename + '.tmp', filename)
+
+
+def seed_state(previous: Dict[str, Dict[str, Any]], fetched_at: float) -> Dict[str, Dict[str, Any]]:
+    """First refresh: fingerprint the previous snapshot as of its scrape time instead of refetching everything
+
+    The fingerprints come from the previous records, so listing changes since that
+    scrape are still detected:
+
+    >>> old = {'url': 'u', 'rating': 4.1, 'review_count': 10, 'thc': 'THC 18%', 'top_effect': 'Happy'}
+    >>> listing = [dict(old, rating=4.3, review_count=12)]
+    >>> state = seed_state({'u': old}, fetched_at=0)
+    >>> [s['url'] for s in plan_refresh(listing, {'u': old}, state, 30, now=0)['changed']]
+    ['u']
+    """
+    return {key: {'fingerprint': fingerprint(record), 'fetched_at': fetched_at}
+            for key, record in previous.items()}
+
+
+def plan_refresh(listing: List[Dict[str, Any]], previous: Dict[str, Dict[str, Any]],
+                 state: Dict[str, Dict[str, Any]], max_age_days: float,
+                 max_stale: Optional[int] = None, now: Optional[float] = None) -> Dict[str, List[Dict[str, Any]]]:
+    """Split the new listing into new, changed, stale and unchanged strains"""
+    now = time.time() if now is None else now
+    plan = {'new': [], 'changed': [], 'stale': [], 'unchanged': []}
+
+    for strain in listing:
+        key = strain_key(strain)
+        entry = state.get(key)
+        if entry is None or key not in previous:
+            plan['new'].append(strain)
+        elif entry['fingerprint'] != fingerprint(strain):
+            plan['changed'].append(strain)
+        elif now - entry['fetched_at'] > max_age_days * DAY:
+            plan['stale'].append(strain)
+        else:
+            plan['unchanged'].append(strain)
+
+    # Oldest pages first; anything over the cap waits for the next run
+    plan['stale'].sort(key=lambda s: state[strain_key(s)]['fetched_at'])
+    if max_stale is not None:
+        plan['unchanged'].extend(plan['stale'][max_stale:])
+        plan['stale'] = plan['stale'][:max_stale]
+    return plan
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Thumbnail sprite atlases for the Pokedex grid
+Downscales every strain image to a square thumbnail (centre crop, like the
+grid's object-fit: cover) and packs them into one WebP atlas per grid page, in
+the API's name order (read from Postgres, so ties and punctuation follow the
+database collation rather than Python's codepoint order). Identical thumbnails within a page share one cell. The
+manifest maps each strain name to its atlas and cell, so a grid page costs one
+or two atlas requests instead of one request per card.
+
+    python sprite_atlas.py                     # images/ + enhanced-data.json -> atlas/
+    python sprite_atlas.py --fetch --upload    # download missing images, upload to S3 atlas/
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from PIL import Image
+
+import dataset_io
+import metrics
+import profiling
+
+ATLAS_DIR = 'atlas'
+ATLAS_S3_PREFIX = 'atlas/'
+MANIFEST_FILE = 'manifest.json'
+FORMAT_VERSION = 1
+
+# The grid requests 100 strains per page and shows 10 columns on desktop
+PAGE_SIZE = 100
+COLUMNS = 10
+CELL_SIZE = 128
+QUALITY = 80
+
+
+def thumbnail(data: bytes, size: int = CELL_SIZE) -> Optional[Image.Image]:
+    """Centre-cropped square thumbnail, or None if the image cannot be decoded"""
+    try:
+        image = Image.open(io.BytesIO(data))
+        image.draft('RGB', (size, size))  # JPEG decodes at a reduced scale directly
+        image = image.convert('RGBA')
+    except (OSError, Image.DecompressionBombError) as e:
+        print(f"⚠️  Unreadable image: {e}")
+        return None
+    side = min(image.size)
+    left, top = (image.width - side) // 2, (image.height - side) // 2
+    return image.resize((size, size), Image.LANCZOS, box=(left, top, left + side, top + side))
+
+
+def read_image(strain: Dict[str, Any], fetch: bool = False) -> Optional[bytes]:
+    """The strain's downloaded image, or a fresh download of image_url with fetch"""
+    image_path = strain.get('image_path')
+    if image_path and os.path.exists(image_path):
+        with open(image_path, 'rb') as f:
+            return f.read()
+    if fetch and strain.get('image_url'):
+        from image_uploader import clean_image_url, download_image
+        return download_image(clean_image_url(strain['image_url']))
+    return None
+
+
+def pack_page(thumbs: List[Image.Image], size: int = CELL_SIZE, columns: int = COLUMNS):
+    """One atlas for a page of thumbnails; returns the image and each thumbnail's cell"""
+    cells, slots = {}, []
+    for thumb in thumbs:
+        digest = hashlib.sha1(thumb.tobytes()).digest()
+        if digest not in cells:
+            cells[digest] = len(cells)
+        slots.append(cells[digest])
+
+    rows = math.ceil(len(cells) / columns)
+    atlas = Image.new('RGBA', (min(len(cells), columns) * size, rows * size))
+    placed = set()
+    for thumb, slot in zip(thumbs, slots):
+        if slot not in placed:
+            placed.add(slot)
+            row, col = divmod(slot, columns)
+            atlas.paste(thumb, (col * size, row * size))
+    return atlas, slots
+
+
+def database_order() -> Optional[List[str]]:
+    """Strain names as the API pages them (ORDER BY name under the database collation), or None"""
+    import psycopg2
+    from import_to_db import DB_CONFIG
+
+    try:
+        conn = psycopg2.connect(**DB_CONFIG)
+    except psycopg2.Error as e:
+        print(f"⚠️  Could not read the name order from the database: {e}")
+        return None
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT name FROM strains ORDER BY name")
+            return [name for (name,) in cursor.fetchall()]
+    finally:
+        conn.close()
+
+
+def page_order(strains: List[Dict[str, Any]], names: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+    """Strains in the given name order; strains it does not list (or every strain without it) sort by name after"""
+    by_name = {s['name']: s for s in strains if s.get('name')}
+    ordered = [by_name.pop(name) for name in names or () if name in by_name]
+    return ordered + sorted(by_name.values(), key=lambda s: s['name'])
+
+
+def build_atlases(strains: List[Dict[str, Any]], output_dir: str = ATLAS_DIR, fetch: bool = False,
+                  size: int = CELL_SIZE, page_size: int = PAGE_SIZE, columns: int = COLUMNS,
+                  names: Optional[List[str]] = None) -> Dict[str, Any]:
+    """Write one atlas per page of strains (in names order when given) and return the manifest"""
+    os.makedirs(output_dir, exist_ok=True)
+    # Strains without an image keep their placeholder
+    ordered = page_order(strains, names)
+
+    atlases, entries = [], {}
+    missing = 0
+    for start in range(0, len(ordered), page_size):
+        names, thumbs = [], []
+        for strain in ordered[start:start + page_size]:
+            data = read_image(strain, fetch)
+            thumb = thumbnail(data, size) if data else None
+            if thumb is None:
+                missing += 1
+                continue
+            names.append(strain['name'])
+            thumbs.append(thumb)
+        if not thumbs:
+            continue
+
+        atlas, slots = pack_page(thumbs, size, columns)
+        buf = io.BytesIO()
+        atlas.save(buf, 'WEBP', quality=QUALITY, method=6)
+        body = buf.getvalue()
+        # Content-addressed, so atlases can be cached forever and only the manifest expires
+        filename = f"atlas-{hashlib.sha1(body).hexdigest()[:12]}.webp"
+        with open(os.path.join(output_dir, filename), 'wb') as f:
+            f.write(body)
+
+        atlas_index = len(atlases)
+        atlases.append({'file': filename, 'width': atlas.width, 'height': atlas.height,
+                        'cells': max(slots) + 1})
+        for name, slot in zip(names, slots):
+            entries[name] = [atlas_index, slot]
+        metrics.inc('atlas_bytes_total', len(body))
+
+    print(f"🧩 Packed {len(entries)} thumbnails into {len(atlases)} atlases ({missing} strains without an image)")
+    return {
+        'version': FORMAT_VERSION,
+        'generated_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'cell_size': size,
+        'columns': columns,
+        'page_size': page_size,
+        'atlases': atlases,
+        'strains': entries,
+    }
+
+
+def save_manifest(manifest: Dict[str, Any], output_dir: str = ATLAS_DIR) -> bytes:
+    body = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    filename = os.path.join(output_dir, MANIFEST_FILE)
+    with open(filename + '.tmp', 'wb') as f:
+        f.write(body)
+    os.replace(filename + '.tmp', filename)
+    print(f"🗂️  Saved {filename} ({len(body) / 1024:.0f} KB)")
+    return body
+
+
+def upload_atlases(s3_client, manifest: Dict[str, Any], output_dir: str = ATLAS_DIR) -> bool:
+    """Upload the atlases first and the manifest last, so it never points at a missing file"""
+    from botocore.exceptions import ClientError
+    from image_uploader import S3_CONFIG
+
+    try:
+        for atlas in manifest['atlases']:
+            with open(os.path.join(output_dir, atlas['file']), 'rb') as f:
+                s3_client.put_object(Bucket=S3_CONFIG['BUCKET'], Key=ATLAS_S3_PREFIX + atlas['file'], Body=f.read(),
+                                     ContentType='image/webp', CacheControl='max-age=31536000, immutable')
+        with open(os.path.join(output_dir, MANIFEST_FILE), 'rb') as f:
+            s3_client.put_object(Bucket=S3_CONFIG['BUCKET'], Key=ATLAS_S3_PREFIX + MANIFEST_FILE, Body=f.read(),
+                                 ContentType='application/json', CacheControl='max-age=300')
+        print(f"☁️  Uploaded {len(manifest['atlases'])} atlases and {ATLAS_S3_PREFIX}{MANIFEST_FILE}")
+        return True
+    except ClientError as e:
+        print(f"❌ Failed to upload atlases: {e}")
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pack strain thumbnails into per-page sprite atlases")
+    parser.add_argument('--input', default='enhanced-data.json')
+    parser.add_argument('-o', '--output-dir', default=ATLAS_DIR)
+    parser.add_argument('--size', type=int, default=CELL_SIZE, help='thumbnail edge in pixels')
+    parser.add_argument('--fetch', action='store_true', help='download images that are not in images/')
+    parser.add_argument('--upload', action='store_true', help=f'upload to S3 under {ATLAS_S3_PREFIX}')
+    parser.add_argument('--order', choices=('db', 'name'), default='db',
+                        help="page by the database's ORDER BY name (default) or by Python string order")
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    metrics.start_run('sprite_atlas')
+    try:
+        with profiling.profile_run('sprite_atlas', args.profile or ''):
+            with profiling.stage('load'):
+                strains = dataset_io.load_strains(args.input)
+                names = database_order() if args.order == 'db' else None
+                if names is None:
+                    print("⚠️  Paging by Python string order; pages may not line up with the API's")
+            with profiling.stage('pack'):
+                manifest = build_atlases(strains, args.output_dir, args.fetch, args.size, names=names)
+            save_manifest(manifest, args.output_dir)
+            if args.upload:
+                import image_uploader
+                upload_atlases(image_uploader.init_s3_client(), manifest, args.output_dir)
+    finally:
+        metrics.write_run_report('sprite_atlas')
+
+
+if __name__ == "__main__":
+    main()
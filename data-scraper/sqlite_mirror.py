@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""
+SQLite mirror of the strain database
+Builds one self-contained SQLite file from enhanced-data.json (or a columnar
+export) for offline development and query benchmarks. The strain tables from
+app/api/src/models/models.sql are filled by the same insert functions
+import_to_db.py runs against Postgres. The file also gets:
+
+    strain_complete, strain_search    materialized copies of the API views
+    *_popularity                      precomputed effect/flavor/terpene/condition aggregates
+    strain_family_tree                view over the lineage closure table
+    strain_fts                        FTS5 index (bm25, prefix search) over names, aliases,
+                                      effects, flavors, terpenes, conditions and descriptions
+
+    python sqlite_mirror.py                          # enhanced-data.json -> budedex.sqlite
+    python sqlite_mirror.py export/ -o /tmp/dev.sqlite
+    python sqlite_mirror.py --search "blue berry"
+"""
+
+import argparse
+import os
+import sqlite3
+import time
+from typing import List, Tuple
+
+import metrics
+import profiling
+from import_to_db import (load_json_data, insert_strains, insert_strain_akas, insert_effects, insert_flavors,
+                          insert_terpenes, insert_medical_conditions, insert_strain_effects,
+                          insert_strain_flavors, insert_strain_terpenes, insert_medical_benefits,
+                          insert_genetics)
+from lineage_graph import build_lineage_graph, lineage_node_records
+
+MIRROR_FILE = 'budedex.sqlite'
+
+# Strain catalogue tables from app/api/src/models/models.sql (SERIAL -> INTEGER PRIMARY KEY);
+# the user tables are created empty so the API's joins against them still run
+SCHEMA = """
+CREATE TABLE users (
+    username VARCHAR(50) PRIMARY KEY,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE strains (
+    name VARCHAR(100) PRIMARY KEY,
+    url VARCHAR(500),
+    type VARCHAR(10) CHECK (type IN ('Indica', 'Sativa', 'Hybrid')) NOT NULL,
+    thc VARCHAR(20),
+    cbd VARCHAR(20),
+    thc_min NUMERIC(5,2),
+    thc_max NUMERIC(5,2),
+    cbd_min NUMERIC(5,2),
+    cbd_max NUMERIC(5,2),
+    rating DECIMAL(3,2),
+    review_count INT DEFAULT 0,
+    top_effect VARCHAR(50),
+    category VARCHAR(50),
+    image_path VARCHAR(500),
+    image_url VARCHAR(500),
+    image_placeholder TEXT,
+    image_width INT,
+    image_height INT,
+    description TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE strain_akas (
+    id INTEGER PRIMARY KEY,
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    aka VARCHAR(100) NOT NULL
+);
+
+CREATE TABLE effects (
+    effect VARCHAR(50) PRIMARY KEY,
+    type VARCHAR(10) CHECK (type IN ('positive', 'negative')) NOT NULL
+);
+
+CREATE TABLE strain_effects (
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    effect VARCHAR(50) NOT NULL REFERENCES effects(effect) ON DELETE CASCADE,
+    PRIMARY KEY (strain_name, effect)
+);
+
+CREATE TABLE flavors (
+    flavor VARCHAR(50) PRIMARY KEY
+);
+
+CREATE TABLE strain_flavors (
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    flavor VARCHAR(50) NOT NULL REFERENCES flavors(flavor) ON DELETE CASCADE,
+    PRIMARY KEY (strain_name, flavor)
+);
+
+CREATE TABLE terpenes (
+    terpene_name VARCHAR(50) PRIMARY KEY,
+    terpene_type VARCHAR(50),
+    description TEXT
+);
+
+CREATE TABLE strain_terpenes (
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    terpene_name VARCHAR(50) NOT NULL REFERENCES terpenes(terpene_name) ON DELETE CASCADE,
+    PRIMARY KEY (strain_name, terpene_name)
+);
+
+CREATE TABLE medical_conditions (
+    condition_name VARCHAR(100) PRIMARY KEY
+);
+
+CREATE TABLE strain_medical_benefits (
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    condition_name VARCHAR(100) NOT NULL REFERENCES medical_conditions(condition_name) ON DELETE CASCADE,
+    percentage INT,
+    PRIMARY KEY (strain_name, condition_name)
+);
+
+CREATE TABLE strain_genetics (
+    id INTEGER PRIMARY KEY,
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    related_strain VARCHAR(100) NOT NULL,
+    relationship VARCHAR(10) CHECK (relationship IN ('parent', 'child')) NOT NULL
+);
+
+CREATE TABLE strain_lineage_nodes (
+    id INT PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    slug VARCHAR(100) UNIQUE NOT NULL,
+    strain_name VARCHAR(100) REFERENCES strains(name) ON DELETE CASCADE
+);
+
+CREATE TABLE strain_lineage_closure (
+    ancestor_id INT NOT NULL REFERENCES strain_lineage_nodes(id) ON DELETE CASCADE,
+    descendant_id INT NOT NULL REFERENCES strain_lineage_nodes(id) ON DELETE CASCADE,
+    depth INT NOT NULL,
+    PRIMARY KEY (ancestor_id, descendant_id)
+);
+
+CREATE TABLE strain_grow_info (
+    id INTEGER PRIMARY KEY,
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    flowering_time VARCHAR(50),
+    yield_indoor VARCHAR(50),
+    yield_outdoor VARCHAR(50),
+    difficulty VARCHAR(20),
+    height VARCHAR(50),
+    climate VARCHAR(100),
+    grow_notes TEXT
+);
+
+CREATE TABLE favourited (
+    id INTEGER PRIMARY KEY,
+    username VARCHAR(50) NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (username, strain_name)
+);
+
+CREATE TABLE seen (
+    id INTEGER PRIMARY KEY,
+    username VARCHAR(50) NOT NULL REFERENCES users(username) ON DELETE CASCADE,
+    strain_name VARCHAR(100) NOT NULL REFERENCES strains(name) ON DELETE CASCADE,
+    seen_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    UNIQUE (username, strain_name)
+);
+"""
+
+# Created after the bulk load, when building them is one sorted pass each
+INDEXES = """
+CREATE INDEX idx_strains_type_rating ON strains (type, rating DESC);
+CREATE INDEX idx_strains_rating ON strains (rating DESC);
+CREATE INDEX idx_strains_thc ON strains (thc_min, thc_max);
+CREATE INDEX idx_strains_cbd ON strains (cbd_min, cbd_max);
+CREATE INDEX idx_strains_thc_max ON strains (thc_max DESC);
+CREATE INDEX idx_strains_cbd_max ON strains (cbd_max DESC);
+CREATE INDEX idx_strain_akas_strain_name ON strain_akas (strain_name);
+CREATE INDEX idx_strain_akas_aka ON strain_akas (aka COLLATE NOCASE);
+CREATE INDEX idx_strain_effects_effect ON strain_effects (effect);
+CREATE INDEX idx_strain_flavors_flavor ON strain_flavors (flavor);
+CREATE INDEX idx_strain_terpenes_terpene ON strain_terpenes (terpene_name);
+CREATE INDEX idx_strain_medical_benefits_condition ON strain_medical_benefits (condition_name);
+CREATE INDEX idx_strain_genetics_strain_name ON strain_genetics (strain_name, relationship);
+CREATE INDEX idx_lineage_nodes_strain_name ON strain_lineage_nodes (strain_name);
+CREATE INDEX idx_lineage_closure_descendant ON strain_lineage_closure (descendant_id, depth);
+"""
+
+# DISTINCT aggregates in SQLite take one argument, so each list is a sorted correlated subquery
+# (Postgres sorts STRING_AGG(DISTINCT ...) the same way)
+AGGREGATES = """
+CREATE TABLE strain_complete AS
+SELECT
+    s.*,
+    (SELECT group_concat(aka, ', ') FROM (SELECT DISTINCT aka FROM strain_akas
+        WHERE strain_name = s.name ORDER BY aka)) AS aliases,
+    (SELECT group_concat(effect, ', ') FROM (SELECT DISTINCT e.effect FROM strain_effects se
+        JOIN effects e ON e.effect = se.effect
+        WHERE se.strain_name = s.name AND e.type = 'positive' ORDER BY e.effect)) AS positive_effects,
+    (SELECT group_concat(effect, ', ') FROM (SELECT DISTINCT e.effect FROM strain_effects se
+        JOIN effects e ON e.effect = se.effect
+        WHERE se.strain_name = s.name AND e.type = 'negative' ORDER BY e.effect)) AS negative_effects,
+    (SELECT group_concat(flavor, ', ') FROM (SELECT DISTINCT flavor FROM strain_flavors
+        WHERE strain_name = s.name ORDER BY flavor)) AS flavors,
+    (SELECT group_concat(terpene_name, ', ') FROM (SELECT DISTINCT terpene_name FROM strain_terpenes
+        WHERE strain_name = s.name ORDER BY terpene_name)) AS terpenes,
+    (SELECT group_concat(benefit, ', ') FROM (SELECT DISTINCT condition_name || ' (' || COALESCE(percentage, '') || '%)'
+        AS benefit FROM strain_medical_benefits WHERE strain_name = s.name ORDER BY benefit)) AS medical_benefits,
+    (SELECT group_concat(related_strain, ', ') FROM (SELECT DISTINCT related_strain FROM strain_genetics
+        WHERE strain_name = s.name AND relationship = 'parent' ORDER BY related_strain)) AS parents,
+    (SELECT group_concat(related_strain, ', ') FROM (SELECT DISTINCT related_strain FROM strain_genetics
+        WHERE strain_name = s.name AND relationship = 'child' ORDER BY related_strain)) AS children
+FROM strains s;
+
+CREATE UNIQUE INDEX idx_strain_complete_name ON strain_complete (name);
+CREATE INDEX idx_strain_complete_name_nocase ON strain_complete (name COLLATE NOCASE);
+
+CREATE TABLE strain_search AS
+SELECT
+    name, url, type, rating, review_count, top_effect, category, image_path, description,
+    trim(name || ' ' || replace(COALESCE(aliases, ''), ',', '') || ' ' ||
+         replace(COALESCE(positive_effects, '') || ' ' || COALESCE(negative_effects, ''), ',', '') || ' ' ||
+         replace(COALESCE(flavors, ''), ',', '') || ' ' || replace(COALESCE(terpenes, ''), ',', '') || ' ' ||
+         (SELECT COALESCE(group_concat(condition_name, ' '), '') FROM strain_medical_benefits
+            WHERE strain_name = c.name) || ' ' ||
+         COALESCE(description, '')) AS search_text
+FROM strain_complete c;
+
+CREATE UNIQUE INDEX idx_strain_search_name ON strain_search (name);
+
+CREATE TABLE effect_popularity AS
+SELECT e.effect, e.type, COUNT(DISTINCT se.strain_name) AS strain_count,
+       COUNT(DISTINCT f.username) AS user_interactions
+FROM effects e
+LEFT JOIN strain_effects se ON e.effect = se.effect
+LEFT JOIN favourited f ON se.strain_name = f.strain_name
+GROUP BY e.effect, e.type
+ORDER BY strain_count DESC, user_interactions DESC;
+
+CREATE TABLE flavor_popularity AS
+SELECT f.flavor, COUNT(DISTINCT sf.strain_name) AS strain_count,
+       COUNT(DISTINCT fav.username) AS user_interactions
+FROM flavors f
+LEFT JOIN strain_flavors sf ON f.flavor = sf.flavor
+LEFT JOIN favourited fav ON sf.strain_name = fav.strain_name
+GROUP BY f.flavor
+ORDER BY strain_count DESC, user_interactions DESC;
+
+CREATE TABLE terpene_popularity AS
+SELECT t.terpene_name, t.terpene_type, COUNT(DISTINCT st.strain_name) AS strain_count,
+       COUNT(DISTINCT s.username) AS user_interactions
+FROM terpenes t
+LEFT JOIN strain_terpenes st ON t.terpene_name = st.terpene_name
+LEFT JOIN seen s ON st.strain_name = s.strain_name
+GROUP BY t.terpene_name, t.terpene_type
+ORDER BY strain_count DESC, user_interactions DESC;
+
+CREATE TABLE medical_condition_popularity AS
+SELECT mc.condition_name, COUNT(DISTINCT smb.strain_name) AS strain_count,
+       AVG(smb.percentage) AS avg_effectiveness, COUNT(DISTINCT s.username) AS user_interactions
+FROM medical_conditions mc
+LEFT JOIN strain_medical_benefits smb ON mc.condition_name = smb.condition_name
+LEFT JOIN seen s ON smb.strain_name = s.strain_name
+GROUP BY mc.condition_name
+ORDER BY strain_count DESC, avg_effectiveness DESC;
+
+CREATE VIEW strain_family_tree AS
+SELECT
+    n.strain_name,
+    rel.name AS related_name,
+    rel.strain_name AS related_strain,
+    'ancestor' AS direction,
+    c.depth
+FROM strain_lineage_nodes n
+JOIN strain_lineage_closure c ON c.descendant_id = n.id AND c.depth > 0
+JOIN strain_lineage_nodes rel ON rel.id = c.ancestor_id
+UNION ALL
+SELECT
+    n.strain_name,
+    rel.name AS related_name,
+    rel.strain_name AS related_strain,
+    'descendant' AS direction,
+    c.depth
+FROM strain_lineage_nodes n
+JOIN strain_lineage_closure c ON c.ancestor_id = n.id AND c.depth > 0
+JOIN strain_lineage_nodes rel ON rel.id = c.descendant_id;
+
+CREATE VIRTUAL TABLE strain_fts USING fts5(
+    name, aliases, effects, flavors, terpenes, conditions, description,
+    tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+);
+
+INSERT INTO strain_fts (rowid, name, aliases, effects, flavors, terpenes, conditions, description)
+SELECT c.rowid, c.name, c.aliases,
+       trim(COALESCE(c.positive_effects, '') || ', ' || COALESCE(c.negative_effects, ''), ', '),
+       c.flavors, c.terpenes, c.medical_benefits, c.description
+FROM strain_complete c;
+
+INSERT INTO strain_fts (strain_fts) VALUES ('optimize');
+"""
+
+# bm25 column weights: a name hit outranks an alias hit, which outranks everything else
+FTS_WEIGHTS = (10.0, 5.0, 1.0, 1.0, 1.0, 1.0, 0.5)
+
+
+def import_lineage(conn, graph):
+    """import_lineage_graph for SQLite (execute_values and TRUNCATE are Postgres-only)"""
+    cursor = conn.cursor()
+    nodes = lineage_node_records(graph)
+    closure = graph.closure()
+    with metrics.db_statement('strain_lineage_nodes', len(nodes)):
+        cursor.executemany("INSERT INTO strain_lineage_nodes (id, name, slug, strain_name) "
+                           "VALUES (?, ?, ?, ?)", nodes)
+    with metrics.db_statement('strain_lineage_closure', len(closure)):
+        cursor.executemany("INSERT INTO strain_lineage_closure (ancestor_id, descendant_id, depth) "
+                           "VALUES (?, ?, ?)", closure)
+    conn.commit()
+    print(f"Inserted {len(nodes)} lineage nodes")
+    print(f"Inserted {len(closure)} lineage closure rows")
+
+
+def build_mirror(strains_data, filename: str = MIRROR_FILE):
+    """Write the mirror to a temp file and swap it in, so readers never see a half-built database"""
+    tmp_file = filename + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+
+    conn = sqlite3.connect(tmp_file)
+    try:
+        # A throwaway build file needs no journal or fsyncs
+        conn.executescript("PRAGMA journal_mode = OFF; PRAGMA synchronous = OFF; PRAGMA cache_size = -65536;")
+        conn.executescript(SCHEMA)
+
+        with profiling.stage('tables'):
+            insert_strains(conn, strains_data)
+            insert_strain_akas(conn, strains_data)
+            insert_effects(conn, strains_data)
+            insert_flavors(conn, strains_data)
+            insert_terpenes(conn, strains_data)
+            insert_medical_conditions(conn, strains_data)
+            insert_strain_effects(conn, strains_data)
+            insert_strain_flavors(conn, strains_data)
+            insert_strain_terpenes(conn, strains_data)
+            insert_medical_benefits(conn, strains_data)
+            lineage = build_lineage_graph(strains_data)
+            insert_genetics(conn, strains_data, lineage)
+            import_lineage(conn, lineage)
+
+        with profiling.stage('indexes'):
+            conn.executescript(INDEXES)
+        with profiling.stage('aggregates'):
+            conn.executescript(AGGREGATES)
+            conn.executescript("ANALYZE; PRAGMA journal_mode = DELETE;")
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_file, filename)
+
+
+def search(conn, query: str, limit: int = 10) -> List[Tuple[str, float]]:
+    """Full-text search; every term may be a prefix ("blu ber" finds Blueberry)"""
+    terms = ' '.join('"' + term.replace('"', '""') + '"*' for term in query.split())
+    weights = ', '.join(str(w) for w in FTS_WEIGHTS)
+    return conn.execute(f"SELECT name, bm25(strain_fts, {weights}) AS score FROM strain_fts "
+                        f"WHERE strain_fts MATCH ? ORDER BY score LIMIT ?", (terms, limit)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an offline SQLite mirror of the strain database")
+    parser.add_argument('input', nargs='?', default='enhanced-data.json',
+                        help='enhanced-data.json or a columnar_export.py directory')
+    parser.add_argument('-o', '--output', default=MIRROR_FILE)
+    parser.add_argument('--search', help='query an existing mirror instead of building one')
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    if args.search:
+        conn = sqlite3.connect(f"file:{args.output}?mode=ro", uri=True)
+        for name, score in search(conn, args.search):
+            print(f"{score:8.2f}  {name}")
+        conn.close()
+        return
+
+    metrics.start_run('sqlite_mirror')
+    try:
+        with profiling.profile_run('sqlite_mirror', args.profile or ''):
+            started = time.perf_counter()
+            strains_data = load_json_data(args.input)
+            build_mirror(strains_data, args.output)
+        size_mb = os.path.getsize(args.output) / 1024 / 1024
+        print(f"🗄️  Built {args.output} ({size_mb:.1f} MB) in {time.perf_counter() - started:.1f}s")
+    finally:
+        metrics.write_run_report('sqlite_mirror')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Canonical strain identity index
+Maps every way a strain is referred to (URL slug, display name, normalized name
+and each aka) to one integer strain ID, persisted in strain-index.json so every
+pipeline stage resolves URLs, image files, S3 keys and joins the same way.
+"""
+
+import json
+import re
+import time
+from typing import Dict, List, Any, Optional
+
+INDEX_FILE = 'strain-index.json'
+BASE_URL = "https://www.leafly.com"
+
+
+def slugify(name: str) -> str:
+    """Leafly-style slug: lowercase alphanumerics joined by single hyphens ("AJ's Sour Diesel" -> ajs-sour-diesel)"""
+    return re.sub(r'[^a-z0-9]+', '-', re.sub(r"['’]", '', (name or '').lower())).strip('-')
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a display name for case/punctuation-insensitive matching"""
+    return ''.join(c for c in (name or '').lower() if c.isalnum())
+
+
+def slug_from_url(url: str) -> Optional[str]:
+    """Extract the strain slug from a Leafly strain URL"""
+    if not url or '/strains/' not in url:
+        return None
+    slug = url.split('/strains/')[-1].split('?')[0].split('#')[0].strip('/')
+    return slug.lower() or None
+
+
+class StrainIdentityIndex:
+    """Persistent slug/name/aka -> strain ID index with O(1) lookups"""
+
+    def __init__(self):
+        self.strains: List[Dict[str, Any]] = []
+        self.keys: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self.strains)
+
+    def register(self, strain: Dict[str, Any]) -> int:
+        """Add (or refresh) a strain record and return its stable ID"""
+        name = (strain.get('name') or '').strip()
+        url_slug = slug_from_url(strain.get('url'))
+        slug = url_slug or slugify(name)
+
+        # Without a URL, an existing name/aka match is a better guess than a derived slug
+        strain_id = self.keys.get(slug) if url_slug else self.resolve(name)
+        if strain_id is None or (url_slug and self.strains[strain_id]['slug'] != slug):
+            strain_id = len(self.strains)
+            self.strains.append({'id': strain_id, 'slug': slug, 'name': name, 'url': None, 'akas': []})
+            # Slugs are authoritative and override any name/aka that collided with them
+            self.keys[slug] = strain_id
+
+        record = self.strains[strain_id]
+        record['name'] = name or record['name']
+        record['url'] = strain.get('url') or record['url'] or f"{BASE_URL}/strains/{slug}"
+        for aka in strain.get('akas', []) or []:
+            if aka and aka.strip() and aka.strip() not in record['akas']:
+                record['akas'].append(aka.strip())
+
+        self._add_key(normalize_name(record['name']), strain_id)
+        for aka in record['akas']:
+            self._add_key(normalize_name(aka), strain_id)
+        return strain_id
+
+    def _add_key(self, key: str, strain_id: int):
+        if key:
+            self.keys.setdefault(key, strain_id)
+
+    def resolve(self, ref: str) -> Optional[int]:
+        """Resolve a slug, URL, display name or aka to a strain ID"""
+        if not ref:
+            return None
+        ref = ref.strip()
+        url_slug = slug_from_url(ref)
+        if url_slug is not None:
+            return self.keys.get(url_slug)
+        for key in (ref.lower(), normalize_name(ref), slugify(ref)):
+            if key in self.keys:
+                return self.keys[key]
+        return None
+
+    def get(self, strain_id: int) -> Dict[str, Any]:
+        return self.strains[strain_id]
+
+    def lookup(self, ref: str) -> Optional[Dict[str, Any]]:
+        strain_id = self.resolve(ref)
+        return None if strain_id is None else self.strains[strain_id]
+
+    def slug_for(self, strain: Dict[str, Any]) -> str:
+        """Canonical slug for a strain dict, registering it if unseen"""
+        return self.strains[self.register(strain)]['slug']
+
+    def url_for(self, ref: str) -> Optional[str]:
+        record = self.lookup(ref)
+        return record['url'] if record else None
+
+    def s3_key(self, strain: Dict[str, Any]) -> str:
+        return f"strains/{self.slug_for(strain)}.png"
+
+    def image_filename(self, strain: Dict[str, Any], ext: str) -> str:
+        # images/ has always used underscores; derive them from the canonical slug
+        return f"{self.slug_for(strain).replace('-', '_')}{ext}"
+
+    def save(self, filename: str = INDEX_FILE):
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({
+                'total_strains': len(self.strains),
+                'index_timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+                'strains': self.strains
+            }, f, ensure_ascii=False, separators=(',', ':'))
+
+    @classmethod
+    def load(cls, filename: str = INDEX_FILE) -> 'StrainIdentityIndex':
+        """Load a saved index, or return an empty one if none exists yet"""
+        index = cls()
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                saved = json.load(f).get('strains', [])
+        except (FileNotFoundError, json.JSONDecodeError):
+            return index
+
+        for record in saved:
+            index.strains.append(record)
+            index.keys[record['slug']] = record['id']
+        for record in saved:
+            index._add_key(normalize_name(record['name']), record['id'])
+            for aka in record.get('akas', []):
+                index._add_key(normalize_name(aka), record['id'])
+        return index
+
+    @classmethod
+    def build(cls, strains: List[Dict[str, Any]], filename: Optional[str] = INDEX_FILE,
+              save: bool = False) -> 'StrainIdentityIndex':
+        """Load the persisted index and register every strain; written back only with save=True"""
+        index = cls.load(filename) if filename else cls()
+        for strain in strains:
+            if strain.get('name') or strain.get('url'):
+                index.register(strain)
+        if filename and save:
+            index.save(filename)
+        return index
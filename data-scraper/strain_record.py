@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Compact strain records
+A slotted StrainRecord holding one strain of the dataset_io schema. Effects,
+flavors, terpenes, conditions and types are stored as IDs into shared interned
+vocabularies and every other list or object as an immutable tuple, so records
+share their repeated strings and a merge replaces fields in place instead of
+copying dicts. Records read like the dicts they came from (get, [], in, update),
+so the merge paths hold the previous snapshot as records and dataset_io writes
+them directly; from_dict/to_dict round-trip any strain exactly, keys outside the
+schema included.
+
+    python strain_record.py enhanced-data.json      # memory per strain, dicts vs records
+"""
+
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Tuple
+
+import dataset_io
+
+_MISSING = object()
+
+
+class Vocabulary:
+    """Bidirectional value <-> small-int mapping shared by every record"""
+    __slots__ = ('values', 'ids')
+
+    def __init__(self):
+        self.values: List[Hashable] = []
+        self.ids: Dict[Hashable, int] = {}
+
+    def intern(self, value: Hashable) -> int:
+        value_id = self.ids.get(value)
+        if value_id is None:
+            value_id = self.ids[value] = len(self.values)
+            self.values.append(value)
+        return value_id
+
+    def encode(self, values: Iterable[Hashable]) -> Tuple[int, ...]:
+        return tuple(self.intern(v) for v in values)
+
+    def decode(self, ids: Iterable[int]) -> List[Hashable]:
+        return [self.values[i] for i in ids]
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+
+EFFECTS = Vocabulary()
+FLAVORS = Vocabulary()
+TERPENES = Vocabulary()      # whole (frozen) terpene entries: name, type and description repeat together
+CONDITIONS = Vocabulary()
+TYPES = Vocabulary()
+VOCABULARIES = {'effects': EFFECTS, 'flavors': FLAVORS, 'terpenes': TERPENES,
+                'conditions': CONDITIONS, 'types': TYPES}
+
+
+class _Object(tuple):
+    """A frozen JSON object: its (key, value) pairs, never equal to a frozen list of pairs"""
+    __slots__ = ()
+
+    def __eq__(self, other):
+        return type(other) is _Object and tuple.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash((_Object, tuple(self)))
+
+
+def _freeze(value: Any) -> Any:
+    """Hashable, immutable form of a JSON value with its strings interned; _thaw reverses it"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, list):
+        return tuple(map(_freeze, value))
+    if isinstance(value, dict):
+        return _Object(zip(map(_freeze, value.keys()), map(_freeze, value.values())))
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, _Object):
+        return {k: _thaw(v) if isinstance(v, tuple) else v for k, v in value}
+    if isinstance(value, tuple):
+        return [_thaw(v) if isinstance(v, tuple) else v for v in value]
+    return value
+
+
+# Each codec returns _MISSING for a value it cannot store compactly; the record then keeps it as is
+
+def _term(vocabulary: Vocabulary) -> Tuple[Callable, Callable]:
+    def encode(value):
+        return vocabulary.intern(value) if value is None or isinstance(value, str) else _MISSING
+    return encode, vocabulary.values.__getitem__
+
+
+def _terms(vocabulary: Vocabulary) -> Tuple[Callable, Callable]:
+    def encode(value):
+        if isinstance(value, list) and all(isinstance(v, str) for v in value):
+            return vocabulary.encode(value)
+        return _MISSING
+    return encode, vocabulary.decode
+
+
+def _encode_terpenes(value):
+    return TERPENES.encode(_freeze(t) for t in value) if isinstance(value, list) else _MISSING
+
+
+def _decode_terpenes(ids):
+    return [_thaw(t) for t in TERPENES.decode(ids)]
+
+
+def _encode_conditions(value):
+    """(condition ID, percentage) for the usual two-key entries, (-1, frozen entry) for anything else"""
+    if not isinstance(value, list):
+        return _MISSING
+    entries = []
+    for item in value:
+        if isinstance(item, dict) and item.keys() == {'condition', 'percentage'} \
+                and isinstance(item['condition'], str):
+            entries.append((CONDITIONS.intern(item['condition']), _freeze(item['percentage'])))
+        else:
+            entries.append((-1, _freeze(item)))
+    return tuple(entries)
+
+
+def _decode_conditions(entries):
+    return [{'condition': CONDITIONS.values[c], 'percentage': _thaw(p)} if c >= 0 else _thaw(p)
+            for c, p in entries]
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+_FROZEN = (_freeze, _thaw)
+
+CODECS: Dict[str, Tuple[Callable, Callable]] = {
+    'type': _term(TYPES),
+    'top_effect': _term(EFFECTS),
+    'akas': _FROZEN,
+    'positive_effects': _terms(EFFECTS),
+    'negative_effects': _terms(EFFECTS),
+    'flavors': _terms(FLAVORS),
+    'detailed_terpenes': (_encode_terpenes, _decode_terpenes),
+    'helps_with': (_encode_conditions, _decode_conditions),
+    'genetics': _FROZEN,
+    'grow_info': _FROZEN,
+    'discovered_via': (_intern, lambda value: value),
+    'mined_conditions': _terms(CONDITIONS),
+}
+
+# The dataset_io schema's fields, in the order the scrapers write them
+FIELDS = tuple(dataset_io.Strain.__annotations__)
+_FIELD_SET = frozenset(FIELDS)
+_ENCODERS = {field: codec[0] for field, codec in CODECS.items()}
+_DECODERS = {field: codec[1] for field, codec in CODECS.items()}
+
+
+class StrainRecord:
+    """One strain of the dataset_io schema; only fields present in the source dict are set
+
+    Values read back are fresh lists and dicts, so change a field by assigning it
+    (record['flavors'] = [...]) or with update(), not by mutating what get() returned.
+    """
+
+    __slots__ = FIELDS + ('_extra',)
+
+    def __init__(self, data: Dict[str, Any] = None):
+        if data:
+            self.update(data)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'StrainRecord':
+        return cls(data)
+
+    def update(self, data: Dict[str, Any]):
+        """Merge JSON-shaped fields into this record in place"""
+        extra = getattr(self, '_extra', None)
+        for key, value in data.items():
+            if key in _FIELD_SET:
+                encode = _ENCODERS.get(key)
+                stored = encode(value) if encode else value
+                if stored is not _MISSING:
+                    setattr(self, key, stored)
+                    if extra and key in extra:
+                        del extra[key]
+                    continue
+                if hasattr(self, key):
+                    delattr(self, key)
+            if extra is None:
+                extra = self._extra = {}
+            extra[key] = value
+
+    def __setitem__(self, key: str, value: Any):
+        self.update({key: value})
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """JSON-shaped value of one field, decoding only what is asked for"""
+        if key in _FIELD_SET:
+            stored = getattr(self, key, _MISSING)
+            if stored is not _MISSING:
+                decode = _DECODERS.get(key)
+                return decode(stored) if decode else stored
+        extra = getattr(self, '_extra', None)
+        return extra.get(key, default) if extra else default
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {}
+        for field in FIELDS:
+            stored = getattr(self, field, _MISSING)
+            if stored is not _MISSING:
+                decode = _DECODERS.get(field)
+                data[field] = decode(stored) if decode else stored
+        data.update(getattr(self, '_extra', None) or {})
+        return data
+
+    def __repr__(self) -> str:
+        return f"StrainRecord({self.get('name', '?')!r})"
+
+
+def compact(strains: List[Any]) -> List[Any]:
+    """Replace each strain dict in the list with its record, in place, so every dict
+    can be freed as soon as it is converted"""
+    for i, strain in enumerate(strains):
+        if isinstance(strain, dict):
+            strains[i] = StrainRecord.from_dict(strain)
+    return strains
+
+
+def load_records(filename: str = 'enhanced-data.json') -> List[StrainRecord]:
+    return compact(dataset_io.load_strains(filename))
+
+
+def measure(filename: str):
+    """Traced bytes per strain for the decoded dicts and for records, conversion times and a round-trip check"""
+    tracemalloc.start()
+    strains = dataset_io.load_strains(filename)
+    dict_bytes = tracemalloc.get_traced_memory()[0]
+    compact(strains)
+    record_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    strains = dataset_io.load_strains(filename)
+    started = time.perf_counter()
+    records = [StrainRecord.from_dict(s) for s in strains]
+    from_seconds = time.perf_counter() - started
+    started = time.perf_counter()
+    round_trip = [record.to_dict() for record in records]
+    to_seconds = time.perf_counter() - started
+    mismatches = sum(a != b for a, b in zip(round_trip, strains))
+
+    count = max(len(strains), 1)
+    print(f"📊 {len(strains)} strains")
+    print(f"   dicts:   {dict_bytes / count:8.0f} bytes/strain")
+    print(f"   records: {record_bytes / count:8.0f} bytes/strain (incl. vocabularies)")
+    print(f"   from_dict {from_seconds * 1000:.0f} ms, to_dict {to_seconds * 1000:.0f} ms, "
+          f"{mismatches} round-trip mismatches")
+    print("   vocabularies: " + ', '.join(f"{k} {len(v)}" for k, v in VOCABULARIES.items()))
+
+if __name__ == "__main__":
+    measure(sys.argv[1] if len(sys.argv) > 1 else 'enhanced-data.json')
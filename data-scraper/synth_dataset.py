@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+"""
+Synthetic dataset generator for scale testing
+Writes enhanced-data.json-compatible datasets at a multiple of the real strain
+count, plus a matching image corpus, so the importer, uploader, views and every
+benchmark can be run at 10x/100x/1000x before production gets there.
+
+Distributions (types, effect/flavor/terpene/condition vocabularies, aka and
+list lengths, lineage fan-out, description lengths, ratings, missing fields,
+shared images) are fitted from a real dataset with --fit, or taken from the
+built-in profile of the ~2,300-strain scrape. Lineage uses preferential
+attachment, so a few strains are parents of many like on the real site, and
+parent/child lists agree in both directions. Strains are streamed to disk, so
+1000x only keeps names, slugs and the lineage arrays in memory.
+
+    python synth_dataset.py --scale 10                         # synth/10x/enhanced-data.json + images/
+    python synth_dataset.py --scale 100 --fit enhanced-data.json --no-images
+    python synth_dataset.py --fit enhanced-data.json --save-profile synth-profile.json
+"""
+
+import argparse
+import json
+import os
+import random
+import struct
+import time
+import zlib
+from array import array
+from collections import Counter
+from itertools import accumulate
+from typing import Any, Dict, Iterator, List, Optional
+
+import dataset_io
+import metrics
+import profiling
+from strain_identity import slugify
+
+BASE_STRAINS = 2300
+SAMPLE_SIZE = 2000
+IMAGE_EDGE = 512
+
+# Approximation of the real scrape; --fit replaces it with measured distributions.
+# Count fields map "length -> share of strains"; vocabularies map "value -> weight".
+DEFAULT_PROFILE: Dict[str, Any] = {
+    'strains': BASE_STRAINS,
+    'types': {'Hybrid': 58, 'Indica': 22, 'Sativa': 20},
+    'positive_effects': {'Relaxed': 30, 'Happy': 28, 'Euphoric': 26, 'Uplifted': 20, 'Sleepy': 12, 'Creative': 10,
+                         'Energetic': 9, 'Focused': 8, 'Hungry': 7, 'Giggly': 6, 'Talkative': 5, 'Tingly': 5,
+                         'Aroused': 4},
+    'negative_effects': {'Dry Mouth': 30, 'Dry Eyes': 18, 'Dizzy': 8, 'Paranoid': 7, 'Anxious': 6, 'Headache': 4},
+    'flavors': {'Earthy': 25, 'Sweet': 22, 'Citrus': 14, 'Pine': 11, 'Berry': 10, 'Pungent': 9, 'Woody': 8,
+                'Spicy/Herbal': 8, 'Diesel': 7, 'Lemon': 7, 'Flowery': 6, 'Skunk': 6, 'Tropical': 5, 'Grape': 4,
+                'Blueberry': 4, 'Lime': 3, 'Pepper': 3, 'Mint': 3, 'Cheese': 2, 'Vanilla': 2, 'Orange': 2,
+                'Apple': 2, 'Honey': 2, 'Coffee': 1, 'Chemical': 1},
+    'terpenes': {'Myrcene': 30, 'Caryophyllene': 28, 'Limonene': 20, 'Terpinolene': 8, 'Pinene': 7,
+                 'Humulene': 4, 'Linalool': 2, 'Ocimene': 1},
+    'terpene_info': {'Myrcene': ['Herbal', 'Myrcene has an earthy, herbal aroma.'],
+                     'Caryophyllene': ['Pepper', 'Caryophyllene has a spicy, peppery aroma.'],
+                     'Limonene': ['Citrus', 'Limonene has a bright citrus aroma.'],
+                     'Terpinolene': ['Piney', 'Terpinolene has a piney, floral aroma.'],
+                     'Pinene': ['Pine', 'Pinene smells like pine needles.'],
+                     'Humulene': ['Woody', 'Humulene has an earthy, woody aroma.'],
+                     'Linalool': ['Floral', 'Linalool has a floral, lavender aroma.'],
+                     'Ocimene': ['Sweet', 'Ocimene has a sweet, herbal aroma.']},
+    'conditions': {'Stress': 30, 'Anxiety': 28, 'Depression': 24, 'Pain': 20, 'Insomnia': 14, 'Lack of appetite': 6,
+                   'Fatigue': 5, 'Headaches': 4, 'Nausea': 4, 'Inflammation': 3, 'PTSD': 3, 'ADD/ADHD': 2},
+    'categories': {'Hybrid': 1},
+    'counts': {
+        'akas': {0: 62, 1: 25, 2: 9, 3: 3, 5: 1},
+        'positive_effects': {0: 12, 3: 88},
+        'negative_effects': {0: 15, 1: 25, 2: 25, 3: 35},
+        'flavors': {0: 12, 1: 8, 2: 12, 3: 68},
+        'detailed_terpenes': {0: 20, 1: 10, 2: 15, 3: 55},
+        'helps_with': {0: 15, 3: 85},
+        'parents': {0: 45, 1: 12, 2: 41, 3: 2},
+    },
+    'samples': {
+        'rating': [3.9, 4.1, 4.2, 4.3, 4.3, 4.4, 4.4, 4.5, 4.5, 4.6, 4.7, 5.0, None],
+        'review_count': [0, 1, 3, 6, 12, 25, 48, 90, 180, 400, 900, 2600],
+        # main.py writes 'THC 18%', or 'THC —' for strains without a figure, and never sets cbd
+        'thc': ['THC 15%', 'THC 17%', 'THC 18%', 'THC 19%', 'THC 20%', 'THC 21%', 'THC 22%', 'THC 24%',
+                'THC 26%', 'THC —'],
+        'percentage': [12, 18, 22, 25, 28, 31, 35, 40, 45, 52],
+        'description_length': [0, 180, 320, 420, 520, 610, 700, 820, 980, 1250],
+    },
+    # Share of strains that have the field at all
+    'present': {'url': 1.0, 'image_url': 0.93, 'description': 0.9, 'genetics': 0.8, 'top_effect': 0.85,
+                'detailed_review_count': 0.85, 'grow_info': 0.3},
+    # Share of strains showing one of the shared stock images, and how many of those exist
+    'shared_image_rate': 0.08,
+    'shared_images': 6,
+    # Share of parent references that point outside the listing (lineage-only strains)
+    'external_parent_rate': 0.15,
+    'words': ['this', 'strain', 'is', 'a', 'hybrid', 'indica', 'sativa', 'cross', 'of', 'and', 'with', 'the',
+              'effects', 'relaxing', 'uplifting', 'aroma', 'flavor', 'sweet', 'earthy', 'notes', 'growers',
+              'consumers', 'report', 'feeling', 'happy', 'euphoric', 'buds', 'dense', 'THC', 'levels', 'high',
+              'often', 'for', 'stress', 'pain', 'medical', 'patients', 'evening', 'daytime', 'use', 'classic',
+              'potent', 'pine', 'citrus', 'diesel', 'berry', 'smooth', 'heavy', 'body', 'cerebral', 'buzz'],
+}
+
+NAME_PREFIXES = ['Blue', 'Purple', 'Golden', 'Sour', 'Northern', 'Super', 'Royal', 'Cherry', 'Lemon', 'Grape',
+                 'Mango', 'Strawberry', 'Cosmic', 'Wedding', 'Ghost', 'Alien', 'Tropical', 'Black', 'White',
+                 'Green', 'Pink', 'Candy', 'Frosted', 'Electric', 'Cookies', 'Banana', 'Lava', 'Gelato', 'Maui',
+                 'Hawaiian', 'Jack', 'Kosher', 'Bubba', 'Platinum', 'Skywalker', 'Zkittlez']
+NAME_SUFFIXES = ['Dream', 'Kush', 'Haze', 'Diesel', 'OG', 'Cake', 'Widow', 'Punch', 'Runtz', 'Glue', 'Cookies',
+                 'Lights', 'Skunk', 'Berry', 'Tangie', 'Mints', 'Sherbet', 'Breath', 'Crack', 'Train', 'Gas',
+                 'Pie', 'Fuel', 'Zkittlez', 'Kiss', 'Fire', 'Jelly', 'Fruit', 'Bomb', 'Poison']
+
+
+def _reservoir(values: Iterator, size: int = SAMPLE_SIZE, seed: int = 0) -> List:
+    rng = random.Random(seed)
+    sample = []
+    for i, value in enumerate(values):
+        if i < size:
+            sample.append(value)
+        else:
+            j = rng.randrange(i + 1)
+            if j < size:
+                sample[j] = value
+    return sample
+
+
+def fit_profile(strains: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Measure the generator's distributions on a real dataset"""
+    def lengths(get):
+        return dict(Counter(len(get(s) or ()) for s in strains))
+
+    def vocab(field):
+        return dict(Counter(v for s in strains for v in (s.get(field) or ()) if isinstance(v, str)))
+
+    names = {slugify(s.get('name')) for s in strains}
+    terpene_info, terpenes = {}, Counter()
+    for s in strains:
+        for t in s.get('detailed_terpenes') or ():
+            t = t if isinstance(t, dict) else {'name': t}
+            if t.get('name'):
+                terpenes[t['name']] += 1
+                terpene_info.setdefault(t['name'], [t.get('type'), t.get('description')])
+    image_urls = Counter((s.get('image_url') or '').split('?')[0] for s in strains if s.get('image_url'))
+    shared = {url for url, n in image_urls.items() if n > 1}
+    parent_slugs = [slug for s in strains for slug in (s.get('genetics') or {}).get('parent_slugs') or () if slug]
+    words = Counter(w for s in strains for w in (s.get('description') or '').split())
+
+    return {
+        'strains': len(strains),
+        'types': dict(Counter(s.get('type') or 'Hybrid' for s in strains)),
+        'positive_effects': vocab('positive_effects'),
+        'negative_effects': vocab('negative_effects'),
+        'flavors': vocab('flavors'),
+        'terpenes': dict(terpenes),
+        'terpene_info': terpene_info,
+        'conditions': dict(Counter(c['condition'] for s in strains for c in s.get('helps_with') or ()
+                                   if c.get('condition'))),
+        'categories': dict(Counter(s['category'] for s in strains if s.get('category'))) or {'Hybrid': 1},
+        'counts': {
+            'akas': lengths(lambda s: s.get('akas')),
+            'positive_effects': lengths(lambda s: s.get('positive_effects')),
+            'negative_effects': lengths(lambda s: s.get('negative_effects')),
+            'flavors': lengths(lambda s: s.get('flavors')),
+            'detailed_terpenes': lengths(lambda s: s.get('detailed_terpenes')),
+            'helps_with': lengths(lambda s: s.get('helps_with')),
+            'parents': lengths(lambda s: (s.get('genetics') or {}).get('parents')),
+        },
+        'samples': {
+            'rating': _reservoir(s.get('rating') for s in strains),
+            'review_count': _reservoir(s.get('review_count') or 0 for s in strains),
+            'thc': _reservoir(s.get('thc') for s in strains),
+            'cbd': _reservoir(s['cbd'] for s in strains if s.get('cbd')),
+            'percentage': _reservoir(c.get('percentage') for s in strains for c in s.get('helps_with') or ()),
+            'description_length': _reservoir(len(s.get('description') or '') for s in strains),
+        },
+        'present': {field: sum(1 for s in strains if s.get(field)) / max(1, len(strains))
+                    for field in DEFAULT_PROFILE['present']},
+        'shared_image_rate': sum(image_urls[url] for url in shared) / max(1, len(strains)),
+        'shared_images': max(1, len(shared)),
+        'external_parent_rate': (sum(1 for slug in parent_slugs if slug not in names) / len(parent_slugs)
+                                 if parent_slugs else DEFAULT_PROFILE['external_parent_rate']),
+        'words': [w for w, _ in words.most_common(2000)] or DEFAULT_PROFILE['words'],
+    }
+
+
+class Sampler:
+    """Weighted draws from one profile, seeded so every scale is reproducible"""
+
+    def __init__(self, profile: Dict[str, Any], seed: int):
+        self.profile = profile
+        self.rng = random.Random(seed)
+        self.tables = {}
+
+    def _table(self, key: str, weights: Dict):
+        if key not in self.tables:
+            self.tables[key] = (list(weights), list(accumulate(weights.values())))
+        return self.tables[key]
+
+    def choice(self, key: str, weights: Dict):
+        values, cumulative = self._table(key, weights)
+        return self.rng.choices(values, cum_weights=cumulative)[0]
+
+    def count(self, field: str) -> int:
+        return int(self.choice('count:' + field, self.profile['counts'][field]))
+
+    def distinct(self, field: str, n: int) -> List[str]:
+        """n different values of a vocabulary, drawn by frequency"""
+        weights = self.profile[field]
+        n = min(n, len(weights))
+        picked = []
+        while len(picked) < n:
+            value = self.choice(field, weights)
+            if value not in picked:
+                picked.append(value)
+        return picked
+
+    def sample(self, field: str):
+        return self.rng.choice(self.profile['samples'][field])
+
+    def present(self, field: str) -> bool:
+        return self.rng.random() < self.profile['present'].get(field, 1.0)
+
+
+def strain_names(n: int) -> List[str]:
+    """Unique, realistic-looking names; later generations get a numeric suffix like re-releases"""
+    combos = [f"{a} {b}" for a in NAME_PREFIXES for b in NAME_SUFFIXES if a != b]
+    random.Random(7).shuffle(combos)
+    return [combos[i % len(combos)] + (f" #{i // len(combos)}" if i >= len(combos) else '') for i in range(n)]
+
+
+def plan_lineage(n: int, sampler: Sampler):
+    """Parents per strain as CSR arrays (earlier strains only, preferential attachment) and the inverse"""
+    parent_offsets, parents = array('l', [0]), array('l')
+    # Each strain appears once, plus once per child, so popular parents keep attracting children
+    attachment = array('l')
+    for i in range(n):
+        for _ in range(sampler.count('parents') if i else 0):
+            if sampler.rng.random() < sampler.profile['external_parent_rate']:
+                parents.append(-1 - sampler.rng.randrange(max(1, n // 10)))  # lineage-only strain
+            else:
+                parent = attachment[sampler.rng.randrange(len(attachment))]
+                if parent not in parents[parent_offsets[i]:]:
+                    parents.append(parent)
+                    attachment.append(parent)
+        parent_offsets.append(len(parents))
+        attachment.append(i)
+
+    child_counts = array('l', [0] * (n + 1))
+    for parent in parents:
+        if parent >= 0:
+            child_counts[parent + 1] += 1
+    child_offsets = array('l', accumulate(child_counts))
+    children = array('l', [0] * child_offsets[-1])
+    fill = array('l', child_offsets)
+    for i in range(n):
+        for parent in parents[parent_offsets[i]:parent_offsets[i + 1]]:
+            if parent >= 0:
+                children[fill[parent]] = i
+                fill[parent] += 1
+    return parent_offsets, parents, child_offsets, children
+
+
+def generate(scale: float, profile: Dict[str, Any] = DEFAULT_PROFILE, seed: int = 0,
+             images_dir: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield scale x profile['strains'] synthetic strains in enhanced-data.json shape"""
+    n = max(1, int(profile['strains'] * scale))
+    sampler = Sampler(profile, seed)
+    names = strain_names(n)
+    slugs = [slugify(name) for name in names]
+    parent_offsets, parents, child_offsets, children = plan_lineage(n, sampler)
+    words = profile['words']
+
+    def ref(index: int):
+        if index >= 0:
+            return slugs[index]
+        return f"landrace-{-index}"
+
+    for i in range(n):
+        rng = sampler.rng
+        strain_type = sampler.choice('types', profile['types'])
+        initials = ''.join(word[0] for word in names[i].split() if word[0].isalnum())
+        strain = {
+            'name': names[i],
+            'url': f"https://www.leafly.com/strains/{slugs[i]}",
+            'type': strain_type,
+            'thc': sampler.sample('thc'),
+            # Initialisms, like GSC for Girl Scout Cookies; they collide across strains as on the real site
+            'akas': [initials + (str(k + 1) if k else '') for k in range(sampler.count('akas'))],
+            'rating': sampler.sample('rating'),
+            'review_count': sampler.sample('review_count'),
+            'category': sampler.choice('categories', profile['categories']),
+        }
+        if profile['samples'].get('cbd'):
+            # Only fitted profiles of datasets that carry cbd (e.g. merged from another source) have samples
+            strain['cbd'] = sampler.sample('cbd')
+
+        if sampler.present('image_url'):
+            if rng.random() < profile['shared_image_rate']:
+                image_id = f"stock-{rng.randrange(profile['shared_images'])}"
+            else:
+                image_id = f"{slugs[i]}-{i}"
+            strain['image_url'] = f"https://images.leafly.com/flower-images/{image_id}.png?auto=compress&w=512"
+            strain['image_path'] = os.path.join(images_dir, f"{image_id}.png") if images_dir else None
+        length = sampler.sample('description_length') if sampler.present('description') else 0
+        if length:
+            text, size = [], 0
+            while size < length:
+                word = rng.choice(words)
+                text.append(word)
+                size += len(word) + 1
+            text = ' '.join(text)[:max(length, 1)]
+            strain['description'] = text[:1].upper() + text[1:]
+
+        strain['positive_effects'] = sampler.distinct('positive_effects', sampler.count('positive_effects'))
+        strain['negative_effects'] = sampler.distinct('negative_effects', sampler.count('negative_effects'))
+        if strain['positive_effects'] and sampler.present('top_effect'):
+            strain['top_effect'] = strain['positive_effects'][0]
+        strain['flavors'] = sampler.distinct('flavors', sampler.count('flavors'))
+        strain['detailed_terpenes'] = []
+        for name in sampler.distinct('terpenes', sampler.count('detailed_terpenes')):
+            terpene_type, description = profile['terpene_info'].get(name, [None, None])
+            strain['detailed_terpenes'].append({'name': name, 'type': terpene_type, 'description': description})
+        strain['helps_with'] = [{'condition': c, 'percentage': sampler.sample('percentage')}
+                                for c in sampler.distinct('conditions', sampler.count('helps_with'))]
+
+        if sampler.present('genetics'):
+            parent_slugs = [ref(p) for p in parents[parent_offsets[i]:parent_offsets[i + 1]]]
+            child_slugs = [slugs[c] for c in children[child_offsets[i]:child_offsets[i + 1]]]
+            strain['genetics'] = {
+                # Same derivation as the detail scraper: title-cased slug
+                'parents': [s.replace('-', ' ').title() for s in parent_slugs],
+                'children': [s.replace('-', ' ').title() for s in child_slugs],
+                'parent_slugs': parent_slugs,
+                'child_slugs': child_slugs,
+            }
+        else:
+            strain['genetics'] = {}
+        strain['grow_info'] = {'notes': 'Grows well indoors.'} if sampler.present('grow_info') else {}
+        if sampler.present('detailed_review_count'):
+            strain['detailed_review_count'] = f"{strain['review_count']:,}"
+        yield strain
+
+
+def write_dataset(strains: Iterator[Dict[str, Any]], filename: str, total: int) -> int:
+    """Stream strains into an enhanced-data.json without holding them all in memory"""
+    header = dataset_io.encode({'total_strains': total, 'scrape_timestamp': time.strftime('%Y-%m-%d %H:%M:%S')})
+    written = 0
+    with open(filename + '.tmp', 'wb') as f:
+        f.write(header[:-1] + b',"enhanced_strains":[')
+        for strain in strains:
+            if written:
+                f.write(b',')
+            f.write(dataset_io.encode(strain))
+            written += 1
+        f.write(b']}')
+    os.replace(filename + '.tmp', filename)
+    return written
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+
+def fake_png(seed: str, target_bytes: int, edge: int = IMAGE_EDGE) -> bytes:
+    """A decodable RGB PNG: a flat colour with enough noise rows to land near target_bytes"""
+    rng = random.Random(seed)
+    color = bytes(rng.randrange(256) for _ in range(3))
+    flat_row = b'\x00' + color * edge
+    noise_rows = min(edge, max(0, target_bytes // (edge * 3)))
+    raw = b''.join(b'\x00' + rng.randbytes(edge * 3) if y < noise_rows else flat_row for y in range(edge))
+    return (b'\x89PNG\r\n\x1a\n' + _png_chunk(b'IHDR', struct.pack('>IIBBBBB', edge, edge, 8, 2, 0, 0, 0)) +
+            _png_chunk(b'IDAT', zlib.compress(raw, 1)) + _png_chunk(b'IEND', b''))
+
+
+def with_images(strains: Iterator[Dict[str, Any]], images_dir: str, image_bytes: int,
+                written: set) -> Iterator[Dict[str, Any]]:
+    """Write one PNG per distinct image_path as the strains stream past; stock images are written once"""
+    os.makedirs(images_dir, exist_ok=True)
+    for strain in strains:
+        path = strain.get('image_path')
+        if path and path not in written:
+            written.add(path)
+            if not os.path.exists(path):
+                with open(path, 'wb') as f:
+                    f.write(fake_png(os.path.basename(path), image_bytes))
+        yield strain
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate synthetic strain datasets for scale testing")
+    parser.add_argument('--scale', type=float, default=10, help='multiple of the real strain count (10, 100, 1000)')
+    parser.add_argument('--fit', help='real enhanced-data.json to fit the distributions on')
+    parser.add_argument('--profile-file', help='load distributions saved with --save-profile')
+    parser.add_argument('--save-profile', help='write the fitted distributions to this file and exit')
+    parser.add_argument('-o', '--output-dir', help='default: synth/<scale>x')
+    parser.add_argument('--no-images', action='store_true', help='skip the fake image corpus')
+    parser.add_argument('--image-bytes', type=int, default=120_000,
+                        help='approximate size of each fake image (lower it, or use --no-images, at 1000x)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=profiling.MODES)
+    args = parser.parse_args()
+
+    profile = DEFAULT_PROFILE
+    if args.fit:
+        profile = fit_profile(dataset_io.load_strains(args.fit))
+    elif args.profile_file:
+        with open(args.profile_file, 'r', encoding='utf-8') as f:
+            profile = json.load(f)
+    if args.save_profile:
+        with open(args.save_profile, 'w', encoding='utf-8') as f:
+            json.dump(profile, f, indent=2, ensure_ascii=False)
+        print(f"📐 Saved distributions of {profile['strains']} strains to {args.save_profile}")
+        return
+
+    output_dir = args.output_dir or os.path.join('synth', f"{args.scale:g}x")
+    images_dir = None if args.no_images else os.path.join(output_dir, 'images')
+    filename = os.path.join(output_dir, 'enhanced-data.json')
+    os.makedirs(output_dir, exist_ok=True)
+
+    metrics.start_run('synth_dataset')
+    try:
+        with profiling.profile_run('synth_dataset', args.profile or ''):
+            total = max(1, int(profile['strains'] * args.scale))
+            strains = generate(args.scale, profile, args.seed, images_dir)
+            images = set()
+            if images_dir:
+                strains = with_images(strains, images_dir, args.image_bytes, images)
+            with profiling.stage('generate'):
+                written = write_dataset(strains, filename, total)
+        size_mb = os.path.getsize(filename) / 1024 / 1024
+        print(f"🧪 Wrote {written} strains ({args.scale:g}x) to {filename} ({size_mb:.1f} MB)")
+        if images_dir:
+            print(f"🖼️  Wrote {len(images)} distinct images to {images_dir}/")
+    finally:
+        metrics.write_run_report('synth_dataset')
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""
+Parser benchmarks over the fixture corpus (pytest-benchmark)
+Times every case from benchmark_parsers.build_cases and checks its output against
+fixtures/v1/expected.json. Throughput is gated against a run saved on the same
+machine, since timings from another machine mean nothing:
+
+    pytest tests/ --benchmark-autosave                                       # save a baseline
+    pytest tests/ --benchmark-compare --benchmark-compare-fail=median:20%    # fail on a >20% slowdown
+"""
+
+import logging
+
+import pytest
+
+from benchmark_parsers import FIXTURES_DIR, build_cases, canonical, load_json
+
+CORPUS = FIXTURES_DIR / 'v1'
+EXPECTED = load_json(CORPUS / 'expected.json')
+CASES = build_cases(CORPUS)
+
+
+@pytest.fixture(autouse=True)
+def quiet_parsers():
+    # Parsers log every page at INFO, which would dominate the timings
+    logging.disable(logging.CRITICAL)
+    yield
+    logging.disable(logging.NOTSET)
+
+
+@pytest.mark.parametrize('case_id, func', CASES, ids=[case_id for case_id, _ in CASES])
+def test_parser(benchmark, case_id, func):
+    # The first call is the one expected.json records (learned JSON paths settle on it)
+    output = canonical(func())
+    assert output == EXPECTED[case_id]
+    benchmark.group = case_id.split(':')[0]
+    assert canonical(benchmark(func)) == output
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Shared SQLite work queue for multi-process scraping
+A coordinator enqueues strain URLs; any number of worker processes (here or on
+other machines sharing the filesystem) claim tasks under a lease, heartbeat while
+they work and commit results. Expired leases go back to the queue, and a token
+bucket stored in the database caps the combined request rate of all workers.
+
+    python work_queue.py enqueue detail              # strains from data.json
+    python work_queue.py enqueue missing             # gaps in enhanced-data.json
+    python work_queue.py worker --processes 4        # on every machine
+    python work_queue.py status
+    python work_queue.py collect detail              # -> enhanced-data.json
+    python work_queue.py collect missing             # -> enhanced-data.patch.json
+
+Use --journal delete when the database lives on a network filesystem (WAL needs
+shared memory that only works on a single host).
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import dataset_io
+import metrics
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DB = 'work-queue.db'
+LEASE_SECONDS = 120
+MAX_ATTEMPTS = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    result TEXT,
+    error TEXT,
+    updated REAL NOT NULL,
+    UNIQUE (kind, url)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_claim ON tasks (kind, status, lease_expires);
+CREATE TABLE IF NOT EXISTS rate_limit (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL
+);
+"""
+
+
+class WorkQueue:
+    """Leased task queue in a single SQLite file; one instance per thread or process"""
+
+    def __init__(self, filename: str = QUEUE_DB, journal: str = 'wal'):
+        self.filename = filename
+        # isolation_level=None: transactions are managed explicitly with BEGIN IMMEDIATE
+        self.conn = sqlite3.connect(filename, timeout=60, isolation_level=None)
+        self.conn.execute(f"PRAGMA journal_mode={journal}")
+        self.conn.execute("PRAGMA busy_timeout=60000")
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def _write(self, sql: str, params=()) -> sqlite3.Cursor:
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self.conn.execute(sql, params)
+            self.conn.execute("COMMIT")
+            return cursor
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def enqueue(self, kind: str, tasks: List[Dict[str, Any]]) -> int:
+        """Add tasks (each needs a 'url'); already-queued URLs are left alone"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        before = self.conn.total_changes
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO tasks (kind, url, payload, updated) VALUES (?, ?, ?, ?)",
+            [(kind, task['url'], json.dumps(task, ensure_ascii=False), now) for task in tasks if task.get('url')])
+        self.conn.execute("COMMIT")
+        return self.conn.total_changes - before
+
+    def claim(self, owner: str, kinds: Optional[List[str]] = None, lease_seconds: float = LEASE_SECONDS,
+              max_attempts: int = MAX_ATTEMPTS) -> Optional[Dict[str, Any]]:
+        """Lease the oldest pending (or lease-expired) task, or None when nothing is claimable"""
+        now = time.time()
+        kind_filter = f"AND kind IN ({','.join('?' * len(kinds))})" if kinds else ''
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            # An expired lease counts as a failed attempt (the worker crashed or hung), so a task
+            # that keeps killing its worker is parked instead of being handed out forever
+            self.conn.execute(
+                f"""UPDATE tasks SET status = 'failed', error = 'lease expired', lease_owner = NULL,
+                    lease_expires = NULL, updated = ?
+                    WHERE status = 'leased' AND lease_expires < ? AND attempts >= ? {kind_filter}""",
+                (now, now, max_attempts, *(kinds or [])))
+            row = self.conn.execute(
+                f"""SELECT id, kind, url, payload, attempts FROM tasks
+                    WHERE (status = 'pending' OR (status = 'leased' AND lease_expires < ?)) {kind_filter}
+                    ORDER BY id LIMIT 1""",
+                (now, *(kinds or []))).fetchone()
+            if row is None:
+                self.conn.execute("COMMIT")
+                return None
+            self.conn.execute(
+                """UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                   attempts = attempts + 1, updated = ? WHERE id = ?""",
+                (owner, now + lease_seconds, now, row[0]))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        return {'id': row[0], 'kind': row[1], 'url': row[2], 'payload': json.loads(row[3]),
+                'attempts': row[4] + 1}
+
+    def heartbeat(self, task_id: int, owner: str, lease_seconds: float = LEASE_SECONDS) -> bool:
+        """Extend a lease; False means the lease was lost and another worker may own the task"""
+        now = time.time()
+        cursor = self._write(
+            "UPDATE tasks SET lease_expires = ?, updated = ? WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+            (now + lease_seconds, now, task_id, owner))
+        return cursor.rowcount == 1
+
+    def complete(self, task_id: int, owner: str, result: Any) -> bool:
+        cursor = self._write(
+            """UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_owner = NULL,
+               lease_expires = NULL, updated = ? WHERE id = ? AND lease_owner = ?""",
+            (json.dumps(result, ensure_ascii=False), time.time(), task_id, owner))
+        return cursor.rowcount == 1
+
+    def fail(self, task_id: int, owner: str, error: str, max_attempts: int = MAX_ATTEMPTS):
+        """Return the task to the queue, or park it as failed after max_attempts"""
+        self._write(
+            """UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+               error = ?, lease_owner = NULL, lease_expires = NULL, updated = ?
+               WHERE id = ? AND lease_owner = ?""",
+            (max_attempts, error, time.time(), task_id, owner))
+
+    def acquire_token(self, rate: float):
+        """Block until the shared bucket (1 token burst) allows another request"""
+        while True:
+            now = time.time()
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.conn.execute("SELECT tokens, updated FROM rate_limit WHERE id = 1").fetchone()
+                tokens = 1.0 if row is None else min(1.0, row[0] + (now - row[1]) * rate)
+                granted = tokens >= 1
+                self.conn.execute("INSERT OR REPLACE INTO rate_limit (id, tokens, updated) VALUES (1, ?, ?)",
+                                  (tokens - 1 if granted else tokens, now))
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            if granted:
+                return
+            time.sleep((1 - tokens) / rate)
+
+    def pause_tokens(self, rate: float, seconds: float):
+        """Drain the shared bucket so every worker backs off (e.g. after a 429), like RateLimiter.pause"""
+        now = time.time()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT tokens, updated FROM rate_limit WHERE id = 1").fetchone()
+            tokens = 1.0 if row is None else min(1.0, row[0] + (now - row[1]) * rate)
+            # A shorter pause from another worker must not cut an existing one short
+            self.conn.execute("INSERT OR REPLACE INTO rate_limit (id, tokens, updated) VALUES (1, ?, ?)",
+                              (min(tokens, -seconds * rate), now))
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+
+    def status(self) -> Dict[str, Dict[str, int]]:
+        counts: Dict[str, Dict[str, int]] = {}
+        for kind, status, count in self.conn.execute(
+                "SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status"):
+            counts.setdefault(kind, {})[status] = count
+        expired = self.conn.execute("SELECT COUNT(*) FROM tasks WHERE status = 'leased' AND lease_expires < ?",
+                                    (time.time(),)).fetchone()[0]
+        if expired:
+            counts['expired_leases'] = {'leased': expired}
+        return counts
+
+    def results(self, kind: str) -> List[Dict[str, Any]]:
+        """Every task of a kind in enqueue order, with its result when done"""
+        return [{'url': url, 'payload': json.loads(payload), 'status': status,
+                 'result': json.loads(result) if result else None}
+                for url, payload, status, result in self.conn.execute(
+                    "SELECT url, payload, status, result FROM tasks WHERE kind = ? ORDER BY id", (kind,))]
+
+
+class Heartbeat:
+    """Keeps a task's lease alive from a background thread while the worker is busy"""
+
+    def __init__(self, filename: str, task_id: int, owner: str, lease_seconds: float, journal: str):
+        self.args = (filename, task_id, owner, lease_seconds, journal)
+        self.stop = threading.Event()
+        self.lost = False
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        filename, task_id, owner, lease_seconds, journal = self.args
+        queue = WorkQueue(filename, journal)
+        try:
+            while not self.stop.wait(lease_seconds / 3):
+                if not queue.heartbeat(task_id, owner, lease_seconds):
+                    self.lost = True
+                    return
+        finally:
+            queue.close()
+
+    def __enter__(self) -> 'Heartbeat':
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+
+class SharedLimiter:
+    """RateLimiter interface over the queue's token bucket, so scraper backoff pauses every worker"""
+
+    def __init__(self, queue: WorkQueue, rate: float):
+        self.queue = queue
+        self.rate = rate
+
+    def acquire(self):
+        self.queue.acquire_token(self.rate)
+
+    def pause(self, seconds: float):
+        self.queue.pause_tokens(self.rate, seconds)
+
+
+class TaskRunner:
+    """Executes claimed tasks with the existing scrapers"""
+
+    def __init__(self, limiter: Optional[SharedLimiter] = None):
+        self.limiter = limiter
+        self.detail_scraper = None
+        self.missing_scraper = None
+
+    def run(self, task: Dict[str, Any]) -> Any:
+        payload = task['payload']
+        if task['kind'] == 'detail':
+            if self.detail_scraper is None:
+                from enhanced_scraper import EnhancedLeaflyStrainScraper
+                # Images are fetched later (image_uploader.py, pipeline.py upload) rather than here, where
+                # their requests would bypass the shared rate cap
+                self.detail_scraper = EnhancedLeaflyStrainScraper(download_images=False, request_delay=0,
+                                                                  index_file=None)
+                self.detail_scraper.rate_limiter = self.limiter
+            result = self.detail_scraper.scrape_strain_details(payload)
+            if result is payload:
+                raise RuntimeError(f"failed to fetch {task['url']}")
+            return result
+        if task['kind'] == 'missing':
+            if self.missing_scraper is None:
+                from missing_data_scraper import MissingDataScraper
+                self.missing_scraper = MissingDataScraper()
+                self.missing_scraper.rate_limiter = self.limiter
+            # Raises on a failed fetch, so the task is retried like a detail task
+            return self.missing_scraper.fetch_strain_data(payload['url'], payload['name'],
+                                                          payload['missing_fields'])
+        raise ValueError(f"unknown task kind {task['kind']!r}")
+
+
+def run_worker(filename: str = QUEUE_DB, rate: float = 1.0, kinds: Optional[List[str]] = None,
+               lease_seconds: float = LEASE_SECONDS, journal: str = 'wal', idle_exit: float = 30.0,
+               owner: Optional[str] = None) -> int:
+    """Claim and run tasks until none have been claimable for idle_exit seconds; returns tasks done"""
+    owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+    queue = WorkQueue(filename, journal)
+    runner = TaskRunner(SharedLimiter(queue, rate))
+    done = 0
+    idle_since = time.monotonic()
+    try:
+        while True:
+            task = queue.claim(owner, kinds, lease_seconds)
+            if task is None:
+                if time.monotonic() - idle_since > idle_exit:
+                    break
+                time.sleep(1)
+                continue
+
+            try:
+                with Heartbeat(filename, task['id'], owner, lease_seconds, journal) as heartbeat:
+                    queue.acquire_token(rate)
+                    result = runner.run(task)
+                if heartbeat.lost:
+                    logger.warning(f"Lease lost for {task['url']}; discarding result")
+                elif queue.complete(task['id'], owner, result):
+                    done += 1
+                    metrics.inc('queue_tasks_total', kind=task['kind'], outcome='done')
+            except Exception as e:
+                logger.error(f"Task {task['url']} failed (attempt {task['attempts']}): {e}")
+                queue.fail(task['id'], owner, str(e))
+                metrics.inc('queue_tasks_total', kind=task['kind'], outcome='failed')
+            idle_since = time.monotonic()
+    finally:
+        queue.close()
+    logger.info(f"Worker {owner} finished {done} tasks")
+    return done
+
+
+def _worker_process(kwargs: Dict[str, Any]) -> int:
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    metrics.start_run('work_queue_worker')
+    try:
+        return run_worker(**kwargs)
+    finally:
+        metrics.write_run_report(f"work_queue_worker-{os.getpid()}")
+
+
+def enqueue(args) -> int:
+    queue = WorkQueue(args.db, args.journal)
+    try:
+        if args.kind == 'detail':
+            tasks = dataset_io.load_strains(args.input or 'data.json')
+        else:
+            from missing_data_scraper import MissingDataScraper
+            scraper = MissingDataScraper()
+            if not scraper.load_enhanced_data():
+                return 0
+            tasks = [{k: v for k, v in info.items() if k != 'original_data'} for info in scraper.missing_strains]
+        added = queue.enqueue(args.kind, tasks)
+    finally:
+        queue.close()
+    print(f"📥 Enqueued {added} new {args.kind} tasks ({len(tasks) - added} already queued)")
+    return added
+
+
+def collect(args):
+    """Write finished results in the formats the rest of the pipeline reads"""
+    queue = WorkQueue(args.db, args.journal)
+    try:
+        tasks = queue.results(args.kind)
+    finally:
+        queue.close()
+    done = [t for t in tasks if t['status'] == 'done']
+
+    if args.kind == 'detail':
+        from enhanced_scraper import EnhancedLeaflyStrainScraper
+        writer = EnhancedLeaflyStrainScraper(download_images=False, index_file=None, parse_memo_file=None)
+        from refresh import with_discovered
+        output = args.output or 'enhanced-data.json'
+        try:
+            previous = dataset_io.load_strains(output)
+        except FileNotFoundError:
+            previous = []
+        # Unfinished strains keep their listing data, as the sequential scraper does
+        writer.enhanced_data = with_discovered(
+            [t['result'] if t['status'] == 'done' else t['payload'] for t in tasks], previous)
+        writer.save_enhanced_data(output)
+    else:
+        from missing_data_scraper import MissingDataScraper, PATCH_FILE
+        MissingDataScraper().save_patch({t['url']: t['result'] for t in done if t['result']},
+                                        args.output or PATCH_FILE)
+    print(f"📦 Collected {len(done)}/{len(tasks)} finished {args.kind} tasks")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Leased multi-worker scraping over a shared SQLite queue")
+    parser.add_argument('--db', default=QUEUE_DB)
+    parser.add_argument('--journal', default='wal', choices=('wal', 'delete'),
+                        help='use delete when workers on other hosts share the database file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enq = commands.add_parser('enqueue', help='queue strain URLs')
+    enq.add_argument('kind', choices=('detail', 'missing'))
+    enq.add_argument('--input', help='listing file for detail tasks (default data.json)')
+
+    worker = commands.add_parser('worker', help='claim and run tasks')
+    worker.add_argument('--processes', type=int, default=1)
+    worker.add_argument('--rate', type=float, default=1.0, help='global request cap shared by all workers (req/s)')
+    worker.add_argument('--kind', action='append', choices=('detail', 'missing'), dest='kinds')
+    worker.add_argument('--lease', type=float, default=LEASE_SECONDS, help='lease timeout in seconds')
+    worker.add_argument('--idle-exit', type=float, default=30.0,
+                        help='exit after this many seconds without claimable tasks')
+
+    commands.add_parser('status', help='task counts by kind and status')
+
+    col = commands.add_parser('collect', help='write finished results to the usual dataset files')
+    col.add_argument('kind', choices=('detail', 'missing'))
+    col.add_argument('--output')
+    return parser.parse_args()
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = parse_args()
+
+    if args.command == 'enqueue':
+        enqueue(args)
+    elif args.command == 'worker':
+        kwargs = {'filename': args.db, 'rate': args.rate, 'kinds': args.kinds, 'lease_seconds': args.lease,
+                  'journal': args.journal, 'idle_exit': args.idle_exit}
+        with multiprocessing.Pool(args.processes) as pool:
+            done = sum(pool.map(_worker_process, [kwargs] * args.processes))
+        print(f"✅ {args.processes} worker processes finished {done} tasks")
+    elif args.command == 'status':
+        queue = WorkQueue(args.db, args.journal)
+        print(json.dumps(queue.status(), indent=2))
+        queue.close()
+    elif args.command == 'collect':
+        collect(args)
+
+
+if __name__ == "__main__":
+    main()